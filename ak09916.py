@@ -63,8 +63,8 @@ _SO_16BIT = 0.15    # per digit when 16bit mode
 class AK09916(ICMRegisterRW):
     ADDR = 0x0c
     """Class which provides interface to AK09916 magnetometer."""
-    def __init__(self, i2c):
-        super().__init__(i2c, AK09916.ADDR)
+    def __init__(self, i2c, lock=None):
+        super().__init__(i2c, AK09916.ADDR, lock)
 
         self._offset = (0, 0, 0)
         self._scale = (1, 1, 1)
@@ -98,12 +98,13 @@ class AK09916(ICMRegisterRW):
         """
         # self.register_char(_CNTL2, MODE_SINGLE_MEASURE)
         # xyz = list(self.register_three_shorts(_HXL, endian='l'))
-        x = self.register_short(_HXL, endian='l')
-        y = self.register_short(_HYL, endian='l')
-        z = self.register_short(_HZL, endian='l')
-        xyz = [x, y, z]
+        with self.transaction():
+            x = self.register_short(_HXL, endian='l')
+            y = self.register_short(_HYL, endian='l')
+            z = self.register_short(_HZL, endian='l')
+            xyz = [x, y, z]
 
-        self.register_char(_ST2)    # Enable updating readings again
+            self.register_char(_ST2)    # Enable updating readings again
 
         # Apply factory axial sensitivy adjustements
         # xyz[0] *= self._adjustement[0]
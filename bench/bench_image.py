@@ -0,0 +1,37 @@
+"""
+Image operation timings. Run it on the board next to the library modules,
+it is not part of the library itself.
+"""
+from image import StuduinoBitImage as Image
+from time import ticks_us, ticks_diff
+import gc
+
+# MicroPython only, heap use is not reported without it
+mem_free = getattr(gc, 'mem_free', None)
+
+
+def bench(name, func, count=200):
+    gc.collect()
+    free = mem_free() if mem_free else 0
+    start = ticks_us()
+    for i in range(count):
+        func()
+    elapsed = ticks_diff(ticks_us(), start)
+    used = (free - mem_free()) // count if mem_free else '-'
+    print('{0:<12} {1:>8} us/op {2:>8} B/op'.format(
+          name, elapsed // count, used))
+
+
+img = Image('90009:09090:00900:09090:90009:')
+img.set_pixel_color(2, 2, (0, 0, 31))
+other = Image.HEART
+
+bench('shift_left', lambda: img.shift_left(2))
+bench('__add__', lambda: img + other)
+bench('copy', lambda: img.copy())
+bench('__mul__', lambda: img * 2)
+bench('invert', lambda: img.invert())
+bench('crop', lambda: img.crop(1, 1, 3, 3))
+
+canvas = Image(40, 5)
+bench('blit', lambda: canvas.blit(img, 0, 0, 5, 5, 20, 0))
@@ -1,9 +1,9 @@
-from .inst import button_a, button_b, \
+from .inst import button_a, button_b, buttons, \
                   Image, \
                   display, \
                   p0, p1, p2, p3, p4, p5, p6, p7, p8, p9, \
                   p10, p11, p12, p13, p14, p15, p16, p19, p20, \
-                  i2c, \
+                  i2c, spi, \
                   lightsensor, \
                   temperature, \
                   accelerometer, \
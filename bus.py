@@ -23,20 +23,111 @@ Kenji Kawase, Artec Co., Ltd.
 ------------------------------------------------------------------------------
 """
 from machine import I2C, Pin
+import _thread
+from const import I2C_FREQ
 
 """ ---------------------------------------------------------------------- """
 # for singleton pattern
 # Implement used global value,
 # maybe Micropython 'function' object can't have attribute...
 __i2c = None
+__i2c_freq = I2C_FREQ
+
+# Standard-mode, fast-mode and fast-mode plus. ICM20948 supports all of them.
+I2C_FREQS = (100000, 400000, 1000000)
+
+
+def _check_i2c_freq(freq):
+    if freq not in I2C_FREQS:
+        raise ValueError('freq must be 100000/400000/1000000')
+
+
+def set_i2c_freq(freq):
+    """Set the clock of the shared I2C bus.
+
+    Call this before the sensor objects are created so that the ICM20948
+    is probed and configured at the requested speed. If the bus already
+    exists it is re-initialised in place.
+    """
+    _init_i2c(freq, Pin(22), Pin(21))
+
+
+def _init_i2c(freq, scl, sda):
+    global __i2c_freq
+    _check_i2c_freq(freq)
+    __i2c_freq = freq
+    if __i2c is not None:
+        with get_i2c_lock():
+            __i2c.init(scl=scl, sda=sda, freq=freq)
+
+
+def get_i2c_freq():
+    return __i2c_freq
 
 
 def get_i2c_object():
     global __i2c
     if __i2c is None:
-        __i2c = I2C(scl=Pin(22), sda=Pin(21))
+        __i2c = I2C(scl=Pin(22), sda=Pin(21), freq=__i2c_freq)
     return __i2c
 
+
+class I2CBusLock:
+    """Re-entrant lock which serialises access to the shared I2C bus.
+
+    The thread holding the lock may acquire it again, so a transaction
+    group can wrap register accesses which take the lock themselves.
+    """
+    def __init__(self):
+        self._lock = _thread.allocate_lock()
+        self._owner = None
+        self._depth = 0
+
+    def acquire(self):
+        me = _thread.get_ident()
+        if self._owner == me:
+            self._depth += 1
+            return True
+        self._lock.acquire()
+        self._owner = me
+        self._depth = 1
+        return True
+
+    def release(self):
+        if self._owner != _thread.get_ident():
+            raise RuntimeError('I2C bus lock not held by this thread')
+        self._depth -= 1
+        if self._depth == 0:
+            self._owner = None
+            self._lock.release()
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        self.release()
+
+
+# Created at import, two threads creating it on first use could each end
+# up with their own lock.
+__i2c_lock = I2CBusLock()
+
+
+def get_i2c_lock():
+    return __i2c_lock
+
+
+def i2c_transaction():
+    """Group several bus accesses so that no other thread can interleave.
+
+    Usage:
+    with i2c_transaction():
+        i2c.writeto_mem(0x68, 0x7f, b'\x20')  # select bank 2
+        i2c.writeto_mem(0x68, 0x14, b'\x00')
+        i2c.writeto_mem(0x68, 0x7f, b'\x00')  # back to bank 0
+    """
+    return get_i2c_lock()
+
 """ ---------------------------------------------------------------------- """
 """ I2C bus -------------------------------------------------------------- """
 
@@ -46,19 +137,49 @@ class StuduinoBitI2C:
     """
     def __init__(self):
         self._i2c = get_i2c_object()
+        self._lock = get_i2c_lock()
 
-    def init(self, freq=100000, scl=Pin(22), sda=Pin(21)):
-        self._i2c.init(freq=freq, scl=scl, sda=sda)
+    def init(self, freq=None, scl=Pin(22), sda=Pin(21)):
+        """Re-initialise the shared bus. freq None keeps the current clock.
+        """
+        if freq is None:
+            freq = get_i2c_freq()
+        _init_i2c(freq, scl, sda)
 
     def scan(self):
-        return self._i2c.scan()
+        with self._lock:
+            return self._i2c.scan()
+
+    def transaction(self):
+        return self._lock
 
     def read(self, addr, n, repeat=False):
-        return self._i2c.readfrom(addr, n)
+        """Read n bytes from the device with address addr.
+
+        If repeat is True, no stop bit will be sent.
+        """
+        with self._lock:
+            return self._i2c.readfrom(addr, n, not repeat)
 
     def write(self, addr, buf, repeat=False):
-        """Not implemented """
-        pass
+        """Write bytes from buf to the device with address addr.
+
+        If repeat is True, no stop bit will be sent. The bus is released
+        between calls, so wrap a write(..., repeat=True) and the read
+        that follows it in transaction(), or use write_read().
+        """
+        with self._lock:
+            return self._i2c.writeto(addr, buf, not repeat)
+
+    def write_read(self, addr, buf, n):
+        """Write buf and read n bytes back with a repeated start.
+
+        e.g. write a register address and read its contents in a single
+        combined transaction.
+        """
+        with self._lock:
+            self._i2c.writeto(addr, buf, False)
+            return self._i2c.readfrom(addr, n, True)
 
 """ ---------------------------------------------------------------------- """
 """ SPI bus -------------------------------------------------------------- """
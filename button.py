@@ -24,9 +24,20 @@ We used the script below as reference
 https://github.com/casnortheast/microbit_stub/
 ------------------------------------------------------------------------------
 """
-from machine import Pin
+from machine import Pin, Timer
+import array
+import micropython
 import utime
 
+# Button events, see StuduinoBitButton.get_event()
+CLICK = 'click'
+DOUBLE_CLICK = 'double_click'
+LONG_PRESS = 'long_press'
+# Events of both buttons, see StuduinoBitButtons.get_event()
+CHORD = 'A+B'
+SEQUENCE_AB = 'A>B'
+SEQUENCE_BA = 'B>A'
+
 # for singleton pattern
 # Implement used global value,
 # maybe Micropython 'function' object can't have attribute...
@@ -38,19 +49,37 @@ def get_button_object(ab):
 
     from .button import __SBButton
 
-    b = __SBButton(ab)   # Type error check
-    i = 0
     if ab == 'A':
         i = 0
     elif ab == 'B':
         i = 1
+    else:
+        raise ValueError("ab must be 'A' or 'B'")
 
+    # Only one object per button, a new one would take over the pin IRQ.
     if __button[i] is None:
-        __button[i] = b
+        __button[i] = __SBButton(ab)
     return __button[i]
 
 
+__buttons = None
+
+
+def get_buttons_object():
+    global __buttons
+
+    from .button import __SBButtons
+
+    if __buttons is None:
+        __buttons = __SBButtons()
+    return __buttons
+
+
 class StuduinoBitButton:
+    CLICK = CLICK
+    DOUBLE_CLICK = DOUBLE_CLICK
+    LONG_PRESS = LONG_PRESS
+
     def __init__(self, ab):
         self.__button = get_button_object(ab)
 
@@ -73,10 +102,230 @@ class StuduinoBitButton:
         """
         return self.__button.get_presses()
 
+    def get_event(self):
+        """Returns the oldest of CLICK, DOUBLE_CLICK and LONG_PRESS not
+        consumed yet, or None.
+        """
+        return self.__button.get_event()
+
+    def set_handler(self, handler):
+        """Call handler(event) for each event instead of queueing it.
+        None restores the queue.
+        """
+        self.__button.set_handler(handler)
+
+    def set_timing(self, long_press=600, double_click=300):
+        """Set how long (ms) a press lasts to be a LONG_PRESS and how soon
+        the second click must follow to be a DOUBLE_CLICK.
+        """
+        self.__button.set_timing(long_press, double_click)
+
+
+class StuduinoBitButtons:
+    """Both buttons together, for chords and sequences.
+
+    E.g.:
+    buttons = StuduinoBitButtons()
+    if buttons.get_event() == buttons.CHORD:
+        ...
+    """
+    CHORD = CHORD
+    SEQUENCE_AB = SEQUENCE_AB
+    SEQUENCE_BA = SEQUENCE_BA
+
+    def __init__(self):
+        self.__buttons = get_buttons_object()
+
+    def is_pressed(self):
+        """True if both buttons are pressed down.
+        """
+        return self.__buttons.is_pressed()
+
+    def get_event(self):
+        """Returns the oldest of CHORD (both pressed together), SEQUENCE_AB
+        (A released, then B pressed) and SEQUENCE_BA not consumed yet, or
+        None.
+        """
+        return self.__buttons.get_event()
+
+    def set_handler(self, handler):
+        """Call handler(event) for each event instead of queueing it.
+        None restores the queue.
+        """
+        self.__buttons.set_handler(handler)
+
+    def set_timing(self, chord=200, sequence=500):
+        """Set how close (ms) the presses of a CHORD are and how soon the
+        second button must follow the first in a sequence.
+        """
+        self.__buttons.set_timing(chord, sequence)
+
 
 """ ---------------------------------------------------------------------- """
 """ Buttons -------------------------------------------------------------- """
 
+_UP = 0
+_DOWN = 1
+
+
+class _EventRing:
+    """Fixed size queue of (edge, ticks_ms) filled by the IRQ handler.
+
+    There is one writer and one reader, so no lock is needed. put() does
+    not allocate; when the ring is full new edges are dropped.
+    """
+    def __init__(self, size):
+        self._edges = bytearray(size)
+        self._times = array.array('l', [0] * size)
+        self._head = 0      # next slot to write
+        self._tail = 0      # next slot to read
+
+    def put(self, edge, t):
+        head = self._head
+        nxt = head + 1 if head + 1 < len(self._edges) else 0
+        if nxt == self._tail:
+            return False
+        self._edges[head] = edge
+        self._times[head] = t
+        self._head = nxt
+        return True
+
+    def get(self):
+        """Returns (edge, ticks_ms) of the oldest edge or None.
+        """
+        tail = self._tail
+        if tail == self._head:
+            return None
+        item = (self._edges[tail], self._times[tail])
+        self._tail = tail + 1 if tail + 1 < len(self._edges) else 0
+        return item
+
+
+class _ClickRecognizer:
+    """Turns press/release timestamps into CLICK, DOUBLE_CLICK and
+    LONG_PRESS.
+
+    A click is held back until the double click window has passed, and a
+    long press is reported as soon as it is long enough, so poll() has to
+    be called with the current time as well.
+    """
+    def __init__(self, emit, long_press, double_click):
+        self._emit = emit
+        self.long_press = long_press
+        self.double_click = double_click
+        self._down = None       # ticks_ms of the current press
+        self._long = False      # current press was reported as LONG_PRESS
+        self._click = None      # ticks_ms of a click that may become double
+
+    def press(self, t):
+        self.poll(t)
+        self._down = t
+        self._long = False
+
+    def release(self, t):
+        down = self._down
+        if down is None:
+            return
+        self._down = None
+        if self._long:
+            return
+        if utime.ticks_diff(t, down) >= self.long_press:
+            self.__flush_click()
+            self._emit(LONG_PRESS)
+        elif self._click is not None:
+            self._click = None
+            self._emit(DOUBLE_CLICK)
+        else:
+            self._click = t
+
+    def poll(self, now):
+        down = self._down
+        if down is not None:
+            if (not self._long and
+                    utime.ticks_diff(now, down) >= self.long_press):
+                self.__flush_click()
+                self._long = True
+                self._emit(LONG_PRESS)
+        elif (self._click is not None and
+              utime.ticks_diff(now, self._click) > self.double_click):
+            self.__flush_click()
+
+    def deadline(self):
+        """Returns the ticks_ms at which poll() will report an event without
+        a new edge, or None.
+        """
+        if self._down is not None:
+            if not self._long:
+                return utime.ticks_add(self._down, self.long_press)
+        elif self._click is not None:
+            return utime.ticks_add(self._click, self.double_click + 1)
+        return None
+
+    def __flush_click(self):
+        if self._click is not None:
+            self._click = None
+            self._emit(CLICK)
+
+
+_TIMER_ID = 3           # hardware timer for the button timeouts
+
+
+class _DeadlineTimer:
+    """One-shot machine.Timer shared by both buttons.
+
+    A button asks to be polled at the deadline of its recognizer, the end
+    of the double click window or the long press threshold, and the timer
+    is armed for the earliest one. A lone CLICK or a LONG_PRESS is then
+    delivered without another edge or a get_event() call.
+    """
+    def __init__(self):
+        self._timer = None
+        self._due = {}          # button: ticks_ms deadline
+        # Bound methods are objects, create them once, not in the IRQ.
+        self._fire_ref = self.__fire
+        self._run_ref = self.__run
+
+    def arm(self, button, deadline):
+        """Poll button at deadline, None cancels it.
+        """
+        if deadline is not None:
+            self._due[button] = deadline
+        elif self._due.pop(button, None) is None:
+            return
+        self.__rearm()
+
+    def __rearm(self):
+        timer = self._timer
+        if timer is None:
+            timer = self._timer = Timer(_TIMER_ID)
+        if not self._due:
+            timer.deinit()
+            return
+        now = utime.ticks_ms()
+        wait = min([utime.ticks_diff(t, now) for t in self._due.values()])
+        timer.init(mode=Timer.ONE_SHOT, period=max(wait, 1),
+                   callback=self._fire_ref)
+
+    def __fire(self, timer):
+        try:
+            micropython.schedule(self._run_ref, None)
+        except RuntimeError:
+            # schedule queue full, try again shortly
+            timer.init(mode=Timer.ONE_SHOT, period=10,
+                       callback=self._fire_ref)
+
+    def __run(self, arg):
+        now = utime.ticks_ms()
+        due = [b for b, t in self._due.items()
+               if utime.ticks_diff(t, now) <= 0]
+        for button in due:
+            del self._due[button]
+            button.poll()       # arms again if something is still pending
+        self.__rearm()
+
+
+_deadline_timer = _DeadlineTimer()
+
 
 class __SBButton:
     """Button class represents buttons A and B.
@@ -85,7 +334,15 @@ class __SBButton:
        button_b
        with methods to test whether a button has been pressed and
        how many times
+
+       The pin IRQ only stores the edge and its time in a ring and
+       schedules __process, which feeds the edges to the recognizer.
+       Timeouts come from _deadline_timer.
     """
+    __RING_SIZE = 16
+    __BOUNCE_MS = 20        # edges closer than this are contact bounce
+    __PRESS_MS = 150        # minimum interval of counted presses
+    __EVENT_MAX = 8         # events kept for get_event()
 
     def __init__(self, ab):
         self._count = 0
@@ -97,11 +354,22 @@ class __SBButton:
         else:
             raise ValueError("ab must be 'A' or 'B'")
 
+        self._ring = _EventRing(__SBButton.__RING_SIZE)
+        self._events = []
+        self._handler = None
+        self._listener = None
+        self._recognizer = _ClickRecognizer(self.__event, 600, 300)
+        self._busy = False
+        # Bound methods are objects, create it once, not in the IRQ.
+        self._process_ref = self.__process
+
         self._button = Pin(pin, Pin.IN)
+        now = utime.ticks_ms()
+        self.prev_time = utime.ticks_add(now, -__SBButton.__PRESS_MS)
+        self._edge_time = now
+        self._level = _DOWN if self._button.value() == 0 else _UP
         self._button.irq(handler=self.__button_pushed,
-                         trigger=Pin.IRQ_FALLING)
-
-        self.prev_time = utime.ticks_ms()
+                         trigger=Pin.IRQ_FALLING | Pin.IRQ_RISING)
 
     def get_value(self):
         return self._button.value()
@@ -130,13 +398,203 @@ class __SBButton:
         self._count = 0
         return count
 
+    def get_event(self):
+        self.__process()
+        if self._events:
+            return self._events.pop(0)
+        return None
+
+    def set_handler(self, handler):
+        self._handler = handler
+
+    def set_timing(self, long_press, double_click):
+        self._recognizer.long_press = long_press
+        self._recognizer.double_click = double_click
+
+    def set_listener(self, listener):
+        """Call listener(edge, ticks_ms) for each press and release.
+        """
+        self._listener = listener
+
+    def poll(self):
+        self.__process()
+
+    def __event(self, event):
+        if self._handler is not None:
+            self._handler(event)
+        elif len(self._events) < __SBButton.__EVENT_MAX:
+            self._events.append(event)
+
+    def __process(self, arg=None):
+        """Feed the queued edges to the recognizer. Runs from
+        micropython.schedule() or from the caller of get_event().
+        """
+        if self._busy:
+            return
+        self._busy = True
+        try:
+            recognizer = self._recognizer
+            while True:
+                item = self._ring.get()
+                if item is None:
+                    break
+                edge, t = item
+                if edge == _DOWN:
+                    recognizer.press(t)
+                else:
+                    recognizer.release(t)
+                if self._listener is not None:
+                    self._listener(edge, t)
+
+            # An edge dropped as bounce may have been the last one, trust
+            # the pin once it has settled.
+            now = utime.ticks_ms()
+            level = _DOWN if self._button.value() == 0 else _UP
+            if (level != self._level and
+                    utime.ticks_diff(now, self._edge_time) >=
+                    __SBButton.__BOUNCE_MS):
+                self._level = level
+                self._edge_time = now
+                if level == _DOWN:
+                    recognizer.press(now)
+                else:
+                    recognizer.release(now)
+                if self._listener is not None:
+                    self._listener(level, now)
+            recognizer.poll(now)
+            _deadline_timer.arm(self, recognizer.deadline())
+        finally:
+            self._busy = False
+
     def __button_pushed(self, p):
+        # IRQ context: no allocation, just record the edge.
         cur_time = utime.ticks_ms()
-        if cur_time < self.prev_time + 150:
+        level = _DOWN if p.value() == 0 else _UP
+        if (level == self._level or
+                utime.ticks_diff(cur_time, self._edge_time) <
+                __SBButton.__BOUNCE_MS):
             return
 
-        self.prev_time = cur_time
+        self._level = level
+        self._edge_time = cur_time
+        self._ring.put(level, cur_time)
+        try:
+            micropython.schedule(self._process_ref, None)
+        except RuntimeError:
+            pass    # schedule queue full, get_event() drains the ring
 
-        self._was_pressed = True
-        self._count += 1
+        if level == _DOWN:
+            if (utime.ticks_diff(cur_time, self.prev_time) >=
+                    __SBButton.__PRESS_MS):
+                self.prev_time = cur_time
+                self._was_pressed = True
+                self._count += 1
         return
+
+
+class __SBButtons:
+    """Watches the edges of both buttons and reports chords and sequences.
+
+    Edges are gathered from both rings and handled in time order, the pins
+    are never read here.
+    """
+    __EVENT_MAX = 8
+
+    def __init__(self):
+        self._buttons = (get_button_object('A'), get_button_object('B'))
+        self._down = [None, None]       # ticks_ms of the current press
+        self._up = [None, None]         # ticks_ms of the last release
+        self._chord = False             # current presses were a chord
+        self._pending = []
+        self._events = []
+        self._handler = None
+        self._busy = False
+        self._scheduled = False
+        self.chord = 200
+        self.sequence = 500
+        self._process_ref = self.__process
+        self._buttons[0].set_listener(self.__edge_a)
+        self._buttons[1].set_listener(self.__edge_b)
+
+    def is_pressed(self):
+        self.__process()
+        return self._down[0] is not None and self._down[1] is not None
+
+    def get_event(self):
+        self.__process()
+        if self._events:
+            return self._events.pop(0)
+        return None
+
+    def set_handler(self, handler):
+        self._handler = handler
+
+    def set_timing(self, chord, sequence):
+        self.chord = chord
+        self.sequence = sequence
+
+    def __edge_a(self, edge, t):
+        self.__edge(0, edge, t)
+
+    def __edge_b(self, edge, t):
+        self.__edge(1, edge, t)
+
+    def __edge(self, i, edge, t):
+        self._pending.append((t, i, edge))
+        if not self._scheduled:
+            # Handle it once the other button's ring was drained as well.
+            try:
+                micropython.schedule(self._process_ref, None)
+                self._scheduled = True
+            except RuntimeError:
+                pass
+
+    def __event(self, event):
+        if self._handler is not None:
+            self._handler(event)
+        elif len(self._events) < __SBButtons.__EVENT_MAX:
+            self._events.append(event)
+
+    def __process(self, arg=None):
+        self._scheduled = False
+        if self._busy:
+            return
+        self._busy = True
+        try:
+            for b in self._buttons:
+                b.poll()
+            pending = self._pending
+            if not pending:
+                return
+            self._pending = []
+            base = pending[0][0]
+            pending.sort(key=lambda e: utime.ticks_diff(e[0], base))
+            for t, i, edge in pending:
+                if edge == _DOWN:
+                    self.__press(i, t)
+                else:
+                    self._down[i] = None
+                    self._up[i] = t
+                    if self._down[1 - i] is None and self._chord:
+                        # A chord is not the start of a sequence.
+                        self._chord = False
+                        self._up = [None, None]
+        finally:
+            self._busy = False
+
+    def __press(self, i, t):
+        self._down[i] = t
+        other = 1 - i
+        down = self._down[other]
+        if down is not None:
+            if (not self._chord and
+                    utime.ticks_diff(t, down) <= self.chord):
+                self._chord = True
+                self.__event(CHORD)
+            return
+
+        up = self._up[other]
+        if (up is not None and not self._chord and
+                utime.ticks_diff(t, up) <= self.sequence):
+            self._up[other] = None      # one sequence per release
+            self.__event(SEQUENCE_AB if i == 1 else SEQUENCE_BA)
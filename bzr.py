@@ -22,11 +22,85 @@ Author
 Kenji Kawase, Artec Co., Ltd.
 ------------------------------------------------------------------------------
 """
-from machine import Pin, PWM
+from machine import Pin, PWM, Timer
+from micropython import const
 from .terminal import StuduinoBitTerminal
+import array
+import micropython
 import time
 
 
+# Frequency (Hz) of the MIDI note numbers NOTE_FIRST ('C3') to NOTE_LAST
+# ('G9'), FREQ_TABLE[nn - NOTE_FIRST].
+NOTE_FIRST = const(48)
+NOTE_LAST = const(127)
+FREQ_TABLE = array.array('H', (
+    131, 139, 147, 156, 165, 175, 185, 196, 208, 220, 233, 247,
+    262, 277, 294, 311, 330, 349, 370, 392, 415, 440, 466, 494,
+    523, 554, 587, 622, 659, 699, 740, 784, 831, 880, 932, 988,
+    1047, 1109, 1175, 1245, 1319, 1397, 1480, 1568, 1661, 1760, 1865, 1976,
+    2093, 2218, 2349, 2489, 2637, 2794, 2960, 3136, 3322, 3520, 3729, 3951,
+    4186, 4435, 4699, 4978, 5274, 5588, 5920, 6272, 6645, 7040, 7459, 7902,
+    8372, 8870, 9397, 9956, 10548, 11175, 11840, 12544))
+
+# Semitone of each note letter in an octave, '_' are the sharps
+_SEMITONES = 'C_D_EF_G_A_B'
+
+# Packed melodies are bytes of (note, length) pairs. note is a MIDI note
+# number or REST, length is in units of unit ms (10 unless told otherwise),
+# e.g. bytes((60, 20, 64, 20, REST, 10, 72, 40)).
+REST = const(0)
+
+
+def note_number(sound):
+    """Returns the MIDI note number of a note name ('C4', 'CS4') or of a
+    MIDI note number string ('60').
+    """
+    if sound.isdigit():
+        nn = int(sound)
+        if nn < NOTE_FIRST or nn > NOTE_LAST:
+            raise ValueError("Note number must be '48'-'127'")
+        return nn
+
+    # Letter notation
+    nn = -1
+    n = len(sound)
+    if (n == 2 or n == 3) and sound[0] != '_' and sound[-1].isdigit():
+        i = _SEMITONES.find(sound[0])
+        if i >= 0 and n == 3:
+            # Only notes followed by a sharp in _SEMITONES can be sharpened.
+            i = i + 1 if (sound[1] == 'S' and
+                          _SEMITONES[i + 1:i + 2] == '_') else -1
+        if i >= 0:
+            nn = (int(sound[-1]) + 1) * 12 + i
+    if nn < NOTE_FIRST or nn > NOTE_LAST:
+        raise ValueError("Note must be 'C3'-'G9'")
+    return nn
+
+
+def pack_melody(melody, unit=10):
+    """Returns the packed form of a melody of (sound, duration ms), sound
+    being a note name, a MIDI note number string or None for a rest.
+
+    Store the result as a bytes literal and a tune costs no heap until
+    it is played.
+    """
+    buf = bytearray()
+    for sound, duration in melody:
+        length = (duration + unit // 2) // unit
+        if length < 0 or length > 255:
+            raise ValueError("duration must be 0-{} ms".format(255 * unit))
+        buf.append(REST if sound is None else note_number(sound))
+        buf.append(length)
+    return bytes(buf)
+
+
+def _unpack_melody(data, unit):
+    for i in range(0, len(data), 2):
+        nn = data[i]
+        yield (FREQ_TABLE[nn - NOTE_FIRST] if nn else 0), data[i + 1] * unit
+
+
 # for singleton pattern
 # Implement used global value, maybe Micropython
 # 'function' object can't have attribute...
@@ -52,39 +126,171 @@ class StuduinoBitBuzzer():
     def off(self):
         self.__buzzer.off()
 
+    def play(self, melody, *, wait=False, loop=False, queue=False, unit=10):
+        """Play a melody, a sequence of (sound, duration ms) where sound is
+        anything on() takes, or None for a rest. A packed melody (bytes, see
+        pack_melody()) is played straight from its bytes, its lengths are
+        in units of unit ms.
+
+        Unless wait is True it plays in the background and returns at
+        once; it replaces the melody being played unless queue is True.
+        E.g. buzzer.play([('C4', 200), ('E4', 200), (None, 100), ('72', 400)])
+        """
+        self.__buzzer.play(melody, wait=wait, loop=loop, queue=queue,
+                           unit=unit)
+
+    def stop(self):
+        """Stop the melody being played and drop the queued ones.
+        """
+        self.__buzzer.stop()
+
+    def tone(self, hz, duty=10):
+        """Sound hz, or nothing if hz is 0, until the next call.
+
+        Made for following a stream of values, e.g. 100 times a second:
+        buzzer.tone(200 + int(abs(accelerometer.get_x()) * 100))
+        Only the frequency and duty that changed are written to the PWM.
+        """
+        self.__buzzer.tone(hz, duty)
+
+    def is_playing(self):
+        return self.__buzzer.is_playing()
+
     def release(self):
         self.__buzzer.release()
 
 
+_TIMER_ID = 2           # hardware timer for note changes
+
+
+class _MelodyPlayer:
+    """Plays melodies from a one-shot machine.Timer.
+
+    Each note arms the timer for its end, and the timer schedules the next
+    note with micropython.schedule(). Notes end on absolute ticks_ms
+    deadlines, so the time spent switching the tone is taken out of the
+    note instead of adding up over the tune. Nothing runs between melodies.
+    """
+    def __init__(self, tone):
+        self._tone = tone           # tone(hz), 0 is silence
+        self._timer = None
+        self._queue = []            # [(notes, loop)]
+        self._current = None        # (notes, loop) being played
+        # notes() returns an iterator of (hz, duration ms)
+        self._notes = None          # its iterator
+        self._sounded = False       # it played a note since (re)start
+        self._deadline = 0
+        self._generation = 0        # stale timer callbacks are ignored
+        # Bound methods are objects, create them once, not in the IRQ.
+        self._fire_ref = self.__fire
+        self._next_ref = self.__next
+
+    def play(self, notes, loop=False, replace=True):
+        if replace:
+            self.__cancel()
+        self._queue.append((notes, loop))
+        if self._current is None:
+            self._deadline = time.ticks_ms()
+            self.__next(self._generation)
+
+    def stop(self):
+        """Stop the current melody and drop the queue. No note of them is
+        started after this returns.
+        """
+        self.__cancel()
+        self._tone(0)
+
+    def is_busy(self):
+        return self._current is not None or len(self._queue) != 0
+
+    def __cancel(self):
+        self._generation += 1
+        if self._timer is not None:
+            self._timer.deinit()
+        self._queue = []
+        self._current = None
+        self._notes = None
+
+    def __fire(self, timer):
+        try:
+            micropython.schedule(self._next_ref, self._generation)
+        except RuntimeError:
+            # schedule queue full, try again shortly
+            timer.init(mode=Timer.ONE_SHOT, period=1,
+                       callback=self._fire_ref)
+
+    def __next(self, generation):
+        """Start the next note and arm the timer for its end.
+        """
+        if generation != self._generation:
+            return
+        while True:
+            if self._notes is None:
+                if not self._queue:
+                    self._current = None
+                    self._tone(0)
+                    return
+                self._current = self._queue.pop(0)
+                self._notes = self._current[0]()
+                self._sounded = False
+            try:
+                hz, duration = next(self._notes)
+            except StopIteration:
+                # A looping melody runs until something is queued, one
+                # without any note is dropped.
+                if self._current[1] and self._sounded and not self._queue:
+                    self._notes = self._current[0]()
+                    self._sounded = False
+                else:
+                    self._notes = None
+                continue
+
+            self._sounded = True
+            self._tone(hz)
+            self._deadline = time.ticks_add(self._deadline, duration)
+            wait = time.ticks_diff(self._deadline, time.ticks_ms())
+            if wait > 0:
+                if self._timer is None:
+                    self._timer = Timer(_TIMER_ID)
+                self._timer.init(mode=Timer.ONE_SHOT, period=wait,
+                                 callback=self._fire_ref)
+                return
+
+
 class __SBBuzzer():
     def __init__(self):
         self._buzzer = StuduinoBitTerminal('P4')
         self.tid = self._buzzer.get_pwm_timer()
+        self._player = _MelodyPlayer(self.__tone)
+        # Frequency and duty last written by tone(), None when something
+        # else may have changed the PWM since.
+        self._stream = None
 
-    def on(self, sound, *, duration=None):
+    def __frequency(self, sound):
+        """Returns the frequency of a note name, a MIDI note number string
+        or a frequency.
+        """
         if type(sound) is str:
-            if sound.isdigit():
-                # MIDI noto number
-                nn = int(sound)
-                if nn < 48 or nn > 127:
-                    raise ValueError("Note number must be '48'-'127'")
-                tone = __SBBuzzer.NOTE_NUM[nn-48]
-            else:
-                # Letter notation
-                tone = sound
-
-            try:
-                self._buzzer.set_analog_hz(__SBBuzzer.TONE_MAP[tone], self.tid)
-            except KeyError as e:
-                raise ValueError("Note must be 'C3'-'G9'")
+            return FREQ_TABLE[note_number(sound) - NOTE_FIRST]
         elif type(sound) is int:
             if sound < 0:
                 raise ValueError("Frequency must be more than 0")
-            self._buzzer.set_analog_hz(sound, self.tid)
+            return sound
         else:
             raise TypeError("sound type must be string or integer")
 
-        self._buzzer.write_analog(10)
+    def __tone(self, hz):
+        if hz:
+            self._buzzer.set_analog_hz(hz, self.tid)
+            self._buzzer.write_analog(10)
+        else:
+            self._buzzer.write_analog(0)
+
+    def on(self, sound, *, duration=None):
+        hz = self.__frequency(sound)
+        self._stream = None
+        self._player.stop()
+        self.__tone(hz)
 
         if duration != None:
             if duration < 0:
@@ -94,37 +300,73 @@ class __SBBuzzer():
             self.off()
 
     def off(self):
+        self._stream = None
+        self._player.stop()
         self._buzzer.write_analog(0)
 
+    def tone(self, hz, duty):
+        stream = self._stream
+        if stream is None:
+            # First call of a stream: take the buzzer over from melodies
+            # and make sure the PWM exists, later calls only touch it.
+            self._player.stop()
+            stream = self._stream = [-1, -1]
+            pin = self._buzzer
+            if pin.pwm is None:
+                stream[0] = hz if hz > 0 else 1000
+                pin.set_analog_hz(stream[0], self.tid)
+
+        pwm = self._buzzer.pwm
+        if hz <= 0:
+            duty = 0
+        elif hz != stream[0]:
+            pwm.freq(hz)
+            stream[0] = hz
+        if duty != stream[1]:
+            pwm.duty(duty)
+            self._buzzer.duty = duty
+            stream[1] = duty
+
+    def play(self, melody, *, wait=False, loop=False, queue=False, unit=10):
+        # Check up front, so a bad note raises here and not from the note
+        # timer.
+        if type(melody) is bytes or type(melody) is bytearray:
+            if len(melody) & 1:
+                raise ValueError("packed melody must be (note, length) pairs")
+            for i in range(0, len(melody), 2):
+                nn = melody[i]
+                if nn != REST and (nn < NOTE_FIRST or nn > NOTE_LAST):
+                    raise ValueError("Note number must be '48'-'127'")
+
+            def notes():
+                return _unpack_melody(melody, unit)
+        else:
+            converted = []
+            for sound, duration in melody:
+                if duration < 0:
+                    raise ValueError("duration must be more than 0 ms.")
+                hz = 0 if sound is None else self.__frequency(sound)
+                converted.append((hz, duration))
+
+            def notes():
+                return iter(converted)
+
+        self._stream = None
+        self._player.play(notes, loop=loop and not wait, replace=not queue)
+        if wait:
+            while self._player.is_busy():
+                time.sleep_ms(10)
+
+    def stop(self):
+        self._stream = None
+        self._player.stop()
+
+    def is_playing(self):
+        return self._player.is_busy()
+
     def release(self):
+        self._stream = None
+        self._player.stop()
         self._buzzer.write_analog(0)
         self._buzzer.rel_pwm_timer(self.tid)
         self._buzzer.release_pwm()
-
-
-__SBBuzzer.TONE_MAP = {
-    'C3': 131, 'CS3': 139, 'D3': 147, 'DS3': 156, 'E3': 165, 'F3': 175,
-    'FS3': 185, 'G3': 196, 'GS3': 208, 'A3': 220, 'AS3': 233, 'B3': 247,
-    'C4': 262, 'CS4': 277, 'D4': 294, 'DS4': 311, 'E4': 330, 'F4': 349,
-    'FS4': 370, 'G4': 392, 'GS4': 415, 'A4': 440, 'AS4': 466, 'B4': 494,
-    'C5': 523, 'CS5': 554, 'D5': 587, 'DS5': 622, 'E5': 659, 'F5': 699,
-    'FS5': 740, 'G5': 784, 'GS5': 831, 'A5': 880, 'AS5': 932, 'B5': 988,
-    'C6': 1047, 'CS6': 1109, 'D6': 1175, 'DS6': 1245, 'E6': 1319, 'F6': 1397,
-    'FS6': 1480, 'G6': 1568, 'GS6': 1661, 'A6': 1760, 'AS6': 1865, 'B6': 1976,
-    'C7': 2093, 'CS7': 2218, 'D7': 2349, 'DS7': 2489, 'E7': 2637, 'F7': 2794,
-    'FS7': 2960, 'G7': 3136, 'GS7': 3322, 'A7': 3520, 'AS7': 3729, 'B7': 3951,
-    'C8': 4186, 'CS8': 4435, 'D8': 4699, 'DS8': 4978, 'E8': 5274, 'F8': 5588,
-    'FS8': 5920, 'G8': 6272, 'GS8': 6645, 'A8': 7040, 'AS8': 7459, 'B8': 7902,
-    'C9': 8372, 'CS9': 8870, 'D9': 9397, 'DS9': 9956, 'E9': 10548, 'F9': 11175,
-    'FS9': 11840, 'G9': 12544
-}
-
-__SBBuzzer.NOTE_NUM = [
-    'C3', 'CS3', 'D3', 'DS3', 'E3', 'F3', 'FS3', 'G3', 'GS3', 'A3', 'AS3', 'B3',
-    'C4', 'CS4', 'D4', 'DS4', 'E4', 'F4', 'FS4', 'G4', 'GS4', 'A4', 'AS4', 'B4',
-    'C5', 'CS5', 'D5', 'DS5', 'E5', 'F5', 'FS5', 'G5', 'GS5', 'A5', 'AS5', 'B5',
-    'C6', 'CS6', 'D6', 'DS6', 'E6', 'F6', 'FS6', 'G6', 'GS6', 'A6', 'AS6', 'B6',
-    'C7', 'CS7', 'D7', 'DS7', 'E7', 'F7', 'FS7', 'G7', 'GS7', 'A7', 'AS7', 'B7',
-    'C8', 'CS8', 'D8', 'DS8', 'E8', 'F8', 'FS8', 'G8', 'GS8', 'A8', 'AS8', 'B8',
-    'C9', 'CS9', 'D9', 'DS9', 'E9', 'F9', 'FS9', 'G9'
-]
@@ -0,0 +1,112 @@
+"""
+------------------------------------------------------------------------------
+The MIT License (MIT)
+Copyright (c) 2016 Newcastle University
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.import time
+------------------------------------------------------------------------------
+Author
+Kenji Kawase, Artec Co., Ltd.
+------------------------------------------------------------------------------
+"""
+import io
+import json
+import os
+
+# for singleton pattern
+# Implement used global value,
+# maybe Micropython 'function' object can't have attribute...
+__config = {}
+
+
+def get_config_object(filename):
+    global __config
+
+    if filename not in __config:
+        __config[filename] = ConfigStore(filename)
+    return __config[filename]
+
+
+class ConfigStore:
+    """Key/value store persisted as a JSON file.
+
+    The file is parsed once and kept in memory. set() only stages a value;
+    commit() (or update()) writes every staged key at once to a temporary
+    file which then replaces the original.
+    """
+    def __init__(self, filename):
+        self._filename = filename
+        self._tmpname = filename + '.tmp'
+        self._data = None
+        self._dirty = False
+
+    def _load(self):
+        if self._data is not None:
+            return self._data
+
+        s = self.__read(self._filename)
+        if s is None:
+            # A commit was interrupted after the original was removed.
+            s = self.__read(self._tmpname)
+
+        try:
+            data = json.loads(s) if s else {}
+        except ValueError as e:
+            data = {}
+
+        self._data = data if isinstance(data, dict) else {}
+        return self._data
+
+    def __read(self, filename):
+        try:
+            f = io.open(filename, mode='r')
+            s = f.read()
+            f.close()
+            return s
+        except OSError as e:
+            return None
+
+    def get(self, key, default=None):
+        return self._load().get(key, default)
+
+    def set(self, key, value):
+        data = self._load()
+        if key not in data or data[key] != value:
+            data[key] = value
+            self._dirty = True
+
+    def update(self, values):
+        """Set several keys and write them with a single commit. """
+        for key in values:
+            self.set(key, values[key])
+        self.commit()
+
+    def commit(self):
+        if not self._dirty:
+            return
+
+        f = io.open(self._tmpname, mode='w')
+        f.write(json.dumps(self._data))
+        f.close()
+
+        try:
+            os.rename(self._tmpname, self._filename)
+        except OSError as e:
+            # FAT can't rename over an existing file.
+            os.remove(self._filename)
+            os.rename(self._tmpname, self._filename)
+
+        self._dirty = False
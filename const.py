@@ -2,6 +2,9 @@ import machine
 
 CONFIG_FILE = 'config.json'
 
+# Shared I2C bus clock (Hz). ICM20948 runs up to 1MHz fast-mode plus.
+I2C_FREQ = 400000
+
 
 class BuiltinColor:
     BLACK = 0x000000
@@ -24,9 +24,11 @@ We used the script below as reference
 https://github.com/casnortheast/microbit_stub/
 ------------------------------------------------------------------------------
 """
-from image import StuduinoBitImage as Image
+from image import StuduinoBitImage as Image, _NO_COLOR
+from image_const3 import character_rows, character_image
 from machine import Pin
 from neopixel import NeoPixel
+import sys
 import time
 import _thread
 from const import *
@@ -56,21 +58,46 @@ class StuduinoBitDisplay(BuiltinColor):
     def get_pixel(self, x, y):
         return self.__display.get_pixel(x, y)
 
-    def set_pixel(self, x, y, color):
-        self.__display.set_pixel(x, y, color)
+    def set_pixel(self, x, y, color, flush=True):
+        self.__display.set_pixel(x, y, color, flush=flush)
+
+    def show_buffer(self):
+        self.__display.show_buffer()
+
+    def show_mask(self, mask, palette):
+        self.__display.show_mask(mask, palette)
+
+    def batch(self):
+        return self.__display.batch()
 
     def clear(self):
         self.__display.clear()
 
     def show(self, iterable, delay=400, *,
-             wait=True, loop=False, clear=False, color=None):
+             wait=True, loop=False, clear=False, color=None, queue=False):
         self.__display.show(iterable, delay=delay, wait=wait,
-                            loop=loop, clear=clear, color=color)
+                            loop=loop, clear=clear, color=color, queue=queue)
 
     def scroll(self, string, delay=150, *,
-               wait=True, loop=False, monospace=False, color=None):
+               wait=True, loop=False, monospace=False, color=None,
+               queue=False):
         self.__display.scroll(string, delay=delay, wait=wait, loop=loop,
-                              monospace=monospace, color=color)
+                              monospace=monospace, color=color, queue=queue)
+
+    def frame_stats(self, reset=False):
+        return self.__display.frame_stats(reset)
+
+    def set_brightness(self, level):
+        self.__display.set_brightness(level)
+
+    def get_brightness(self):
+        return self.__display.get_brightness()
+
+    def set_gamma(self, gamma):
+        self.__display.set_gamma(gamma)
+
+    def fade(self, level, duration=300, steps=10):
+        self.__display.fade(level, duration=duration, steps=steps)
 
     def on(self):
         self.__display.on()
@@ -82,6 +109,164 @@ class StuduinoBitDisplay(BuiltinColor):
         return self.__display.is_on()
 
 
+""" ---------------------------------------------------------------------- """
+""" Frame pacing --------------------------------------------------------- """
+
+
+class _FrameStats:
+    """Counts frames and how late they were against their deadline.
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.frames = 0
+        self.overrun_total = 0
+        self.overrun_max = 0
+
+    def add(self, late):
+        self.frames += 1
+        if late > 0:
+            self.overrun_total += late
+            self.overrun_max = max(self.overrun_max, late)
+
+    def get(self):
+        mean = self.overrun_total / self.frames if self.frames else 0
+        return self.frames, mean, self.overrun_max
+
+
+class _FramePacer:
+    """Schedules frames on absolute ticks_ms deadlines.
+
+    Render time is taken out of the frame's delay instead of being added to
+    it, so a long animation keeps its overall timing. A frame running more
+    than a whole frame late drops the schedule instead of rushing frames.
+    """
+    def __init__(self, stats):
+        self._stats = stats
+        self._deadline = time.ticks_ms()
+
+    def start(self):
+        self._deadline = time.ticks_ms()
+
+    def next(self, delay):
+        """Returns the ms to wait before rendering the frame after one
+        shown for delay ms.
+        """
+        self._deadline = time.ticks_add(self._deadline, delay)
+        now = time.ticks_ms()
+        wait = time.ticks_diff(self._deadline, now)
+        self._stats.add(-wait)
+        if wait < -delay:
+            self._deadline = now
+        return max(wait, 0)
+
+
+""" ---------------------------------------------------------------------- """
+""" Animation scheduler -------------------------------------------------- """
+
+# __step() result when the animation changed and no frame was rendered
+_NO_FRAME = -1
+
+
+def _print_exception(e):
+    # sys.print_exception() only exists on MicroPython
+    print_exception = getattr(sys, 'print_exception', None)
+    if print_exception is not None:
+        print_exception(e)
+    else:
+        print(repr(e))
+
+
+class _AnimationScheduler:
+    """Plays display animations on a single background thread.
+
+    An animation is a function returning an iterator which renders a frame
+    and yields how many ms it stays on the display. Animations wait in a
+    queue; play() with replace cancels the current one and the queue.
+    While the queue is empty the thread blocks on _wake.
+    """
+    __SLICE_MS = 20     # how quickly a sleeping animation notices cancel()
+
+    def __init__(self, stats):
+        self._pacer = _FramePacer(stats)
+        self._lock = _thread.allocate_lock()
+        self._wake = _thread.allocate_lock()    # released by play()
+        self._wake.acquire()
+        self._queue = []            # [(frames, loop)]
+        self._entry = None          # (frames, loop) of the current animation
+        self._current = None        # its iterator
+        self._rendered = False      # it rendered a frame since (re)start
+        self._started = False
+
+    def play(self, frames, loop=False, replace=True):
+        with self._lock:
+            if replace:
+                self._queue = []
+                self._current = None
+            self._queue.append((frames, loop))
+            if not self._started:
+                self._started = True
+                _thread.start_new_thread(self.__run, ())
+            elif self._wake.locked():
+                self._wake.release()
+
+    def cancel(self):
+        """Stop the current animation and drop the queue. No frame of them
+        is rendered after this returns.
+        """
+        with self._lock:
+            self._queue = []
+            self._current = None
+
+    def is_busy(self):
+        return self._current is not None or len(self._queue) != 0
+
+    def __step(self):
+        """Render the next frame and return its delay, None when idle.
+        """
+        with self._lock:
+            if self._current is None:
+                if not self._queue:
+                    return None
+                self._entry = self._queue.pop(0)
+                self._current = self._entry[0]()
+                self._rendered = False
+                self._pacer.start()
+            try:
+                delay = next(self._current)
+                self._rendered = True
+                return delay
+            except StopIteration:
+                # A looping animation runs until something is queued, one
+                # without any frame is dropped instead of spinning.
+                if self._entry[1] and self._rendered and not self._queue:
+                    self._current = self._entry[0]()
+                    self._rendered = False
+                    return _NO_FRAME
+            except Exception as e:
+                # Drop the broken animation, keep the scheduler running
+                _print_exception(e)
+            self._current = None
+            return _NO_FRAME
+
+    def __run(self):
+        while True:
+            delay = self.__step()
+            if delay is None:
+                self._wake.acquire()    # until play() queues something
+                continue
+            if delay == _NO_FRAME:
+                continue
+
+            current = self._current
+            delay = self._pacer.next(delay)
+            while delay > 0 and self._current is current:
+                ms = min(delay, _AnimationScheduler.__SLICE_MS)
+                time.sleep_ms(ms)
+                delay -= ms
+
+
 """ ---------------------------------------------------------------------- """
 """ The LED display ------------------------------------------------------ """
 
@@ -92,6 +277,8 @@ class __SBDisplay(BuiltinColor):
     There is a single display object that has an image.
     """
     __PIX_MAXCOLOR_FACTOR = 31
+    __SCROLL_CACHE_SIZE = 4
+    __BRIGHTNESS_MAX = 9
 
     def __init__(self):
         """Initialise the display.
@@ -102,22 +289,133 @@ class __SBDisplay(BuiltinColor):
         self.__controlPin = Pin(4, Pin.OUT)
         self.__np = NeoPixel(self.__controlPin, 25)
         self.__np.fill((0, 0, 0))
+
+        # Frames are rendered into __frame, laid out like the NeoPixel
+        # buffer, and only written out when they differ from __shown, the
+        # colors on the LEDs before brightness and gamma.
+        np = self.__np
+        self.__frame = bytearray(len(np.buf))
+        self.__shown = bytearray(len(np.buf))
+        self.__blank = bytes(len(np.buf))
+        self.__bpp = np.bpp
+        self.__rgb_order = (np.ORDER[0], np.ORDER[1], np.ORDER[2])
+        # Byte offset in the buffer of display pixel (x, y) at y*5+x
+        self.__buf_index = bytearray(
+            [(4 - x) * 5 * np.bpp + y * np.bpp
+             for y in range(5) for x in range(5)])
         self.__powerPin.value(True)
         self.__on = True
 
-        self.__bgthid = -1
+        # Brightness and gamma are applied through __lut while copying
+        # __shown to the NeoPixel buffer; None means the identity.
+        self.__brightness = __SBDisplay.__BRIGHTNESS_MAX
+        self.__gamma = 1.0
+        self.__gamma_lut = bytearray(range(256))
+        self.__lut = None
+
+        self.__frame_stats = _FrameStats()
+        self.__scheduler = _AnimationScheduler(self.__frame_stats)
+        self.__batch = 0
+        self.__scroll_cache = []    # [(string, strip)], most recent first
 
     def __print(self, image, color):
         """Output to the display.
         """
-        for x in range(image.width()):
-            for y in range(image.height()):
-                val = image.get_pixel_color(x, y)
-                if (val != (0, 0, 0)) and (color is not None):
-                    val = color
-                pos = abs(x-4) * 5 + y
-                self.__np[pos] = val
-        self.__np.write()
+        width, height, pix, colors, base = image._pixels()
+        if color is not None:
+            color = _rgb_24bit(color)
+
+        frame = self.__frame
+        frame[:] = self.__blank
+        index = self.__buf_index
+        r, g, b = self.__rgb_order
+        for y in range(min(height, 5)):
+            i = y * width
+            for x in range(min(width, 5)):
+                if pix[i + x]:
+                    val = base
+                    if colors is not None and colors[i + x] != _NO_COLOR:
+                        val = colors[i + x]
+                    if val and color is not None:
+                        val = color
+                    pos = index[y * 5 + x]
+                    frame[pos + r] = (val >> 16) & 0xff
+                    frame[pos + g] = (val >> 8) & 0xff
+                    frame[pos + b] = val & 0xff
+        self.__flush_frame()
+
+    def __flush_frame(self):
+        """Write the rendered frame out unless the LEDs already show it.
+        """
+        if self.__shown != self.__frame:
+            self.__shown[:] = self.__frame
+            self.__output()
+
+    def __output(self):
+        """Copy __shown to the NeoPixel buffer through the LUT and write it.
+        """
+        np = self.__np
+        lut = self.__lut
+        if lut is None:
+            np.buf[:] = self.__shown
+        else:
+            buf = np.buf
+            shown = self.__shown
+            for i in range(len(shown)):
+                buf[i] = lut[shown[i]]
+        np.write()
+
+    def __update_lut(self):
+        level = self.__brightness
+        if level == __SBDisplay.__BRIGHTNESS_MAX and self.__gamma == 1.0:
+            self.__lut = None
+            return
+
+        scale = int(level * 256 / __SBDisplay.__BRIGHTNESS_MAX + 0.5)
+        gamma_lut = self.__gamma_lut
+        lut = self.__lut if self.__lut is not None else bytearray(256)
+        for i in range(256):
+            lut[i] = (gamma_lut[i] * scale + 128) >> 8
+        self.__lut = lut
+
+    def set_brightness(self, level):
+        """Set the brightness of the whole display, 0 (off) to 9 (full).
+
+        Fractional levels are allowed for smooth fades. Only the current
+        frame is re-mapped, so changing it costs about as much as one
+        refresh.
+        """
+        if level < 0 or level > __SBDisplay.__BRIGHTNESS_MAX:
+            raise ValueError('brightness must be 0-9')
+        self.__brightness = level
+        self.__update_lut()
+        self.__output()
+
+    def get_brightness(self):
+        return self.__brightness
+
+    def set_gamma(self, gamma):
+        """Set the gamma correction applied to every color channel.
+        1.0 disables it.
+        """
+        if gamma <= 0:
+            raise ValueError('gamma must be more than 0')
+        m = __SBDisplay.__PIX_MAXCOLOR_FACTOR
+        self.__gamma = gamma
+        self.__gamma_lut = bytearray(
+            [min(255, int(m * pow(i / m, gamma) + 0.5)) for i in range(256)])
+        self.__update_lut()
+        self.__output()
+
+    def fade(self, level, duration=300, steps=10):
+        """Fade the brightness to level over duration ms.
+        """
+        start = self.__brightness
+        pacer = _FramePacer(_FrameStats())
+        for i in range(1, steps + 1):
+            self.set_brightness(start + (level - start) * i / steps)
+            if i < steps:
+                time.sleep_ms(pacer.next(duration // steps))
 
     def get_pixel(self, x, y):
         """Gets the brightness of LED pixel (x,y).
@@ -128,11 +426,16 @@ class __SBDisplay(BuiltinColor):
             raise ValueError('index out of bounds')
 
         pos = abs(x-4) * 5 + y
-        val = self.__np[pos]
-        return val
+        o = pos * self.__bpp
+        r, g, b = self.__rgb_order
+        shown = self.__shown
+        return shown[o + r], shown[o + g], shown[o + b]
 
-    def set_pixel(self, x, y, color):
+    def set_pixel(self, x, y, color, flush=True):
         """Set the dsplay at LED pixel (x,y) to color.
+
+        If flush is False, or inside a batch(), the change is only made in
+        the buffer and shows up with the next show_buffer().
             """
         if (type(color) is tuple) or (type(color) is list):
             val = color
@@ -151,48 +454,126 @@ class __SBDisplay(BuiltinColor):
                              format(__SBDisplay.__PIX_MAXCOLOR_FACTOR))
 
         pos = abs(x-4) * 5 + y
+        o = pos * self.__bpp
+        r, g, b = self.__rgb_order
+        shown = self.__shown
+        shown[o + r] = val[0]
+        shown[o + g] = val[1]
+        shown[o + b] = val[2]
+        lut = self.__lut
+        if lut is not None:
+            val = (lut[val[0]], lut[val[1]], lut[val[2]])
         self.__np[pos] = val
+        if flush and not self.__batch:
+            self.__np.write()
+            time.sleep_ms(1)
+
+    def show_buffer(self):
+        """Write pixels set with flush=False out to the LEDs.
+        """
         self.__np.write()
-        time.sleep_ms(1)
+
+    def show_mask(self, mask, palette):
+        """Show a frame given as 25 bytes, mask[y*5+x] is 0 for an unlit
+        pixel or n to light it with palette[n-1], a #RGB color.
+
+        This is the cheap path for widgets that redraw at the sensor rate,
+        the frame is only written out if it changed.
+        """
+        self.__scheduler.cancel()
+        frame = self.__frame
+        frame[:] = self.__blank
+        index = self.__buf_index
+        r, g, b = self.__rgb_order
+        for i in range(25):
+            n = mask[i]
+            if n:
+                val = palette[n - 1]
+                pos = index[i]
+                frame[pos + r] = (val >> 16) & 0xff
+                frame[pos + g] = (val >> 8) & 0xff
+                frame[pos + b] = val & 0xff
+        self.__flush_frame()
+
+    def batch(self):
+        """Coalesce set_pixel calls into one refresh.
+
+        Usage:
+        with display.batch():
+            for x in range(5):
+                display.set_pixel(x, 2, 0x1f0000)
+        """
+        return self
+
+    def __enter__(self):
+        self.__batch += 1
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        self.__batch -= 1
+        if not self.__batch:
+            self.show_buffer()
 
     def clear(self):
-        """Clear the display.
+        """Clear the display and stop any background animation.
         """
-        if self.__bgthid != -1:
-            self.__bgthid = -1
+        self.__scheduler.cancel()
+        self.__clear()
 
+    def __clear(self):
         self.__last_image = Image(5, 5)
+        self.__shown[:] = self.__blank
         self.__np.fill((0, 0, 0))
         self.__np.write()
 
-    def show(self, iterable, delay=400, *,
-             wait=True, loop=False, clear=False, color=None):
-        if wait:
-            if loop:
-                self.__show_loop(iterable, delay=delay,
-                                 clear=clear, color=color)
-            else:
-                self.__one_show(iterable, delay=delay,
-                                clear=clear, color=color)
-        else:
-            if loop:
-                _thread.start_new_thread(self.__show_loop, (iterable, delay),
-                                         {'clear': clear, 'color': color})
-            else:
-                _thread.start_new_thread(self.__one_show, (iterable, delay),
-                                         {'clear': clear, 'color': color})
-
-    def __show_loop(self, iterable, delay, *, clear=False, color=None):
+    def __color(self, color):
+        if (type(color) is tuple) or (type(color) is list):
+            return color
+        elif (type(color) is int):
+            return _24bit_rgb(color)
+        elif color is not None:
+            raise TypeError('color takes a (R,G,B) or [R,G,B] or #RGB')
+        return None
+
+    def __play(self, frames, wait, loop, queue):
+        """Run an animation, frames() returns an iterator which renders a
+        frame and yields how many ms it stays on the display.
+
+        With wait, it is played on the caller's thread, stopping any
+        background animation first. Otherwise the background scheduler
+        plays it, replacing the current animation unless queue is True.
+        """
+        if not wait:
+            self.__scheduler.play(frames, loop=loop, replace=not queue)
+            return
+
+        self.__scheduler.cancel()
+        pacer = _FramePacer(self.__frame_stats)
         while True:
-            self.__one_show(iterable, delay=delay, clear=clear, color=color)
+            for delay in frames():
+                time.sleep_ms(pacer.next(delay))
+            if not loop:
+                break
+
+    def frame_stats(self, reset=False):
+        """Returns (frames, mean overrun ms, max overrun ms) of the frames
+        shown by show() and scroll() since the last reset.
+        """
+        stats = self.__frame_stats.get()
+        if reset:
+            self.__frame_stats.reset()
+        return stats
 
-    def __one_show(self, iterable, delay, *, clear=False, color=None):
+    def show(self, iterable, delay=400, *,
+             wait=True, loop=False, clear=False, color=None, queue=False):
         """Show images or a string on the display.
 
         Shows the images an image at a time or a string a character at a time,
         with delay milliseconds between image/character.
         If loop is True, loop forever.
         If clear is True, clear the screen after showing.
+        If wait is False the animation runs in the background; it replaces
+        the current background animation unless queue is True.
         Usage:
         shows an image:
         display.show(image, delay=0, wait=True, loop=False, clear=False)
@@ -202,63 +583,38 @@ class __SBDisplay(BuiltinColor):
         if iterable is None:
             raise TypeError('not iterable')
 
-        if not iterable:
-            return
-
-        val = color
-        if (type(color) is tuple) or (type(color) is list):
-            val = color
-        elif (type(color) is int):
-            val = _24bit_rgb(color)
-        elif color is not None:
-            raise TypeError('color takes a (R,G,B) or [R,G,B] or #RGB')
+        val = self.__color(color)
 
         if isinstance(iterable, str):
-            iterable = [Image(Image.CHARACTER_MAP.
-                        get(c, Image.CHARACTER_MAP.get('?')))
-                        for c in iterable]
+            iterable = [character_image(c) for c in iterable]
 
         if isinstance(iterable, Image):
             iterable = [iterable]
 
+        def frames():
+            return self.__show_frames(iterable, delay, clear, val)
+
+        self.__play(frames, wait, loop, queue)
+
+    def __show_frames(self, iterable, delay, clear, color):
+        if not iterable:
+            return
+
         for img in iterable:
             # if img != self.__last_image:
-            self.__print(img, val)
+            self.__print(img, color)
             self.__last_image = img
-            time.sleep_ms(delay)
+            yield delay
 
         if clear:
-            self.clear()
+            self.__clear()
 
     def scroll(self, string, delay=150, *,
-               wait=True, loop=False, monospace=False, color=None):
-        if wait:
-            if loop:
-                self.__scroll_loop(string, delay=delay,
-                                   monospace=monospace, color=color)
-            else:
-                self.__one_scroll(string, delay=delay,
-                                  monospace=monospace, color=color)
-        else:
-            if loop:
-                _thread.start_new_thread(self.__scroll_loop, (string, delay),
-                                         {'monospace': monospace,
-                                         'color': color})
-            else:
-                _thread.start_new_thread(self.__one_scroll, (string, delay),
-                                         {'monospace': monospace,
-                                         'color': color})
-
-    def __scroll_loop(self, string, delay, *, monospace, color):
-        while True:
-            self.__one_scroll(string, delay=delay,
-                              monospace=monospace, color=color)
-
-    def __one_scroll(self, string, delay, *, monospace, color):
+               wait=True, loop=False, monospace=False, color=None,
+               queue=False):
         """Scroll the string across the display with given delay.
 
-        In this emulation this is the same as showing the string and clearing
-        the screen.
+        wait, loop and queue work as for show().
         """
         # _thread.allowsuspend(True)
 
@@ -266,43 +622,87 @@ class __SBDisplay(BuiltinColor):
             raise TypeError('can\'t convert ', type(string),
                             'to str implicitly')
 
-        val = color
-        if (type(color) is tuple) or (type(color) is list):
-            val = color
-        elif (type(color) is int):
-            val = _24bit_rgb(color)
-        elif color is not None:
-            raise TypeError('color takes a (R,G,B) or [R,G,B] or #RGB')
+        val = self.__color(color)
+        if val is None:
+            val = _24bit_rgb(BuiltinColor.RED)     # glyph base color
+
+        def frames():
+            return self.__scroll_frames(string, delay, val)
 
-        disp_string = ' ' + string + ' '
-        for i in range(len(disp_string)-1):
-            curr = Image(Image.CHARACTER_MAP.get(disp_string[i],
-                         Image(Image.CHARACTER_MAP.get('?'))))
-            next = Image(Image.CHARACTER_MAP.get(disp_string[i+1],
-                         Image(Image.CHARACTER_MAP.get('?'))))
-            for i in range(5):
-                time.sleep_ms(delay)
-                bc = curr.__get_base_color()
-                img = curr.shift_left(i) + next.shift_right(5-i)
-                img.set_base_color(bc)
+        self.__play(frames, wait, loop, queue)
 
-                self.__print(img, val)
-                time.sleep_ms(delay)
+    def __scroll_frames(self, string, delay, color):
+        strip = self.__scroll_strip(string)
+        for offset in range(len(strip) - 5):
+            self.__print_columns(strip, offset, color)
+            yield delay
 
-        self.clear()
+        self.__clear()
+
+    def __scroll_strip(self, string):
+        """Returns the string as one byte per display column, bit y set if
+        row y is lit, padded with a blank character on each side.
+
+        Recently scrolled strings are kept so repeating them is free.
+        """
+        cache = self.__scroll_cache
+        for i, item in enumerate(cache):
+            if item[0] == string:
+                if i:
+                    cache.insert(0, cache.pop(i))
+                return item[1]
+
+        strip = bytearray(5 * (len(string) + 2))
+        for i, c in enumerate(string):
+            rows = character_rows(c)
+            if rows is None:
+                rows = character_rows('?')
+            base = 5 * (i + 1)
+            for y, r in enumerate(rows):
+                for x in range(5):
+                    if (r >> (4 - x)) & 1:
+                        strip[base + x] |= 1 << y
+
+        cache.insert(0, (string, strip))
+        del cache[__SBDisplay.__SCROLL_CACHE_SIZE:]
+        return strip
+
+    def __print_columns(self, strip, offset, color):
+        """Output the 5 columns of strip starting at offset.
+        """
+        frame = self.__frame
+        frame[:] = self.__blank
+        index = self.__buf_index
+        r, g, b = self.__rgb_order
+        for x in range(5):
+            col = strip[offset + x]
+            for y in range(5):
+                if (col >> y) & 1:
+                    pos = index[y * 5 + x]
+                    frame[pos + r] = color[0]
+                    frame[pos + g] = color[1]
+                    frame[pos + b] = color[2]
+        self.__flush_frame()
 
     def on(self):
         if self.__on:
             return
         self.__on = True
         self.__powerPin.value(self.__on)
+        # The LEDs lost their state, don't let the unchanged frame be skipped
+        self.__shown[:] = self.__blank
+        self.__np.buf[:] = self.__blank
         self.show(self.__last_image)
 
     def off(self):
+        # Keep a copy of the LEDs, the last image may be shared (a glyph or
+        # a built-in image) and must not be changed.
+        img = Image(5, 5)
         for x in range(5):
             for y in range(5):
                 val = self.get_pixel(x, y)
-                self.__last_image.set_pixel_color(x, y, val)
+                img.set_pixel_color(x, y, val)
+        self.__last_image = img
 
         self.__on = False
         self.__powerPin.value(self.__on)
@@ -36,6 +36,8 @@ _GYRO_CONFIG = const(0x01)
 _ACCEL_CONFIG = const(0x14)
 _ACCEL_CONFIG2 = const(0x15)
 _INT_PIN_CFG = const(0x0f)
+_INT_ENABLE_1 = const(0x11)
+_INT_STATUS_1 = const(0x1a)
 _ACCEL_XOUT_H = const(0x2d)
 _ACCEL_XOUT_L = const(0x2e)
 _ACCEL_YOUT_H = const(0x2f)
@@ -76,6 +78,9 @@ _I2C_BYPASS_MASK = const(0b00000010)
 _I2C_BYPASS_EN = const(0b00000010)
 _I2C_BYPASS_DIS = const(0b00000000)
 
+# Raw data ready interrupt (INT_ENABLE_1 / INT_STATUS_1)
+_RAW_DATA_0_RDY = const(0b00000001)
+
 SF_MG = 1000                # mG
 SF_M_S2 = 9.80665           # 1 g = 9.80665 m/s2 ie. standard gravity
 SF_DEG_S = 1                # deg / s
@@ -85,24 +90,25 @@ SF_RAD_S = 0.017453292519943  # 1 deg/s is 0.017453292519943 rad/s
 class ICM20948(ICMRegisterRW):
     ADDR = 0x68
     """Class which provides interface to ICM20948 ."""
-    def __init__(self, i2c):
-        super().__init__(i2c, ICM20948.ADDR)
+    def __init__(self, i2c, lock=None):
+        super().__init__(i2c, ICM20948.ADDR, lock)
 
         # for AK09916
-        buf3 = bytearray('\x00\x00\x00')
-        buf1 = bytearray('\x00')
-        self._i2c.readfrom_mem_into(ICM20948.ADDR, 0x00, buf1)
-        if buf1[0] != 0xea:
-            raise RuntimeError("ICM20948 not found in I2C bus.")
-        self._i2c.writeto_mem(ICM20948.ADDR, 0x06, b'\x01')  # wake
-        self._i2c.writeto_mem(ICM20948.ADDR, 0x0f, b'\x02')  # passthrough
-        self._i2c.writeto_mem(ICM20948.ADDR, 0x03, b'\x00')
-        self._i2c.scan()  # should now show 12
-
-        self._i2c.writeto_mem(12, 0x31, b'\x00')  # power down mode
-        self._i2c.readfrom_mem_into(12, 0x60, buf3)
-
-        self._ak09916 = AK09916(i2c)
+        buf3 = bytearray(3)
+        buf1 = bytearray(1)
+        with self.transaction():
+            self._i2c.readfrom_mem_into(ICM20948.ADDR, 0x00, buf1)
+            if buf1[0] != 0xea:
+                raise RuntimeError("ICM20948 not found in I2C bus.")
+            self._i2c.writeto_mem(ICM20948.ADDR, 0x06, b'\x01')  # wake
+            self._i2c.writeto_mem(ICM20948.ADDR, 0x0f, b'\x02')  # passthrough
+            self._i2c.writeto_mem(ICM20948.ADDR, 0x03, b'\x00')
+            self._i2c.scan()  # should now show 12
+
+            self._i2c.writeto_mem(12, 0x31, b'\x00')  # power down mode
+            self._i2c.readfrom_mem_into(12, 0x60, buf3)
+
+        self._ak09916 = AK09916(i2c, self._lock)
 
         self._accel_so = self._accel_fs(ACCEL_FS_SEL_2G)
         self._gyro_so = self._gyro_fs(GYRO_FS_SEL_250DPS)
@@ -110,11 +116,12 @@ class ICM20948(ICMRegisterRW):
         self._gyro_sf = SF_DEG_S
 
         # Enable I2C bypass to access for ICM20948 magnetometer access.
-        char = self.register_char(_INT_PIN_CFG)
-        char &= ~_I2C_BYPASS_MASK   # clear I2C bits
-        char |= _I2C_BYPASS_EN
+        with self.transaction():
+            char = self.register_char(_INT_PIN_CFG)
+            char &= ~_I2C_BYPASS_MASK   # clear I2C bits
+            char |= _I2C_BYPASS_EN
 
-        self.register_char(_INT_PIN_CFG, char)
+            self.register_char(_INT_PIN_CFG, char)
 
     def accel_fs(self, value):
         if value == '2g':
@@ -158,35 +165,36 @@ class ICM20948(ICMRegisterRW):
 
     def _gyro_dlpf(self, dlpfcfg=-1):
 
-        self.register_char(0x7f, 0x20)
-        # get ICM20948 gyro configuration.
-        char = self.register_char(_GYRO_CONFIG)
-        char &= _GYRO_FS_MASK   # clear DLDF bits
-
-        if dlpfcfg == -1:
-            char |= 0x00000000
-        elif dlpfcfg == 0:
-            char |= 0x00000001
-        elif dlpfcfg == 1:
-            char |= 0x00001001
-
-        elif dlpfcfg == 2:
-            char |= 0x00010001
-        elif dlpfcfg == 3:
-            char |= 0x00011001
-        elif dlpfcfg == 4:
-            char |= 0x00100001
-        elif dlpfcfg == 5:
-            char |= 0x00101001
-        elif dlpfcfg == 6:
-            char |= 0x00110001
-        elif dlpfcfg == 7:
-            char |= 0x00111001
-        else:
-            char |= 0x00000000
-
-        self.register_char(_GYRO_CONFIG, char)
-        self.register_char(0x7f, 0x00)
+        with self.transaction():
+            self.register_char(0x7f, 0x20)
+            # get ICM20948 gyro configuration.
+            char = self.register_char(_GYRO_CONFIG)
+            char &= _GYRO_FS_MASK   # clear DLDF bits
+
+            if dlpfcfg == -1:
+                char |= 0x00000000
+            elif dlpfcfg == 0:
+                char |= 0x00000001
+            elif dlpfcfg == 1:
+                char |= 0x00001001
+
+            elif dlpfcfg == 2:
+                char |= 0x00010001
+            elif dlpfcfg == 3:
+                char |= 0x00011001
+            elif dlpfcfg == 4:
+                char |= 0x00100001
+            elif dlpfcfg == 5:
+                char |= 0x00101001
+            elif dlpfcfg == 6:
+                char |= 0x00110001
+            elif dlpfcfg == 7:
+                char |= 0x00111001
+            else:
+                char |= 0x00000000
+
+            self.register_char(_GYRO_CONFIG, char)
+            self.register_char(0x7f, 0x00)
 
     @property
     def acceleration(self):
@@ -211,6 +219,21 @@ class ICM20948(ICMRegisterRW):
         xyz = self.register_three_shorts(_GYRO_XOUT_H)
         return tuple([value / so * sf for value in xyz])
 
+    @property
+    def motion(self):
+        """
+        Acceleration and gyro as a 6-tuple, read in a single 12 byte burst
+        so that both come from the same sample.
+        """
+        aso = self._accel_so
+        asf = self._accel_sf
+        gso = self._gyro_so
+        gsf = self._gyro_sf
+
+        v = self.register_six_shorts(_ACCEL_XOUT_H)
+        return (v[0] / aso * asf, v[1] / aso * asf, v[2] / aso * asf,
+                v[3] / gso * gsf, v[4] / gso * gsf, v[5] / gso * gsf)
+
     @property
     def magnetic(self):
         """
@@ -218,15 +241,37 @@ class ICM20948(ICMRegisterRW):
         """
         return self._ak09916.magnetic
 
+    def enable_data_ready(self):
+        """Latch the raw data ready flag read by data_ready. """
+        with self.transaction():
+            char = self.register_char(_INT_ENABLE_1)
+            self.register_char(_INT_ENABLE_1, char | _RAW_DATA_0_RDY)
+
+    @property
+    def data_ready(self):
+        """ True if a new sample arrived since the last call. """
+        return bool(self.register_char(_INT_STATUS_1) & _RAW_DATA_0_RDY)
+
+    def stream(self, rate=100, *, magnetic=True):
+        """Return an async iterator yielding samples at rate Hz.
+
+        Usage:
+        async for sample in imu.stream(100):
+            ax, ay, az, gx, gy, gz, mx, my, mz = sample
+        """
+        from icm_async import ICM20948Stream
+        return ICM20948Stream(self, rate, magnetic=magnetic)
+
     @property
     def whoami(self):
         """ Value of the whoami register. """
         return self.register_char(_WHO_AM_I)
 
     def _accel_fs(self, value):
-        self.register_char(0x7f, 0x20)
-        self.register_char(_ACCEL_CONFIG, value)
-        self.register_char(0x7f, 0x00)
+        with self.transaction():
+            self.register_char(0x7f, 0x20)
+            self.register_char(_ACCEL_CONFIG, value)
+            self.register_char(0x7f, 0x00)
 
         # Return the sensitivity divider
         if ACCEL_FS_SEL_2G == value:
@@ -240,9 +285,10 @@ class ICM20948(ICMRegisterRW):
 
     def _gyro_fs(self, value):
 
-        self.register_char(0x7f, 0x20)
-        self.register_char(_GYRO_CONFIG, value)
-        self.register_char(0x7f, 0x00)
+        with self.transaction():
+            self.register_char(0x7f, 0x20)
+            self.register_char(_GYRO_CONFIG, value)
+            self.register_char(0x7f, 0x00)
 
         # Return the sensitivity divider
         if GYRO_FS_SEL_250DPS == value:
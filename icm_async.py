@@ -0,0 +1,106 @@
+"""
+------------------------------------------------------------------------------
+The MIT License (MIT)
+Copyright (c) 2016 Newcastle University
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.import time
+------------------------------------------------------------------------------
+uasyncio streaming interface for ICM20948
+Author
+Kenji Kawase, Artec Co., Ltd.
+------------------------------------------------------------------------------
+"""
+try:
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio
+
+try:
+    from time import ticks_ms, ticks_add, ticks_diff
+except ImportError:
+    # CPython, e.g. running against a simulated bus
+    from time import monotonic
+
+    def ticks_ms():
+        return int(monotonic() * 1000)
+
+    def ticks_add(ticks, delta):
+        return ticks + delta
+
+    def ticks_diff(ticks1, ticks2):
+        return ticks1 - ticks2
+
+if hasattr(asyncio, 'sleep_ms'):
+    _sleep_ms = asyncio.sleep_ms
+else:
+    def _sleep_ms(ms):
+        return asyncio.sleep(ms / 1000)
+
+_DATA_READY_RETRY = 4   # ms to wait for data ready after the timer fires
+
+
+class ICM20948Stream:
+    """Async iterator yielding ICM20948 samples at a fixed rate.
+
+    Each sample is (ax, ay, az, gx, gy, gz, mx, my, mz). Accel and gyro
+    are read in one burst; other tasks run between the timer, the data
+    ready poll and the magnetometer read.
+    """
+    def __init__(self, icm20948, rate=100, *, magnetic=True):
+        if rate <= 0 or rate > 1000:
+            raise ValueError('rate must be 1-1000 Hz')
+
+        self._icm20948 = icm20948
+        self._period = max(1, 1000 // rate)
+        self._magnetic = magnetic
+        self._deadline = None
+        self._closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._closed:
+            raise StopAsyncIteration
+
+        icm = self._icm20948
+        if self._deadline is None:
+            icm.enable_data_ready()
+            self._deadline = ticks_ms()
+        else:
+            self._deadline = ticks_add(self._deadline, self._period)
+            wait = ticks_diff(self._deadline, ticks_ms())
+            if wait > 0:
+                await _sleep_ms(wait)
+            else:
+                # Overrun, resync instead of bursting to catch up.
+                self._deadline = ticks_ms()
+                await _sleep_ms(0)
+
+        for _ in range(_DATA_READY_RETRY):
+            if icm.data_ready:
+                break
+            await _sleep_ms(1)
+
+        motion = icm.motion
+        if not self._magnetic:
+            return motion + (0, 0, 0)
+
+        await _sleep_ms(0)
+        return motion + tuple(icm.magnetic)
+
+    def close(self):
+        self._closed = True
@@ -27,9 +27,25 @@ from micropython import const
 
 
 class ICMRegisterRW:
-    def __init__(self, i2c, address):
+    def __init__(self, i2c, address, lock=None):
+        """lock is the lock guarding i2c, normally bus.get_i2c_lock() of
+        the bus module that created i2c. Without one the top level bus
+        module's lock is used.
+        """
+        if lock is None:
+            from bus import get_i2c_lock
+            lock = get_i2c_lock()
         self._i2c = i2c
         self._address = address
+        self._lock = lock
+
+    def transaction(self):
+        """Hold the shared I2C bus across several register accesses.
+
+        Use it for multi-step sequences such as ICM20948 bank switching
+        (0x7f writes) that must not be interleaved with other threads.
+        """
+        return self._lock
 
     def register_short(self, register, value=None,
                        buf=bytearray(2), endian='b'):
@@ -38,12 +54,13 @@ class ICMRegisterRW:
         else:
             fmt = "<h"
 
-        if value is None:
-            self._i2c.readfrom_mem_into(self._address, register, buf)
-            return ustruct.unpack(fmt, buf)[0]
+        with self._lock:
+            if value is None:
+                self._i2c.readfrom_mem_into(self._address, register, buf)
+                return ustruct.unpack(fmt, buf)[0]
 
-        ustruct.pack_into(fmt, buf, 0, value)
-        return self._i2c.writeto_mem(self._address, register, buf)
+            ustruct.pack_into(fmt, buf, 0, value)
+            return self._i2c.writeto_mem(self._address, register, buf)
 
     def register_three_shorts(self, register, buf=bytearray(6), endian='b'):
         if endian is 'b':
@@ -51,13 +68,25 @@ class ICMRegisterRW:
         else:
             fmt = "<hhh"
 
-        self._i2c.readfrom_mem_into(self._address, register, buf)
-        return ustruct.unpack(fmt, buf)
+        with self._lock:
+            self._i2c.readfrom_mem_into(self._address, register, buf)
+            return ustruct.unpack(fmt, buf)
 
-    def register_char(self, register, value=None, buf=bytearray(1)):
-        if value is None:
+    def register_six_shorts(self, register, buf=bytearray(12), endian='b'):
+        if endian == 'b':
+            fmt = ">hhhhhh"
+        else:
+            fmt = "<hhhhhh"
+
+        with self._lock:
             self._i2c.readfrom_mem_into(self._address, register, buf)
-            return buf[0]
+            return ustruct.unpack(fmt, buf)
+
+    def register_char(self, register, value=None, buf=bytearray(1)):
+        with self._lock:
+            if value is None:
+                self._i2c.readfrom_mem_into(self._address, register, buf)
+                return buf[0]
 
-        ustruct.pack_into("<b", buf, 0, value)
-        return self._i2c.writeto_mem(self._address, register, buf)
+            ustruct.pack_into("<b", buf, 0, value)
+            return self._i2c.writeto_mem(self._address, register, buf)
@@ -0,0 +1,114 @@
+"""
+------------------------------------------------------------------------------
+The MIT License (MIT)
+Copyright (c) 2016 Newcastle University
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.import time
+------------------------------------------------------------------------------
+Background sampler for ICM20948
+Author
+Kenji Kawase, Artec Co., Ltd.
+------------------------------------------------------------------------------
+"""
+import array
+import _thread
+from time import sleep_ms, ticks_ms, ticks_add, ticks_diff
+
+_FRAME_LEN = 9      # accel xyz, gyro xyz, mag xyz
+
+
+class ICM20948Sampler:
+    """Samples ICM20948 on a background thread at a fixed rate.
+
+    The latest frame is published into a double buffer with a sequence
+    counter. Readers never touch the I2C bus and never take a lock; they
+    retry if the writer published a new frame while they were copying.
+    """
+    def __init__(self, icm20948, rate=100):
+        if rate <= 0 or rate > 1000:
+            raise ValueError('rate must be 1-1000 Hz')
+
+        self._icm20948 = icm20948
+        self._period = max(1, 1000 // rate)
+        self._buf = (array.array('f', [0] * _FRAME_LEN),
+                     array.array('f', [0] * _FRAME_LEN))
+        self._seq = 0
+        self._running = False
+        self._stop = False
+
+    def start(self):
+        if self._running:
+            return
+        self._stop = False
+        self._sample()      # publish a valid frame before returning
+        self._running = True
+        _thread.start_new_thread(self.__run, ())
+
+    def stop(self):
+        self._stop = True
+        while self._running:
+            sleep_ms(1)
+
+    def is_running(self):
+        return self._running
+
+    def _sample(self):
+        icm = self._icm20948
+        buf = self._buf[(self._seq + 1) & 1]
+        buf[0], buf[1], buf[2], buf[3], buf[4], buf[5] = icm.motion
+        buf[6], buf[7], buf[8] = icm.magnetic
+        self._seq += 1      # publish
+
+    def __run(self):
+        deadline = ticks_ms()
+        try:
+            while not self._stop:
+                self._sample()
+                deadline = ticks_add(deadline, self._period)
+                wait = ticks_diff(deadline, ticks_ms())
+                if wait > 0:
+                    sleep_ms(wait)
+                else:
+                    # Overrun, don't try to catch up with a burst of reads.
+                    deadline = ticks_ms()
+        finally:
+            self._running = False
+
+    def frame(self):
+        """Return (seq, (ax, ay, az, gx, gy, gz, mx, my, mz)) of the latest
+        coherent sample.
+        """
+        while True:
+            seq = self._seq
+            values = tuple(self._buf[seq & 1])
+            if seq == self._seq:
+                return seq, values
+
+    @property
+    def seq(self):
+        return self._seq
+
+    @property
+    def acceleration(self):
+        return self.frame()[1][0:3]
+
+    @property
+    def gyro(self):
+        return self.frame()[1][3:6]
+
+    @property
+    def magnetic(self):
+        return self.frame()[1][6:9]
@@ -31,9 +31,15 @@ from const import *
 """ ---------------------------------------------------------------------- """
 """ Images --------------------------------------------------------------- """
 
+# Marks a pixel without an individual color, it uses the base color.
+_NO_COLOR = -1
+
 
 class StuduinoBitImage(BuiltinColor):
     """Represents an image that can be displayed on the microbit screen.
+
+    Pixels are kept in a flat bytearray indexed by y*width+x. Individual
+    pixel colors, if any were set, live in a parallel array('l').
     """
     __SEP = ':'
     __WIDTH_DEFAULT = 5
@@ -51,8 +57,7 @@ class StuduinoBitImage(BuiltinColor):
         if width < 0 or height < 0:
             raise ValueError('image is incorrect size')
 
-        return [[StuduinoBitImage.__PIX_MIN for x in range(width)]
-                for y in range(height)]
+        return width, height, bytearray(width * height)
 
     def __default(args):
         return StuduinoBitImage.__fromsize([StuduinoBitImage.__WIDTH_DEFAULT,
@@ -64,7 +69,7 @@ class StuduinoBitImage(BuiltinColor):
             raise TypeError('Image(s) takes a string')
 
         if not s:
-            return []
+            return 0, 0, bytearray(0)
 
         t = s.replace(':', '')
 
@@ -77,26 +82,15 @@ class StuduinoBitImage(BuiltinColor):
         rows = s.rstrip(StuduinoBitImage.__SEP).split(StuduinoBitImage.__SEP)
         width = max([len(r) for r in rows])
 
-        arr = []
+        buf = bytearray(width * len(rows))   # short rows are padded with 0
+        i = 0
         for r in rows:
-            temp = []
-            if len(r) == width:
-                for char in r:
-                    if (int(char) > 0):
-                        temp.append(1)
-                    else:
-                        temp.append(0)
-            else:
-                for char in r:
-                    if (int(char) > 0):
-                        temp.append(1)
-                    else:
-                        temp.append(0)
-                for i in range(width - len(r)):
-                    temp.append(StuduinoBitImage.__PAD)
-            arr.append(temp)
+            for x, char in enumerate(r):
+                if char != '0':
+                    buf[i + x] = 1
+            i += width
 
-        return arr
+        return width, len(rows), buf
 
     def __frombuffer(args):
         width = args[0]
@@ -110,14 +104,13 @@ class StuduinoBitImage(BuiltinColor):
             raise ValueError('image data is incorrect size')
 
         if not buffer:
-            return []
+            return 0, 0, bytearray(0)
 
         # if buffer.typecode != 'b' and buffer.typecode != 'B':
         #     raise ValueError('image data is incorrect size')
-        return [[min(StuduinoBitImage.__PIX_MAX,
-                     max(StuduinoBitImage.__PIX_MIN, buffer[x]))
-                 for x in range(width*y, width*(y+1))]
-                for y in range(height)]
+        return width, height, bytearray(
+            [min(StuduinoBitImage.__PIX_MAX,
+                 max(StuduinoBitImage.__PIX_MIN, v)) for v in buffer])
 
     __CREATE_IMAGE = [__default, __fromstring, __fromsize, __frombuffer]
 
@@ -136,7 +129,8 @@ class StuduinoBitImage(BuiltinColor):
 
         if idx > 3:
             raise TypeError('function expected at most 3 arguments, got '+idx)
-        self.__image = StuduinoBitImage.__CREATE_IMAGE[idx](args)
+        self.__width, self.__height, self.__image = \
+            StuduinoBitImage.__CREATE_IMAGE[idx](args)
         self.__base_color = 0x1f0000
         if len(kwargs) != 0:
             if 'color' in kwargs:
@@ -144,24 +138,54 @@ class StuduinoBitImage(BuiltinColor):
             else:
                 raise TypeError('Unexpected **kwargs: %r' % kwargs)
 
-        self.__color = {}
+        self.__color = None
+
+    def __new_color(self):
+        return array.array('l', [_NO_COLOR] * len(self.__image))
+
+    def __blank(self):
+        """Returns an image of the same size and base color with no pixels.
+        """
+        img = StuduinoBitImage(self.__width, self.__height)
+        img.__base_color = self.__base_color
+        return img
+
+    def _load_rows(self, rows):
+        """Fill the image from packed rows, one byte per row with the
+        leftmost column in the highest bit.
+        """
+        width = self.__width
+        buf = self.__image
+        i = 0
+        for r in rows:
+            for x in range(width):
+                buf[i + x] = (r >> (width - 1 - x)) & 1
+            i += width
+
+    def _pixels(self):
+        """Returns (width, height, brightness, colors, base color) for
+        renderers. colors is None if no individual color was set, else
+        _NO_COLOR marks pixels drawn with the base color.
+        """
+        return (self.__width, self.__height, self.__image, self.__color,
+                self.__base_color)
 
     def width(self):
         """Returns the width of the image (usually 5).
         """
-        return 0 if (not self.__image) else len(self.__image[0])
+        return self.__width
 
     def height(self):
         """Returns the height of the image (usually 5).
         """
-        return len(self.__image)
+        return self.__height
 
     def set_pixel(self, x, y, value):
         """Set the pixel at position (x,y) to value.
 
         value must be between 0 and 9.
         """
-        if y < 0 or x < 0 or x >= self.width() or y >= self.height():
+        if y < 0 or x < 0 or x >= self.__width or y >= self.__height:
             raise ValueError('index out of bounds')
 
         if(value < StuduinoBitImage.__PIX_MIN or
@@ -169,9 +193,9 @@ class StuduinoBitImage(BuiltinColor):
             raise ValueError('value out of bounds')
 
         if value == 0:
-            self.__image[y][x] = 0
+            self.__image[y * self.__width + x] = 0
         else:
-            self.__image[y][x] = 1
+            self.__image[y * self.__width + x] = 1
 
     def __color_checker(self, color_value):
         rgb = _24bit_rgb(color_value)
@@ -198,42 +222,43 @@ class StuduinoBitImage(BuiltinColor):
         else:
             raise TypeError('color takes a (R,G,B) or [R,G,B] or #RGB')
 
-        if y < 0 or x < 0 or x >= self.width() or y >= self.height():
+        if y < 0 or x < 0 or x >= self.__width or y >= self.__height:
             raise ValueError('index out of bounds')
 
         if self.__color_checker(_color) is False:
             raise ValueError('color out of bounds')
 
-        # pos = abs(x-(self.width()-1)) * self.height() + y + 1
-        self.__color[(x, y)] = _color
-        self.__image[y][x] = 1
+        if self.__color is None:
+            self.__color = self.__new_color()
+
+        i = y * self.__width + x
+        self.__color[i] = _color
+        self.__image[i] = 1
 
     def get_pixel(self, x, y):
         """Return the value of the pixel at position (x, y).
 
         The value will be between 0 and 9.
         """
-        if y < 0 or x < 0 or x >= self.width() or y >= self.height():
+        if y < 0 or x < 0 or x >= self.__width or y >= self.__height:
             raise ValueError('index out of bounds')
 
-        try:
-            return self.__image[y][x]
-        except IndexError as e:
-            raise IndexError('index out of Image')
+        return self.__image[y * self.__width + x]
 
     def get_pixel_color(self, x, y, hex=False):
         """Return the value of the pixel at position (x, y).
 
         The value will be between 0 and 9.
         """
-        if y < 0 or x < 0 or x >= self.width() or y >= self.height():
+        if y < 0 or x < 0 or x >= self.__width or y >= self.__height:
             raise ValueError('index out of bounds')
 
-        if self.__image[y][x] != 0:
-            # pos = abs(x-(self.width()-1)) * self.height() + y + 1
-            if (x, y) in self.__color.keys():
-                val = self.__color[(x, y)]
-            else:
+        i = y * self.__width + x
+        if self.__image[i] != 0:
+            val = _NO_COLOR
+            if self.__color is not None:
+                val = self.__color[i]
+            if val == _NO_COLOR:
                 val = self.__base_color
 
             if hex:
@@ -264,114 +289,83 @@ class StuduinoBitImage(BuiltinColor):
     def __get_base_color(self):
         return _24bit_rgb(self.__base_color)
 
-    def shift_left(self, n):
-        """Returns a new image created by shifting the image left n times.
+    def __shift_x(self, n):
+        """Shift by n columns, to the left if n is positive.
         """
-        if n < 0:
-            return self.shift_right(-n)
-
-        width = self.width()
-
-        img = StuduinoBitImage(width, self.height())
-        img.__base_color = self.__base_color
-
-        if n < width:
-            img.__image = [row[n:len(row)] + [0 for i in range(n)]
-                           for row in self.__image]
-
-            for p in self.__color.keys():
-                sx = p[0]-n
-                y = p[1]
-                if sx >= 0:
-                    img.__color[(sx, y)] = self.__color[p]
+        width = self.__width
+        img = self.__blank()
+        if abs(n) >= width:
+            return img
+
+        if self.__color is not None:
+            img.__color = img.__new_color()
+
+        src = n if n > 0 else 0
+        dst = 0 if n > 0 else -n
+        count = width - abs(n)
+        for y in range(0, len(self.__image), width):
+            img.__image[y+dst:y+dst+count] = self.__image[y+src:y+src+count]
+            if self.__color is not None:
+                img.__color[y+dst:y+dst+count] = \
+                    self.__color[y+src:y+src+count]
+        return img
 
+    def __shift_y(self, n):
+        """Shift by n rows, up if n is positive.
+        """
+        width = self.__width
+        height = self.__height
+        img = self.__blank()
+        if abs(n) >= height:
+            return img
+
+        if self.__color is not None:
+            img.__color = img.__new_color()
+
+        src = (n if n > 0 else 0) * width
+        dst = (0 if n > 0 else -n) * width
+        count = (height - abs(n)) * width
+        img.__image[dst:dst+count] = self.__image[src:src+count]
+        if self.__color is not None:
+            img.__color[dst:dst+count] = self.__color[src:src+count]
         return img
 
+    def shift_left(self, n):
+        """Returns a new image created by shifting the image left n times.
+        """
+        return self.__shift_x(n)
+
     def shift_right(self, n):
         """Returns a new image created by shifting the image right n times.
         """
-        if n < 0:
-            return self.shift_left(-n)
-
-        width = self.width()
-
-        img = StuduinoBitImage(width, self.height())
-        img.__base_color = self.__base_color
-
-        if n < width:
-            img.__image = [[0 for i in range(n)] + row[0: len(row)-n]
-                           for row in self.__image]
-
-            for p in self.__color.keys():
-                sx = p[0]+n
-                y = p[1]
-                if sx < width:
-                    img.__color[(sx, y)] = self.__color[p]
-
-        return img
+        return self.__shift_x(-n)
 
     def shift_up(self, n):
         """Returns a new image created by shifting the image up n times.
         """
-        if n < 0:
-            return self.shift_down(-n)
-
-        width = self.width()
-        height = self.height()
-
-        img = StuduinoBitImage(width, height)
-        img.__base_color = self.__base_color
-
-        if n < height:
-            img.__image = [[x for x in row] for row in self.__image[n:height]]\
-                        + [[StuduinoBitImage.__PIX_MIN for x in range(width)]
-                            for y in range(n)]
-
-            for p in self.__color.keys():
-                x = p[0]
-                sy = p[1]-n
-                if sy >= 0:
-                    img.__color[(x, sy)] = self.__color[p]
-
-        return img
+        return self.__shift_y(n)
 
     def shift_down(self, n):
         """Returns a new image created by shifting the image down n times.
         """
-        if n < 0:
-            return self.shift_up(-n)
-
-        width = self.width()
-        height = self.height()
-
-        img = StuduinoBitImage(width, height)
-        img.__base_color = self.__base_color
-
-        if n < height:
-            img.__image = [[StuduinoBitImage.__PIX_MIN for x in range(width)]
-                           for y in range(n)] \
-                            + [[x for x in row]
-                                for row in self.__image[0:height-n]]
-
-            for p in self.__color.keys():
-                x = p[0]
-                sy = p[1]+n
-                if sy < height:
-                    img.__color[(x, sy)] = self.__color[p]
-
-        return img
+        return self.__shift_y(-n)
 
     def copy(self):
         """Returns a new image created by shifting the image right n times.
         """
-        img = StuduinoBitImage(self.width(), self.height())
+        img = self.__blank()
 
-        img.__image = [row[0:len(row)] for row in self.__image]
-        img.__base_color = self.__base_color
-        img.__color = self.__color.copy()
+        img.__image[:] = self.__image
+        if self.__color is not None:
+            img.__color = array.array('l', self.__color)
 
         return img
 
+    def __rows(self):
+        w = self.__width
+        return [''.join([str(v) for v in self.__image[i:i+w]])
+                for i in range(0, len(self.__image), w)] if w else []
+
     def __repr__(self):
         """String representation that can be eval'ed to recreate image object.
 
@@ -380,9 +374,7 @@ class StuduinoBitImage(BuiltinColor):
         """
 
         if self.__image:
-            return "Image('{0}:')".format(
-                ':'.join([''.join(str(r) for r in row)for row in self.__image])
-                )
+            return "Image('{0}:')".format(':'.join(self.__rows()))
         else:
             return "Image('')"
 
@@ -427,8 +419,8 @@ class StuduinoBitImage(BuiltinColor):
         -------
         """
 
-        rows = [''.join(str(e) for e in row)[:StuduinoBitImage.__WIDTH_DEFAULT]
-                for row in self.__image[:StuduinoBitImage.__HEIGHT_DEFAULT]]
+        rows = [r[:StuduinoBitImage.__WIDTH_DEFAULT]
+                for r in self.__rows()[:StuduinoBitImage.__HEIGHT_DEFAULT]]
 
         vpad = StuduinoBitImage.__HEIGHT_DEFAULT - self.height()
 
@@ -442,50 +434,53 @@ class StuduinoBitImage(BuiltinColor):
     def __add__(self, other):
         """Adding two images returns a new image that is their superimposition.
         """
-        width = self.width()
-        height = self.height()
+        width = self.__width
+        height = self.__height
 
         if width != other.width() or height != other.height():
             raise ValueError('Images must be the same size.')
 
-        buf = array.array(
-            'B', [min(1, self.__image[i][j] + other.__image[i][j])
-                  for i in range(height) for j in range(width)]
-            )
-
-        img = StuduinoBitImage(width, height, buf)
-
-        # change base color to individual color
-        for x in range(width):
-            for y in range(height):
-                color1 = (0, 0, 0)
-                if self.__image[y][x] != 0:
-                    if (x, y) in self.__color:
-                        color1 = _24bit_rgb(self.__color[(x, y)])
-                    else:
-                        color1 = _24bit_rgb(self.__base_color)
-
-                color2 = (0, 0, 0)
-                if other.__image[y][x] != 0:
-                    if (x, y) in other.__color:
-                        color2 = _24bit_rgb(other.__color[(x, y)])
-                    else:
-                        color2 = _24bit_rgb(other.__base_color)
-
-                if (color1 != (0, 0, 0) or color2 != (0, 0, 0)):
-                    img.__color[(x, y)] = _rgb_24bit(
-                        [min(c1 + c2, StuduinoBitImage.__PIX_MAXCOLOR_FACTOR)
-                         for (c1, c2) in zip(color1, color2)])
-
-        # Add base color
-        val1 = self.__get_base_color()
-        val2 = other.__get_base_color()
-        img.set_base_color(
-            [min(v1 + v2, StuduinoBitImage.__PIX_MAXCOLOR_FACTOR)
-                for v1, v2 in zip(val1, val2)])
+        img = self.__blank()
+        n = len(self.__image)
+        a = self.__image
+        b = other.__image
+        ac = self.__color
+        bc = other.__color
+        abase = self.__base_color
+        bbase = other.__base_color
+        img.__base_color = _add_color(abase, bbase)
+        lit_a = _lit_bytes(a)
+        lit_b = _lit_bytes(b)
+        img.__image[:] = _or_bytes(lit_a, lit_b)
+
+        col = img.__new_color()
+        img.__color = col
+        if ac is None and bc is None:
+            # Overlapping pixels take the new base color, only the pixels
+            # lit in just one of the images need an individual color.
+            both = _and_bytes(lit_a, lit_b)
+            for i in range(n):
+                if not both[i]:
+                    if a[i]:
+                        col[i] = abase
+                    elif b[i]:
+                        col[i] = bbase
+            return img
+
+        for i in range(n):
+            c1 = 0
+            if a[i]:
+                c1 = abase if ac is None or ac[i] == _NO_COLOR else ac[i]
+            c2 = 0
+            if b[i]:
+                c2 = bbase if bc is None or bc[i] == _NO_COLOR else bc[i]
+            if c1 and c2:
+                col[i] = _add_color(c1, c2)
+            elif c1 or c2:
+                col[i] = c1 | c2
 
         return img
-    '''
+
     def __mul__(self, other):
         """Returns a new image created by multiplying the brightness of each
         pixel by n.
@@ -494,22 +489,117 @@ class StuduinoBitImage(BuiltinColor):
             raise ValueError('Brightness multiplier must not be negative')
 
         img = self.copy()
+        img.__base_color = _scale_color(self.__base_color, other)
+
+        col = img.__color
+        if col is not None:
+            # Images use a handful of colors, scale each of them once.
+            scaled = {_NO_COLOR: _NO_COLOR}
+            for i in range(len(col)):
+                c = col[i]
+                v = scaled.get(c)
+                if v is None:
+                    v = scaled[c] = _scale_color(c, other)
+                col[i] = v
+
+        return img
+
+    def invert(self):
+        """Returns a new image with lit pixels turned off and unlit pixels
+        turned on in the base color.
+        """
+        img = self.__blank()
+        n = len(self.__image)
+        img.__image[:] = _xor_bytes(_lit_bytes(self.__image), b'\x01' * n)
+        return img
+
+    def fill(self, value):
+        """Set every pixel of the image to value.
 
-        val = self.__get_base_color()
-        # img.set_base_color(tuple(map(lambda x: int(x * other), val)))
-        img.set_base_color(
-            [min(v * other, StuduinoBitImage.__PIX_MAXCOLOR_FACTOR)
-             for v in val])
+        value must be between 0 and 9. Individual pixel colors are cleared.
+        """
+        if(value < StuduinoBitImage.__PIX_MIN or
+           value > StuduinoBitImage.__PIX_MAX):
+            raise ValueError('value out of bounds')
 
-        for key in self.__color.keys():
-            # img.__color[key] = int(self.__color[key] * other)
-            val = _24bit_rgb(self.__color[key])
-            img.__color[key] = _rgb_24bit(
-                [min(v * other, StuduinoBitImage.__PIX_MAXCOLOR_FACTOR)
-                 for v in val])
+        n = len(self.__image)
+        self.__image[:] = (b'\x01' if value else b'\x00') * n
+        self.__color = None
 
+    def blit(self, src, x, y, w, h, xdest=0, ydest=0):
+        """Copy the w x h rectangle at (x, y) of src to (xdest, ydest) of
+        this image.
+
+        Pixels outside of src are copied as 0, pixels falling outside of
+        this image are dropped. Copied pixels keep their color.
+        """
+        if src is self:
+            src = self.copy()
+
+        # Clip against this image.
+        if xdest < 0:
+            w += xdest
+            x -= xdest
+            xdest = 0
+        if ydest < 0:
+            h += ydest
+            y -= ydest
+            ydest = 0
+        w = min(w, self.__width - xdest)
+        h = min(h, self.__height - ydest)
+        if w <= 0 or h <= 0:
+            return
+
+        # Columns [x0, x1) of the rectangle exist in src, the rest is cleared.
+        sw = src.__width
+        x0 = min(max(0, -x), w)
+        x1 = max(x0, min(w, sw - x))
+        cw = x1 - x0
+
+        dw = self.__width
+        spix = src.__image
+        dpix = self.__image
+        scol = src.__color
+        sbase = src.__base_color
+        rows = [(ydest + row) * dw + xdest for row in range(h)]
+        srcs = [(y + row) * sw + x + x0
+                if cw and 0 <= y + row < src.__height else -1
+                for row in range(h)]
+
+        zeros = bytes(w)
+        for d, s in zip(rows, srcs):
+            dpix[d:d+w] = zeros
+            if s >= 0:
+                dpix[d+x0:d+x1] = spix[s:s+cw]
+
+        if scol is None and sbase == self.__base_color:
+            if self.__color is not None:
+                fill = array.array('l', [_NO_COLOR] * w)
+                for d in rows:
+                    self.__color[d:d+w] = fill
+            return
+
+        if self.__color is None:
+            self.__color = self.__new_color()
+        dcol = self.__color
+        fill = array.array('l', [sbase if scol is None else _NO_COLOR] * w)
+        for d, s in zip(rows, srcs):
+            dcol[d:d+w] = fill
+            if s >= 0 and scol is not None:
+                dcol[d+x0:d+x1] = scol[s:s+cw]
+                if sbase != self.__base_color:
+                    for i in range(d + x0, d + x1):
+                        if dcol[i] == _NO_COLOR:
+                            dcol[i] = sbase
+
+    def crop(self, x, y, w, h):
+        """Returns a new w x h image of the rectangle at (x, y).
+        """
+        img = StuduinoBitImage(w, h)
+        img.__base_color = self.__base_color
+        img.blit(self, x, y, w, h)
         return img
-    '''
+
     """
     def __eq__(self, other):
         if self and other:
@@ -522,6 +612,65 @@ class StuduinoBitImage(BuiltinColor):
     """
 
 
+def _lit_bytes(a):
+    """1 for each lit pixel of a and 0 for the others.
+
+    Pixel values are 0-9, so OR-ing bits 0-3 of every byte into bit 0 and
+    masking it is enough, again as one big int operation.
+    """
+    n = len(a)
+    v = int.from_bytes(a, 'big')
+    v |= v >> 2
+    v |= v >> 1
+    return (v & int.from_bytes(b'\x01' * n, 'big')).to_bytes(n, 'big')
+
+
+def _or_bytes(a, b):
+    """Bytewise a | b over the whole buffer with one big int operation.
+    """
+    n = len(a)
+    return (int.from_bytes(a, 'big') |
+            int.from_bytes(b, 'big')).to_bytes(n, 'big')
+
+
+def _and_bytes(a, b):
+    n = len(a)
+    return (int.from_bytes(a, 'big') &
+            int.from_bytes(b, 'big')).to_bytes(n, 'big')
+
+
+def _xor_bytes(a, b):
+    n = len(a)
+    return (int.from_bytes(a, 'big') ^
+            int.from_bytes(b, 'big')).to_bytes(n, 'big')
+
+
+def _scale_color(c, n):
+    """Multiply each channel of a color by n, saturating at 31.
+    """
+    r = min(int(((c >> 16) & 0xff) * n), 0x1f)
+    g = min(int(((c >> 8) & 0xff) * n), 0x1f)
+    b = min(int((c & 0xff) * n), 0x1f)
+    return (r << 16) | (g << 8) | b
+
+
+def _add_color(c1, c2):
+    """Per channel saturating add of two colors with 0-31 channels.
+
+    Channel sums fit in 6 bits, so they can be added in one go without
+    carrying into the next channel.
+    """
+    s = c1 + c2
+    if s & 0x202020:
+        if s & 0x200000:
+            s = (s & 0x00ffff) | 0x1f0000
+        if s & 0x002000:
+            s = (s & 0xff00ff) | 0x001f00
+        if s & 0x000020:
+            s = (s & 0xffff00) | 0x00001f
+    return s
+
+
 class StuduinoBitBuiltInImage(StuduinoBitImage):
     def __init__(self, *args):
         super().__init__(*args)
@@ -529,6 +678,12 @@ class StuduinoBitBuiltInImage(StuduinoBitImage):
     def set_pixel(self, x, y, value):
         raise TypeError("This image cannot be modified. Try copying it first.")
 
+    def fill(self, value):
+        raise TypeError("This image cannot be modified. Try copying it first.")
+
+    def blit(self, src, x, y, w, h, xdest=0, ydest=0):
+        raise TypeError("This image cannot be modified. Try copying it first.")
+
 from image_const1 import *
 from image_const2 import *
 from image_const3 import *
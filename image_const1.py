@@ -24,98 +24,167 @@ We used the script below as reference
 https://github.com/casnortheast/microbit_stub/
 ------------------------------------------------------------------------------
 """
-from image import StuduinoBitBuiltInImage
+from micropython import const
 
-""" Built-in images and character map """
+""" Built-in images """
 
-ANGRY = StuduinoBitBuiltInImage('90009:09090:00000:99999:90909:')
-ASLEEP = StuduinoBitBuiltInImage('00000:99099:00000:09990:00000:')
-BUTTERFLY = StuduinoBitBuiltInImage('99099:99999:00900:99999:99099:')
-CHESSBOARD = StuduinoBitBuiltInImage('09090:90909:09090:90909:09090:')
-CONFUSED = StuduinoBitBuiltInImage('00000:09090:00000:09090:90909:')
-COW = StuduinoBitBuiltInImage('90009:90009:99999:09990:00900:')
-DIAMOND = StuduinoBitBuiltInImage('00900:09090:90009:09090:00900:')
-DIAMOND_SMALL = StuduinoBitBuiltInImage('00000:00900:09090:00900:00000:')
-DUCK = StuduinoBitBuiltInImage('09900:99900:09999:09990:00000:')
-FABULOUS = StuduinoBitBuiltInImage('99999:99099:00000:09090:09990:')
-GHOST = StuduinoBitBuiltInImage('99999:90909:99999:99999:90909:')
-GIRAFFE = StuduinoBitBuiltInImage('99000:09000:09000:09990:09090:')
-HAPPY = StuduinoBitBuiltInImage('00000:09090:00000:90009:09990:')
-HEART = StuduinoBitBuiltInImage('09090:99999:99999:09990:00900:')
-HEART_SMALL = StuduinoBitBuiltInImage('00000:09090:09990:00900:00000:')
-HOUSE = StuduinoBitBuiltInImage('00900:09990:99999:09990:09090:')
-MEH = StuduinoBitBuiltInImage('09090:00000:00090:00900:09000:')
-MUSIC_CROTCHET = StuduinoBitBuiltInImage('00900:00900:00900:99900:99900:')
-MUSIC_QUAVER = StuduinoBitBuiltInImage('00900:00990:00909:99900:99900:')
-MUSIC_QUAVERS = StuduinoBitBuiltInImage('09999:09009:09009:99099:99099:')
-NO = StuduinoBitBuiltInImage('90009:09090:00900:09090:90009:')
-PACMAN = StuduinoBitBuiltInImage('09999:99090:99900:99990:09999:')
-PITCHFORK = StuduinoBitBuiltInImage('90909:90909:99999:00900:00900:')
-RABBIT = StuduinoBitBuiltInImage('90900:90900:99990:99090:99990:')
-ROLLERSKATE = StuduinoBitBuiltInImage('00099:00099:99999:99999:09090:')
-SAD = StuduinoBitBuiltInImage('00000:09090:00000:09990:90009:')
-SILLY = StuduinoBitBuiltInImage('90009:00000:99999:00909:00999:')
-SKULL = StuduinoBitBuiltInImage('09990:90909:99999:09990:09990:')
-SMILE = StuduinoBitBuiltInImage('00000:00000:00000:90009:09990:')
-SNAKE = StuduinoBitBuiltInImage('99000:99099:09090:09990:00000:')
-SQUARE = StuduinoBitBuiltInImage('99999:90009:90009:90009:99999:')
-SQUARE_SMALL = StuduinoBitBuiltInImage('00000:09990:09090:09990:00000:')
-STICKFIGURE = StuduinoBitBuiltInImage('00900:99999:00900:09090:90009:')
-SURPRISED = StuduinoBitBuiltInImage('09090:00000:00900:09090:00900:')
-SWORD = StuduinoBitBuiltInImage('00900:00900:00900:09990:00900:')
-TARGET = StuduinoBitBuiltInImage('00900:09990:99099:09990:00900:')
-TORTOISE = StuduinoBitBuiltInImage('00000:09990:99999:09090:00000:')
-TRIANGLE = StuduinoBitBuiltInImage('00000:00900:09090:99999:00000:')
-TRIANGLE_LEFT = StuduinoBitBuiltInImage('90000:99000:90900:90090:99999:')
-TSHIRT = StuduinoBitBuiltInImage('99099:99999:09990:09990:09990:')
-UMBRELLA = StuduinoBitBuiltInImage('09990:99999:00900:90900:09900:')
-XMAS = StuduinoBitBuiltInImage('00900:09990:00900:09990:99999:')
-YES = StuduinoBitBuiltInImage('00000:00009:00090:90900:09000:')
+# Every image is 5 rows of one byte, bit 4 is the leftmost column.
+IMAGE_BYTES = const(5)
 
-ARROW_N = StuduinoBitBuiltInImage('00900:09990:90909:00900:00900:')
-ARROW_NE = StuduinoBitBuiltInImage('00999:00099:00909:09000:90000:')
-ARROW_E = StuduinoBitBuiltInImage('00900:00090:99999:00090:00900:')
-ARROW_SE = StuduinoBitBuiltInImage('90000:09000:00909:00099:00999:')
-ARROW_S = StuduinoBitBuiltInImage('00900:00900:90909:09990:00900:')
-ARROW_SW = StuduinoBitBuiltInImage('00009:00090:90900:99000:99900:')
-ARROW_W = StuduinoBitBuiltInImage('00900:09000:99999:09000:00900:')
-ARROW_NW = StuduinoBitBuiltInImage('99900:99000:90900:00090:00009:')
+BUILTIN_NAMES = (
+    'ANGRY',
+    'ASLEEP',
+    'BUTTERFLY',
+    'CHESSBOARD',
+    'CONFUSED',
+    'COW',
+    'DIAMOND',
+    'DIAMOND_SMALL',
+    'DUCK',
+    'FABULOUS',
+    'GHOST',
+    'GIRAFFE',
+    'HAPPY',
+    'HEART',
+    'HEART_SMALL',
+    'HOUSE',
+    'MEH',
+    'MUSIC_CROTCHET',
+    'MUSIC_QUAVER',
+    'MUSIC_QUAVERS',
+    'NO',
+    'PACMAN',
+    'PITCHFORK',
+    'RABBIT',
+    'ROLLERSKATE',
+    'SAD',
+    'SILLY',
+    'SKULL',
+    'SMILE',
+    'SNAKE',
+    'SQUARE',
+    'SQUARE_SMALL',
+    'STICKFIGURE',
+    'SURPRISED',
+    'SWORD',
+    'TARGET',
+    'TORTOISE',
+    'TRIANGLE',
+    'TRIANGLE_LEFT',
+    'TSHIRT',
+    'UMBRELLA',
+    'XMAS',
+    'YES',
+    'ARROW_N',
+    'ARROW_NE',
+    'ARROW_E',
+    'ARROW_SE',
+    'ARROW_S',
+    'ARROW_SW',
+    'ARROW_W',
+    'ARROW_NW',
+    'CLOCK12',
+    'CLOCK1',
+    'CLOCK2',
+    'CLOCK3',
+    'CLOCK4',
+    'CLOCK5',
+    'CLOCK6',
+    'CLOCK7',
+    'CLOCK8',
+    'CLOCK9',
+    'CLOCK10',
+    'CLOCK11',
+    )
 
-CLOCK12 = StuduinoBitBuiltInImage('00900:00900:00900:00000:00000:')
-CLOCK1 = StuduinoBitBuiltInImage('00090:00090:00900:00000:00000:')
-CLOCK2 = StuduinoBitBuiltInImage('00000:00099:00900:00000:00000:')
-CLOCK3 = StuduinoBitBuiltInImage('00000:00000:00999:00000:00000:')
-CLOCK4 = StuduinoBitBuiltInImage('00000:00000:00900:00099:00000:')
-CLOCK5 = StuduinoBitBuiltInImage('00000:00000:00900:00090:00090:')
-CLOCK6 = StuduinoBitBuiltInImage('00000:00000:00900:00900:00900:')
-CLOCK7 = StuduinoBitBuiltInImage('00000:00000:00900:09000:09000:')
-CLOCK8 = StuduinoBitBuiltInImage('00000:00000:00900:99000:00000:')
-CLOCK9 = StuduinoBitBuiltInImage('00000:00000:99900:00000:00000:')
-CLOCK10 = StuduinoBitBuiltInImage('00000:99000:00900:00000:00000:')
-CLOCK11 = StuduinoBitBuiltInImage('09000:09000:00900:00000:00000:')
+BUILTIN_IMAGES = (
+    b'\x11\x0a\x00\x1f\x15'  # ANGRY
+    b'\x00\x1b\x00\x0e\x00'  # ASLEEP
+    b'\x1b\x1f\x04\x1f\x1b'  # BUTTERFLY
+    b'\x0a\x15\x0a\x15\x0a'  # CHESSBOARD
+    b'\x00\x0a\x00\x0a\x15'  # CONFUSED
+    b'\x11\x11\x1f\x0e\x04'  # COW
+    b'\x04\x0a\x11\x0a\x04'  # DIAMOND
+    b'\x00\x04\x0a\x04\x00'  # DIAMOND_SMALL
+    b'\x0c\x1c\x0f\x0e\x00'  # DUCK
+    b'\x1f\x1b\x00\x0a\x0e'  # FABULOUS
+    b'\x1f\x15\x1f\x1f\x15'  # GHOST
+    b'\x18\x08\x08\x0e\x0a'  # GIRAFFE
+    b'\x00\x0a\x00\x11\x0e'  # HAPPY
+    b'\x0a\x1f\x1f\x0e\x04'  # HEART
+    b'\x00\x0a\x0e\x04\x00'  # HEART_SMALL
+    b'\x04\x0e\x1f\x0e\x0a'  # HOUSE
+    b'\x0a\x00\x02\x04\x08'  # MEH
+    b'\x04\x04\x04\x1c\x1c'  # MUSIC_CROTCHET
+    b'\x04\x06\x05\x1c\x1c'  # MUSIC_QUAVER
+    b'\x0f\x09\x09\x1b\x1b'  # MUSIC_QUAVERS
+    b'\x11\x0a\x04\x0a\x11'  # NO
+    b'\x0f\x1a\x1c\x1e\x0f'  # PACMAN
+    b'\x15\x15\x1f\x04\x04'  # PITCHFORK
+    b'\x14\x14\x1e\x1a\x1e'  # RABBIT
+    b'\x03\x03\x1f\x1f\x0a'  # ROLLERSKATE
+    b'\x00\x0a\x00\x0e\x11'  # SAD
+    b'\x11\x00\x1f\x05\x07'  # SILLY
+    b'\x0e\x15\x1f\x0e\x0e'  # SKULL
+    b'\x00\x00\x00\x11\x0e'  # SMILE
+    b'\x18\x1b\x0a\x0e\x00'  # SNAKE
+    b'\x1f\x11\x11\x11\x1f'  # SQUARE
+    b'\x00\x0e\x0a\x0e\x00'  # SQUARE_SMALL
+    b'\x04\x1f\x04\x0a\x11'  # STICKFIGURE
+    b'\x0a\x00\x04\x0a\x04'  # SURPRISED
+    b'\x04\x04\x04\x0e\x04'  # SWORD
+    b'\x04\x0e\x1b\x0e\x04'  # TARGET
+    b'\x00\x0e\x1f\x0a\x00'  # TORTOISE
+    b'\x00\x04\x0a\x1f\x00'  # TRIANGLE
+    b'\x10\x18\x14\x12\x1f'  # TRIANGLE_LEFT
+    b'\x1b\x1f\x0e\x0e\x0e'  # TSHIRT
+    b'\x0e\x1f\x04\x14\x0c'  # UMBRELLA
+    b'\x04\x0e\x04\x0e\x1f'  # XMAS
+    b'\x00\x01\x02\x14\x08'  # YES
+    b'\x04\x0e\x15\x04\x04'  # ARROW_N
+    b'\x07\x03\x05\x08\x10'  # ARROW_NE
+    b'\x04\x02\x1f\x02\x04'  # ARROW_E
+    b'\x10\x08\x05\x03\x07'  # ARROW_SE
+    b'\x04\x04\x15\x0e\x04'  # ARROW_S
+    b'\x01\x02\x14\x18\x1c'  # ARROW_SW
+    b'\x04\x08\x1f\x08\x04'  # ARROW_W
+    b'\x1c\x18\x14\x02\x01'  # ARROW_NW
+    b'\x04\x04\x04\x00\x00'  # CLOCK12
+    b'\x02\x02\x04\x00\x00'  # CLOCK1
+    b'\x00\x03\x04\x00\x00'  # CLOCK2
+    b'\x00\x00\x07\x00\x00'  # CLOCK3
+    b'\x00\x00\x04\x03\x00'  # CLOCK4
+    b'\x00\x00\x04\x02\x02'  # CLOCK5
+    b'\x00\x00\x04\x04\x04'  # CLOCK6
+    b'\x00\x00\x04\x08\x08'  # CLOCK7
+    b'\x00\x00\x04\x18\x00'  # CLOCK8
+    b'\x00\x00\x1c\x00\x00'  # CLOCK9
+    b'\x00\x18\x04\x00\x00'  # CLOCK10
+    b'\x08\x08\x04\x00\x00'  # CLOCK11
+    )
 
-ALL_ARROWS = [
-    ARROW_N,
-    ARROW_NE,
-    ARROW_E,
-    ARROW_SE,
-    ARROW_S,
-    ARROW_SW,
-    ARROW_W,
-    ARROW_NW,
-    ]
+ALL_ARROWS = (
+    'ARROW_N',
+    'ARROW_NE',
+    'ARROW_E',
+    'ARROW_SE',
+    'ARROW_S',
+    'ARROW_SW',
+    'ARROW_W',
+    'ARROW_NW',
+    )
 
-ALL_CLOCKS = [
-    CLOCK12,
-    CLOCK1,
-    CLOCK2,
-    CLOCK3,
-    CLOCK4,
-    CLOCK5,
-    CLOCK6,
-    CLOCK7,
-    CLOCK8,
-    CLOCK9,
-    CLOCK10,
-    CLOCK11,
-    ]
+ALL_CLOCKS = (
+    'CLOCK12',
+    'CLOCK1',
+    'CLOCK2',
+    'CLOCK3',
+    'CLOCK4',
+    'CLOCK5',
+    'CLOCK6',
+    'CLOCK7',
+    'CLOCK8',
+    'CLOCK9',
+    'CLOCK10',
+    'CLOCK11',
+    )
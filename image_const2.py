@@ -24,73 +24,39 @@ We used the script below as reference
 https://github.com/casnortheast/microbit_stub/
 ------------------------------------------------------------------------------
 """
-from image import StuduinoBitImage
-from image_const1 import *
+from image import StuduinoBitImage, StuduinoBitBuiltInImage
+from image_const1 import IMAGE_BYTES, BUILTIN_NAMES, BUILTIN_IMAGES, \
+                         ALL_ARROWS, ALL_CLOCKS
 
-StuduinoBitImage.ANGRY = ANGRY
-StuduinoBitImage.BUTTERFLY = BUTTERFLY
-StuduinoBitImage.CHESSBOARD = CHESSBOARD
-StuduinoBitImage.CONFUSED = CONFUSED
-StuduinoBitImage.COW = COW
-StuduinoBitImage.DIAMOND = DIAMOND
-StuduinoBitImage.DIAMOND_SMALL = DIAMOND_SMALL
-StuduinoBitImage.DUCK = DUCK
-StuduinoBitImage.FABULOUS = FABULOUS
-StuduinoBitImage.GHOST = GHOST
-StuduinoBitImage.GIRAFFE = GIRAFFE
-StuduinoBitImage.HAPPY = HAPPY
-StuduinoBitImage.HEART = HEART
-StuduinoBitImage.HEART_SMALL = HEART_SMALL
-StuduinoBitImage.HOUSE = HOUSE
-StuduinoBitImage.MEH = MEH
-StuduinoBitImage.MUSIC_CROTCHET = MUSIC_CROTCHET
-StuduinoBitImage.MUSIC_QUAVER = MUSIC_QUAVER
-StuduinoBitImage.MUSIC_QUAVERS = MUSIC_QUAVERS
-StuduinoBitImage.NO = NO
-StuduinoBitImage.PACMAN = PACMAN
-StuduinoBitImage.PITCHFORK = PITCHFORK
-StuduinoBitImage.RABBIT = RABBIT
-StuduinoBitImage.ROLLERSKATE = ROLLERSKATE
-StuduinoBitImage.SAD = SAD
-StuduinoBitImage.SILLY = SILLY
-StuduinoBitImage.SKULL = SKULL
-StuduinoBitImage.SMILE = SMILE
-StuduinoBitImage.SNAKE = SNAKE
-StuduinoBitImage.SQUARE = SQUARE
-StuduinoBitImage.SQUARE_SMALL = SQUARE_SMALL
-StuduinoBitImage.STICKFIGURE = STICKFIGURE
-StuduinoBitImage.SURPRISED = SURPRISED
-StuduinoBitImage.SWORD = SWORD
-StuduinoBitImage.TARGET = TARGET
-StuduinoBitImage.TORTOISE = TORTOISE
-StuduinoBitImage.TRIANGLE = TRIANGLE
-StuduinoBitImage.TRIANGLE_LEFT = TRIANGLE_LEFT
-StuduinoBitImage.TSHIRT = TSHIRT
-StuduinoBitImage.UMBRELLA = UMBRELLA
-StuduinoBitImage.XMAS = XMAS
-StuduinoBitImage.YES = YES
 
-StuduinoBitImage.ARROW_N = ARROW_N
-StuduinoBitImage.ARROW_NE = ARROW_NE
-StuduinoBitImage.ARROW_E = ARROW_E
-StuduinoBitImage.ARROW_SE = ARROW_SE
-StuduinoBitImage.ARROW_S = ARROW_S
-StuduinoBitImage.ARROW_SW = ARROW_SW
-StuduinoBitImage.ARROW_W = ARROW_W
-StuduinoBitImage.ARROW_NW = ARROW_NW
+def builtin_image(name):
+    """Materialise the built-in image called name from BUILTIN_IMAGES.
+    """
+    return _builtin_image(BUILTIN_NAMES.index(name))
 
-StuduinoBitImage.CLOCK12 = CLOCK12
-StuduinoBitImage.CLOCK1 = CLOCK1
-StuduinoBitImage.CLOCK2 = CLOCK2
-StuduinoBitImage.CLOCK3 = CLOCK3
-StuduinoBitImage.CLOCK4 = CLOCK4
-StuduinoBitImage.CLOCK5 = CLOCK5
-StuduinoBitImage.CLOCK6 = CLOCK6
-StuduinoBitImage.CLOCK7 = CLOCK7
-StuduinoBitImage.CLOCK8 = CLOCK8
-StuduinoBitImage.CLOCK9 = CLOCK9
-StuduinoBitImage.CLOCK10 = CLOCK10
-StuduinoBitImage.CLOCK11 = CLOCK11
 
-StuduinoBitImage.ALL_ARROWS = ALL_ARROWS
-StuduinoBitImage.ALL_CLOCKS = ALL_CLOCKS
+def _builtin_image(i):
+    i *= IMAGE_BYTES
+    img = StuduinoBitBuiltInImage(5, 5)
+    img._load_rows(BUILTIN_IMAGES[i:i + IMAGE_BYTES])
+    return img
+
+
+def _attach():
+    # Built at import: MicroPython builds without descriptor support never
+    # call __get__ for Image.HEART, so the images can not be created on
+    # first access. Unpacking the rows is cheap, nothing is parsed.
+    # The images are module globals as well, image re-exports them.
+    g = globals()
+    for i in range(len(BUILTIN_NAMES)):
+        name = BUILTIN_NAMES[i]
+        g[name] = _builtin_image(i)
+        setattr(StuduinoBitImage, name, g[name])
+
+    g['ALL_ARROWS'] = [g[n] for n in ALL_ARROWS]
+    g['ALL_CLOCKS'] = [g[n] for n in ALL_CLOCKS]
+    StuduinoBitImage.ALL_ARROWS = g['ALL_ARROWS']
+    StuduinoBitImage.ALL_CLOCKS = g['ALL_CLOCKS']
+
+
+_attach()
@@ -24,104 +24,191 @@ We used the script below as reference
 https://github.com/casnortheast/microbit_stub/
 ------------------------------------------------------------------------------
 """
-from image import StuduinoBitImage
-
-CHARACTER_MAP = {
-    ' ': '00000:00000:00000:00000:00000:',
-    '!': '09000:09000:09000:00000:09000:',
-    '"': '09090:09090:00000:00000:00000:',
-    '#': '09090:99999:09090:99999:09090:',
-    '$': '09990:99009:09990:90099:09990:',
-    '%': '99009:90090:00900:09009:90099:',
-    '&': '09900:90090:09900:90090:09909:',
-    "'": '09000:09000:00000:00000:00000:',
-    '(': '00900:09000:09000:09000:00900:',
-    ')': '09000:00900:00900:00900:09000:',
-    '*': '00000:09090:00900:09090:00000:',
-    '+': '00000:00900:09990:00900:00000:',
-    ',': '00000:00000:00000:00900:09000:',
-    '-': '00000:00000:09990:00000:00000:',
-    '.': '00000:00000:00000:09000:00000:',
-    '/': '00009:00090:00900:09000:90000:',
-    '0': '09900:90090:90090:90090:09900:',
-    '1': '00900:09900:00900:00900:09990:',
-    '2': '99900:00090:09900:90000:99990:',
-    '3': '99990:00090:00900:90090:09900:',
-    '4': '00990:09090:90090:99999:00090:',
-    '5': '99999:90000:99990:00009:99990:',
-    '6': '00090:00900:09990:90009:09990:',
-    '7': '99999:00090:00900:09000:90000:',
-    '8': '09990:90009:09990:90009:09990:',
-    '9': '09990:90009:09990:00900:09000:',
-    ':': '00000:09000:00000:09000:00000:',
-    ';': '00000:00900:00000:00900:09000:',
-    '<': '00090:00900:09000:00900:00090:',
-    '=': '00000:09990:00000:09990:00000:',
-    '>': '09000:00900:00090:00900:09000:',
-    '?': '09990:90009:00990:00000:00900:',
-    '@': '09990:90009:90909:90099:09900:',
-    'A': '09900:90090:99990:90090:90090:',
-    'B': '99900:90090:99900:90090:99900:',
-    'C': '09990:90000:90000:90000:09990:',
-    'D': '99900:90090:90090:90090:99900:',
-    'E': '99990:90000:99900:90000:99990:',
-    'F': '99990:90000:99900:90000:90000:',
-    'G': '09990:90000:90099:90009:09990:',
-    'H': '90090:90090:99990:90090:90090:',
-    'I': '99900:09000:09000:09000:99900:',
-    'J': '99999:00090:00090:90090:09900:',
-    'K': '90090:90900:99000:90900:90090:',
-    'L': '90000:90000:90000:90000:99990:',
-    'M': '90009:99099:90909:90009:90009:',
-    'N': '90009:99009:90909:90099:90009:',
-    'O': '09900:90090:90090:90090:09900:',
-    'P': '99900:90090:99900:90000:90000:',
-    'Q': '09900:90090:90090:09900:00990:',
-    'R': '99900:90090:99900:90090:90009:',
-    'S': '09990:90000:09900:00090:99900:',
-    'T': '99999:00900:00900:00900:00900:',
-    'U': '90090:90090:90090:90090:09900:',
-    'V': '90009:90009:90009:09090:00900:',
-    'W': '90009:90009:90909:99099:90009:',
-    'X': '90090:90090:09900:90090:90090:',
-    'Y': '90009:09090:00900:00900:00900:',
-    'Z': '99990:00900:09000:90000:99990:',
-    '[': '09990:09000:09000:09000:09990:',
-    '\\': '90000:09000:00900:00090:00009:',
-    ']': '09990:00090:00090:00090:09990:',
-    '^': '00900:09090:00000:00000:00000:',
-    '_': '00000:00000:00000:00000:99999:',
-    '`': '09000:00900:00000:00000:00000:',
-    'a': '00000:09990:90090:90090:09999:',
-    'b': '90000:90000:99900:90090:99900:',
-    'c': '00000:09990:90000:90000:09990:',
-    'd': '00090:00090:09990:90090:09990:',
-    'e': '09900:90090:99900:90000:09990:',
-    'f': '00990:09000:99900:09000:09000:',
-    'g': '09990:90090:09990:00090:09900:',
-    'h': '90000:90000:99900:90090:90090:',
-    'i': '09000:00000:09000:09000:09000:',
-    'j': '00090:00000:00090:00090:09900:',
-    'k': '90000:90900:99000:90900:90090:',
-    'l': '09000:09000:09000:09000:00990:',
-    'm': '00000:99099:90909:90009:90009:',
-    'n': '00000:99900:90090:90090:90090:',
-    'o': '00000:09900:90090:90090:09900:',
-    'p': '00000:99900:90090:99900:90000:',
-    'q': '00000:09990:90090:09990:00090:',
-    'r': '00000:09990:90000:90000:90000:',
-    's': '00000:00990:09000:00900:99000:',
-    't': '09000:09000:09990:09000:00999:',
-    'u': '00000:90090:90090:90090:09999:',
-    'v': '00000:90009:90009:09090:00900:',
-    'w': '00000:90009:90009:90909:99099:',
-    'x': '00000:90090:09900:09900:90090:',
-    'y': '00000:90009:09090:00900:99000:',
-    'z': '00000:99990:00900:09000:99990:',
-    '{': '00990:00900:09900:00900:00990:',
-    '|': '09000:09000:09000:09000:09000:',
-    '}': '99000:09000:09900:09000:99000:',
-    '~': '00000:00000:09900:00099:00000:',
-    }
+from micropython import const
+from image import StuduinoBitImage, StuduinoBitBuiltInImage
+from image_const1 import IMAGE_BYTES
+
+# Glyphs of the printable ASCII characters ' ' to '~', packed like
+# BUILTIN_IMAGES in image_const1.
+CHARACTER_FIRST = const(0x20)
+CHARACTER_LAST = const(0x7e)
+
+CHARACTER_DATA = (
+    b'\x00\x00\x00\x00\x00'  # ' '
+    b'\x08\x08\x08\x00\x08'  # '!'
+    b'\x0a\x0a\x00\x00\x00'  # '"'
+    b'\x0a\x1f\x0a\x1f\x0a'  # '#'
+    b'\x0e\x19\x0e\x13\x0e'  # '$'
+    b'\x19\x12\x04\x09\x13'  # '%'
+    b'\x0c\x12\x0c\x12\x0d'  # '&'
+    b'\x08\x08\x00\x00\x00'  # "'"
+    b'\x04\x08\x08\x08\x04'  # '('
+    b'\x08\x04\x04\x04\x08'  # ')'
+    b'\x00\x0a\x04\x0a\x00'  # '*'
+    b'\x00\x04\x0e\x04\x00'  # '+'
+    b'\x00\x00\x00\x04\x08'  # ','
+    b'\x00\x00\x0e\x00\x00'  # '-'
+    b'\x00\x00\x00\x08\x00'  # '.'
+    b'\x01\x02\x04\x08\x10'  # '/'
+    b'\x0c\x12\x12\x12\x0c'  # '0'
+    b'\x04\x0c\x04\x04\x0e'  # '1'
+    b'\x1c\x02\x0c\x10\x1e'  # '2'
+    b'\x1e\x02\x04\x12\x0c'  # '3'
+    b'\x06\x0a\x12\x1f\x02'  # '4'
+    b'\x1f\x10\x1e\x01\x1e'  # '5'
+    b'\x02\x04\x0e\x11\x0e'  # '6'
+    b'\x1f\x02\x04\x08\x10'  # '7'
+    b'\x0e\x11\x0e\x11\x0e'  # '8'
+    b'\x0e\x11\x0e\x04\x08'  # '9'
+    b'\x00\x08\x00\x08\x00'  # ':'
+    b'\x00\x04\x00\x04\x08'  # ';'
+    b'\x02\x04\x08\x04\x02'  # '<'
+    b'\x00\x0e\x00\x0e\x00'  # '='
+    b'\x08\x04\x02\x04\x08'  # '>'
+    b'\x0e\x11\x06\x00\x04'  # '?'
+    b'\x0e\x11\x15\x13\x0c'  # '@'
+    b'\x0c\x12\x1e\x12\x12'  # 'A'
+    b'\x1c\x12\x1c\x12\x1c'  # 'B'
+    b'\x0e\x10\x10\x10\x0e'  # 'C'
+    b'\x1c\x12\x12\x12\x1c'  # 'D'
+    b'\x1e\x10\x1c\x10\x1e'  # 'E'
+    b'\x1e\x10\x1c\x10\x10'  # 'F'
+    b'\x0e\x10\x13\x11\x0e'  # 'G'
+    b'\x12\x12\x1e\x12\x12'  # 'H'
+    b'\x1c\x08\x08\x08\x1c'  # 'I'
+    b'\x1f\x02\x02\x12\x0c'  # 'J'
+    b'\x12\x14\x18\x14\x12'  # 'K'
+    b'\x10\x10\x10\x10\x1e'  # 'L'
+    b'\x11\x1b\x15\x11\x11'  # 'M'
+    b'\x11\x19\x15\x13\x11'  # 'N'
+    b'\x0c\x12\x12\x12\x0c'  # 'O'
+    b'\x1c\x12\x1c\x10\x10'  # 'P'
+    b'\x0c\x12\x12\x0c\x06'  # 'Q'
+    b'\x1c\x12\x1c\x12\x11'  # 'R'
+    b'\x0e\x10\x0c\x02\x1c'  # 'S'
+    b'\x1f\x04\x04\x04\x04'  # 'T'
+    b'\x12\x12\x12\x12\x0c'  # 'U'
+    b'\x11\x11\x11\x0a\x04'  # 'V'
+    b'\x11\x11\x15\x1b\x11'  # 'W'
+    b'\x12\x12\x0c\x12\x12'  # 'X'
+    b'\x11\x0a\x04\x04\x04'  # 'Y'
+    b'\x1e\x04\x08\x10\x1e'  # 'Z'
+    b'\x0e\x08\x08\x08\x0e'  # '['
+    b'\x10\x08\x04\x02\x01'  # '\\'
+    b'\x0e\x02\x02\x02\x0e'  # ']'
+    b'\x04\x0a\x00\x00\x00'  # '^'
+    b'\x00\x00\x00\x00\x1f'  # '_'
+    b'\x08\x04\x00\x00\x00'  # '`'
+    b'\x00\x0e\x12\x12\x0f'  # 'a'
+    b'\x10\x10\x1c\x12\x1c'  # 'b'
+    b'\x00\x0e\x10\x10\x0e'  # 'c'
+    b'\x02\x02\x0e\x12\x0e'  # 'd'
+    b'\x0c\x12\x1c\x10\x0e'  # 'e'
+    b'\x06\x08\x1c\x08\x08'  # 'f'
+    b'\x0e\x12\x0e\x02\x0c'  # 'g'
+    b'\x10\x10\x1c\x12\x12'  # 'h'
+    b'\x08\x00\x08\x08\x08'  # 'i'
+    b'\x02\x00\x02\x02\x0c'  # 'j'
+    b'\x10\x14\x18\x14\x12'  # 'k'
+    b'\x08\x08\x08\x08\x06'  # 'l'
+    b'\x00\x1b\x15\x11\x11'  # 'm'
+    b'\x00\x1c\x12\x12\x12'  # 'n'
+    b'\x00\x0c\x12\x12\x0c'  # 'o'
+    b'\x00\x1c\x12\x1c\x10'  # 'p'
+    b'\x00\x0e\x12\x0e\x02'  # 'q'
+    b'\x00\x0e\x10\x10\x10'  # 'r'
+    b'\x00\x06\x08\x04\x18'  # 's'
+    b'\x08\x08\x0e\x08\x07'  # 't'
+    b'\x00\x12\x12\x12\x0f'  # 'u'
+    b'\x00\x11\x11\x0a\x04'  # 'v'
+    b'\x00\x11\x11\x15\x1b'  # 'w'
+    b'\x00\x12\x0c\x0c\x12'  # 'x'
+    b'\x00\x11\x0a\x04\x18'  # 'y'
+    b'\x00\x1e\x04\x08\x1e'  # 'z'
+    b'\x06\x04\x0c\x04\x06'  # '{'
+    b'\x08\x08\x08\x08\x08'  # '|'
+    b'\x18\x08\x0c\x08\x18'  # '}'
+    b'\x00\x00\x0c\x03\x00'  # '~'
+    )
+
+
+def character_rows(c):
+    """Return the packed rows of the glyph for c, or None if there is none.
+    """
+    code = ord(c) if len(c) == 1 else -1
+    if code < CHARACTER_FIRST or code > CHARACTER_LAST:
+        return None
+    i = (code - CHARACTER_FIRST) * IMAGE_BYTES
+    return CHARACTER_DATA[i:i + IMAGE_BYTES]
+
+
+class _Glyph(StuduinoBitBuiltInImage):
+    """Glyph image shared by everyone showing the character, so it must
+    not be changed in any way.
+    """
+    def set_pixel_color(self, x, y, color):
+        raise TypeError("This image cannot be modified. Try copying it first.")
+
+    def set_base_color(self, color):
+        raise TypeError("This image cannot be modified. Try copying it first.")
+
+
+# Glyph images handed out so far, keyed by character.
+_glyphs = {}
+
+
+def character_image(c):
+    """Return the shared read-only image of the glyph for c, '?' if c has
+    no glyph. Each glyph is unpacked only once.
+    """
+    img = _glyphs.get(c)
+    if img is None:
+        rows = character_rows(c)
+        if rows is None:
+            img = character_image('?')
+        else:
+            img = _Glyph(5, 5)
+            img._load_rows(rows)
+        _glyphs[c] = img
+    return img
+
+
+def _rows_string(rows):
+    return ''.join([''.join(['9' if (r >> (4 - x)) & 1 else '0'
+                             for x in range(5)]) + ':' for r in rows])
+
+
+class _CharacterMap:
+    """Read-only mapping of character to image string, e.g.
+    CHARACTER_MAP['A'] == '09900:90090:99990:90090:90090:'
+
+    The strings are built from CHARACTER_DATA on lookup.
+    """
+    def get(self, c, default=None):
+        rows = character_rows(c)
+        if rows is None:
+            return default
+        return _rows_string(rows)
+
+    def __getitem__(self, c):
+        rows = character_rows(c)
+        if rows is None:
+            raise KeyError(c)
+        return _rows_string(rows)
+
+    def __contains__(self, c):
+        return character_rows(c) is not None
+
+    def __len__(self):
+        return CHARACTER_LAST - CHARACTER_FIRST + 1
+
+    def keys(self):
+        return [chr(i) for i in range(CHARACTER_FIRST, CHARACTER_LAST + 1)]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+
+CHARACTER_MAP = _CharacterMap()
 
 StuduinoBitImage.CHARACTER_MAP = CHARACTER_MAP
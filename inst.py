@@ -1,9 +1,48 @@
+"""
+Board peripherals.
+
+Every name is bound at import so `from board import *` sees all of them,
+but no peripheral is created by the import: each one is a _LazyPeripheral
+that creates it on first use and forwards attribute reads and writes to
+it. Until then nothing touches the I2C bus, the NeoPixels, the buzzer PWM
+timer or the pins, and the buttons only count presses from their first
+use.
+
+Only Image and CreateWLAN are bound directly, they are a class and a
+function. isinstance() sees the proxy, not the peripheral.
+"""
+
+
+class _LazyPeripheral:
+    """Create the peripheral returned by factory(*args) on first attribute
+    access and forward every attribute to it.
+    """
+    def __init__(self, factory, *args):
+        object.__setattr__(self, '_factory', factory)
+        object.__setattr__(self, '_args', args)
+        object.__setattr__(self, '_obj', None)
+
+    def _get(self):
+        obj = self._obj
+        if obj is None:
+            obj = self._factory(*self._args)
+            object.__setattr__(self, '_obj', obj)
+        return obj
+
+    def __getattr__(self, name):
+        return getattr(self._get(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._get(), name, value)
+
+
 """
 Button
 """
-from .button import StuduinoBitButton
-button_a = StuduinoBitButton('A')
-button_b = StuduinoBitButton('B')
+from .button import StuduinoBitButton, StuduinoBitButtons
+button_a = _LazyPeripheral(StuduinoBitButton, 'A')
+button_b = _LazyPeripheral(StuduinoBitButton, 'B')
+buttons = _LazyPeripheral(StuduinoBitButtons)
 
 """
 Image
@@ -14,71 +53,111 @@ from .image import StuduinoBitImage as Image
 Display
 """
 from .dsply import StuduinoBitDisplay
-display = StuduinoBitDisplay()
+display = _LazyPeripheral(StuduinoBitDisplay)
 
 """
 Terminal
 """
 from .terminal import StuduinoBitTerminal
-p0 = StuduinoBitTerminal('P0')
-p1 = StuduinoBitTerminal('P1')
-p2 = StuduinoBitTerminal('P2')
-p3 = StuduinoBitTerminal('P3')
-p4 = StuduinoBitTerminal('P4')
-p5 = StuduinoBitTerminal('P5')
-p6 = StuduinoBitTerminal('P6')
-p7 = StuduinoBitTerminal('P7')
-p8 = StuduinoBitTerminal('P8')
-p9 = StuduinoBitTerminal('P9')
-p10 = StuduinoBitTerminal('P10')
-p11 = StuduinoBitTerminal('P11')
-p12 = StuduinoBitTerminal('P12')
-p13 = StuduinoBitTerminal('P13')
-p14 = StuduinoBitTerminal('P14')
-p15 = StuduinoBitTerminal('P15')
-p16 = StuduinoBitTerminal('P16')
-p19 = StuduinoBitTerminal('P19')
-p20 = StuduinoBitTerminal('P20')
+p0 = _LazyPeripheral(StuduinoBitTerminal, 'P0')
+p1 = _LazyPeripheral(StuduinoBitTerminal, 'P1')
+p2 = _LazyPeripheral(StuduinoBitTerminal, 'P2')
+p3 = _LazyPeripheral(StuduinoBitTerminal, 'P3')
+p4 = _LazyPeripheral(StuduinoBitTerminal, 'P4')
+p5 = _LazyPeripheral(StuduinoBitTerminal, 'P5')
+p6 = _LazyPeripheral(StuduinoBitTerminal, 'P6')
+p7 = _LazyPeripheral(StuduinoBitTerminal, 'P7')
+p8 = _LazyPeripheral(StuduinoBitTerminal, 'P8')
+p9 = _LazyPeripheral(StuduinoBitTerminal, 'P9')
+p10 = _LazyPeripheral(StuduinoBitTerminal, 'P10')
+p11 = _LazyPeripheral(StuduinoBitTerminal, 'P11')
+p12 = _LazyPeripheral(StuduinoBitTerminal, 'P12')
+p13 = _LazyPeripheral(StuduinoBitTerminal, 'P13')
+p14 = _LazyPeripheral(StuduinoBitTerminal, 'P14')
+p15 = _LazyPeripheral(StuduinoBitTerminal, 'P15')
+p16 = _LazyPeripheral(StuduinoBitTerminal, 'P16')
+p19 = _LazyPeripheral(StuduinoBitTerminal, 'P19')
+p20 = _LazyPeripheral(StuduinoBitTerminal, 'P20')
 
 """
 Bus
 """
-from .bus import StuduinoBitI2C, StuduinoBitSPI
-i2c = StuduinoBitI2C()
-spi = StuduinoBitSPI()
 
 
+def _i2c():
+    from .bus import StuduinoBitI2C
+    return StuduinoBitI2C()
+
+
+def _spi():
+    from .bus import StuduinoBitSPI
+    return StuduinoBitSPI()
+
+
+i2c = _LazyPeripheral(_i2c)
+spi = _LazyPeripheral(_spi)
+
 """
 Sensor
 """
-from .sensor import StuduinoBitLightSensor, \
-                    StuduinoBitTemperature, \
-                    StuduinoBitAccelerometer, \
-                    StuduinoBitGyro, \
-                    StuduinoBitCompass
 
-lightsensor = StuduinoBitLightSensor()
-temperature = StuduinoBitTemperature()
-accelerometer = StuduinoBitAccelerometer()
-gyro = StuduinoBitGyro()
-compass = StuduinoBitCompass()
+
+def _lightsensor():
+    from .sensor import StuduinoBitLightSensor
+    return StuduinoBitLightSensor()
+
+
+def _temperature():
+    from .sensor import StuduinoBitTemperature
+    return StuduinoBitTemperature()
+
+
+def _accelerometer():
+    from .sensor import StuduinoBitAccelerometer
+    return StuduinoBitAccelerometer()
+
+
+def _gyro():
+    from .sensor import StuduinoBitGyro
+    return StuduinoBitGyro()
+
+
+def _compass():
+    from .sensor import StuduinoBitCompass
+    return StuduinoBitCompass()
+
+
+lightsensor = _LazyPeripheral(_lightsensor)
+temperature = _LazyPeripheral(_temperature)
+accelerometer = _LazyPeripheral(_accelerometer)
+gyro = _LazyPeripheral(_gyro)
+compass = _LazyPeripheral(_compass)
 
 """
 Circuit
 """
-from .circuit import StuduinoBitUART
-uart = StuduinoBitUART()
+
+
+def _uart():
+    from .circuit import StuduinoBitUART
+    return StuduinoBitUART()
+
+
+uart = _LazyPeripheral(_uart)
 
 """
 Buzzer
 """
-from .bzr import StuduinoBitBuzzer
-buzzer = StuduinoBitBuzzer()
+
+
+def _buzzer():
+    from .bzr import StuduinoBitBuzzer
+    return StuduinoBitBuzzer()
+
+
+buzzer = _LazyPeripheral(_buzzer)
 
 """
 Network
 """
 from .nw import CreateWLAN
-
-
-
@@ -26,14 +26,16 @@ We used the script below as reference
 from micropython import const
 from time import sleep_ms
 from math import atan, sin, cos, pi, log
-import io
-import json
 from .const import *
+from .cfg import get_config_object
 from .terminal import StuduinoBitAnalogPin
 
 
 MAGNETIC_OFFSET = 'magnetic_offset'
 MAGNETIC_SCALE = 'magnetic_scale'
+# Offsets are stored in fixed units and scaled to the selected sf on read
+GYRO_OFFSET = 'gyro_offset_dps'
+ACCEL_OFFSET = 'accel_offset_g'
 
 # for singleton pattern
 # Implement used global value,
@@ -45,13 +47,46 @@ def get_icm20948_object():
     global __icm20948
 
     from .icm20948 import ICM20948
-    from .bus import get_i2c_object
+    from .bus import get_i2c_object, get_i2c_lock
 
     if __icm20948 is None:
-        __icm20948 = ICM20948(get_i2c_object())
+        __icm20948 = ICM20948(get_i2c_object(), get_i2c_lock())
     return __icm20948
 
 
+__sampler = None
+
+
+def start_icm20948_sampler(rate=100):
+    """Sample ICM20948 on a background thread at rate Hz.
+
+    While the sampler runs, the accelerometer, gyro and compass getters
+    return the latest published sample without touching the I2C bus.
+    """
+    global __sampler
+
+    from .icm_sampler import ICM20948Sampler
+
+    stop_icm20948_sampler()
+    __sampler = ICM20948Sampler(get_icm20948_object(), rate)
+    __sampler.start()
+    return __sampler
+
+
+def stop_icm20948_sampler():
+    global __sampler
+
+    if __sampler is not None:
+        __sampler.stop()
+        __sampler = None
+
+
+def _icm20948_source():
+    if __sampler is not None and __sampler.is_running():
+        return __sampler
+    return get_icm20948_object()
+
+
 class StuduinoBitAccelerometer:
     def __init__(self, fs='2g', sf='ms2'):
         # from .icm20948 import ICM20948
@@ -59,21 +94,33 @@ class StuduinoBitAccelerometer:
         self._icm20948.accel_fs(fs)
         self._icm20948.accel_sf(sf)
 
+        self._config = get_config_object(CONFIG_FILE)
+        self._offset = self._config.get(ACCEL_OFFSET)   # in g
+        if self._offset is None:
+            self._offset = (0, 0, 0)
+
+    def _values(self):
+        ax, ay, az = _icm20948_source().acceleration
+        sf = self._icm20948._accel_sf
+        offset = self._offset
+        return (ax - offset[0] * sf, ay - offset[1] * sf,
+                az - offset[2] * sf)
+
     def get_x(self, ndigits=2):
         d = pow(10, ndigits)
-        return int(self._icm20948.acceleration[0] * d) / d
+        return int(self._values()[0] * d) / d
 
     def get_y(self, ndigits=2):
         d = pow(10, ndigits)
-        return int(self._icm20948.acceleration[1] * d) / d
+        return int(self._values()[1] * d) / d
 
     def get_z(self, ndigits=2):
         d = pow(10, ndigits)
-        return int(self._icm20948.acceleration[2] * d) / d
+        return int(self._values()[2] * d) / d
 
     def get_values(self, ndigits=2):
         d = pow(10, ndigits)
-        value = self._icm20948.acceleration
+        value = self._values()
 
         x = int(value[0] * d) / d
         y = int(value[1] * d) / d
@@ -98,6 +145,29 @@ class StuduinoBitAccelerometer:
     def set_sf(self, value):
         self._icm20948.accel_sf(value)
 
+    def calibrate(self, count=64, delay=10):
+        """Measure the zero-g bias. Keep the board still and lying flat
+        while running; Z is expected to read 1g, X and Y 0g.
+        """
+        sf = self._icm20948._accel_sf
+        sx = sy = sz = 0
+        for i in range(count):
+            ax, ay, az = _icm20948_source().acceleration
+            sx += ax
+            sy += ay
+            sz += az
+            sleep_ms(delay)
+
+        gz = sz / count / sf
+        gz -= 1 if gz > 0 else -1       # gravity, face up or face down
+        self._offset = (sx / count / sf, sy / count / sf, gz)
+        self._config.update({ACCEL_OFFSET: self._offset})
+        return self._offset
+
+    def clear_calibration(self):
+        self._offset = (0, 0, 0)
+        self._config.update({ACCEL_OFFSET: None})
+
 
 class StuduinoBitGyro:
     def __init__(self, fs='250dps', sf='dps'):
@@ -106,21 +176,33 @@ class StuduinoBitGyro:
         self._icm20948.gyro_fs(fs)
         self._icm20948.gyro_sf(sf)
 
+        self._config = get_config_object(CONFIG_FILE)
+        self._offset = self._config.get(GYRO_OFFSET)    # in dps
+        if self._offset is None:
+            self._offset = (0, 0, 0)
+
+    def _values(self):
+        gx, gy, gz = _icm20948_source().gyro
+        sf = self._icm20948._gyro_sf
+        offset = self._offset
+        return (gx - offset[0] * sf, gy - offset[1] * sf,
+                gz - offset[2] * sf)
+
     def get_x(self, ndigits=2):
         d = pow(10, ndigits)
-        return int(self._icm20948.gyro[0] * d) / d
+        return int(self._values()[0] * d) / d
 
     def get_y(self, ndigits=2):
         d = pow(10, ndigits)
-        return int(self._icm20948.gyro[1] * d) / d
+        return int(self._values()[1] * d) / d
 
     def get_z(self, ndigits=2):
         d = pow(10, ndigits)
-        return int(self._icm20948.gyro[2] * d) / d
+        return int(self._values()[2] * d) / d
 
     def get_values(self, ndigits=2):
         d = pow(10, ndigits)
-        value = self._icm20948.gyro
+        value = self._values()
         x = int(value[0] * d) / d
         y = int(value[1] * d) / d
         z = int(value[2] * d) / d
@@ -132,12 +214,34 @@ class StuduinoBitGyro:
     def set_sf(self, value):
         self._icm20948.gyro_sf(value)
 
+    def calibrate(self, count=64, delay=10):
+        """Measure the zero-rate bias. Keep the board still while running.
+        """
+        sf = self._icm20948._gyro_sf
+        sx = sy = sz = 0
+        for i in range(count):
+            gx, gy, gz = _icm20948_source().gyro
+            sx += gx
+            sy += gy
+            sz += gz
+            sleep_ms(delay)
+
+        n = count * sf
+        self._offset = (sx / n, sy / n, sz / n)
+        self._config.update({GYRO_OFFSET: self._offset})
+        return self._offset
+
+    def clear_calibration(self):
+        self._offset = (0, 0, 0)
+        self._config.update({GYRO_OFFSET: None})
+
 
 class StuduinoBitCompass:
     def __init__(self):
         self._icm20948 = get_icm20948_object()
-        self._offset = self._get_configureValue(MAGNETIC_OFFSET)
-        self._scale = self._get_configureValue(MAGNETIC_SCALE)
+        self._config = get_config_object(CONFIG_FILE)
+        self._offset = self._config.get(MAGNETIC_OFFSET)
+        self._scale = self._config.get(MAGNETIC_SCALE)
         self._calibrated = True
         if self._offset is None or self._scale is None:
             self._calibrated = False
@@ -154,7 +258,7 @@ class StuduinoBitCompass:
         return self.get_values()[2]
 
     def get_values(self):
-        mag = self._icm20948.magnetic
+        mag = _icm20948_source().magnetic
         if not self._calibrated:
             return mag
         else:
@@ -186,28 +290,29 @@ class StuduinoBitCompass:
         x = 0
         y = 0
         while True:
-            if (display.get_pixel(x, y) == (0, 0, 10)):
-                display.set_pixel(x, y, 0)
-            ax, ay, az = self._icm20948.acceleration
-            x = (ax + 8) / 4 + 0.5
-            y = (ay + 8) / 4 + 0.5
-            x = int(min(max(x, 0), 4))
-            y = int(min(max(y, 0), 4))
-
-            if x == 0 or x == 4 or y == 0 or y == 4:
-                if display.get_pixel(x, y) == (0, 0, 0):
-                    display.set_pixel(x, y, 0x0a000a)
-                    reading = self.get_values()
-                    minx = min(minx, reading[0])
-                    maxx = max(maxx, reading[0])
-                    miny = min(miny, reading[1])
-                    maxy = max(maxy, reading[1])
-                    minz = min(minz, reading[2])
-                    maxz = max(maxz, reading[2])
-                    display.set_pixel(x, y, 0x0a0000)
-                    count += 1
-            else:
-                display.set_pixel(x, y, 0x00000a)
+            with display.batch():
+                if (display.get_pixel(x, y) == (0, 0, 10)):
+                    display.set_pixel(x, y, 0)
+                ax, ay, az = _icm20948_source().acceleration
+                x = (ax + 8) / 4 + 0.5
+                y = (ay + 8) / 4 + 0.5
+                x = int(min(max(x, 0), 4))
+                y = int(min(max(y, 0), 4))
+
+                if x == 0 or x == 4 or y == 0 or y == 4:
+                    if display.get_pixel(x, y) == (0, 0, 0):
+                        display.set_pixel(x, y, 0x0a000a)
+                        reading = self.get_values()
+                        minx = min(minx, reading[0])
+                        maxx = max(maxx, reading[0])
+                        miny = min(miny, reading[1])
+                        maxy = max(maxy, reading[1])
+                        minz = min(minz, reading[2])
+                        maxz = max(maxz, reading[2])
+                        display.set_pixel(x, y, 0x0a0000)
+                        count += 1
+                else:
+                    display.set_pixel(x, y, 0x00000a)
 
             if (count == 16):
                 break
@@ -235,8 +340,8 @@ class StuduinoBitCompass:
         self._scale = (scale_x, scale_y, scale_z)
 
         # Output config.json file
-        self._set_configureValue(MAGNETIC_OFFSET, self._offset)
-        self._set_configureValue(MAGNETIC_SCALE, self._scale)
+        self._config.update({MAGNETIC_OFFSET: self._offset,
+                             MAGNETIC_SCALE: self._scale})
 
         self._calibrated = True
 
@@ -250,8 +355,7 @@ class StuduinoBitCompass:
     def clear_calibration(self):
         self._offset = (0, 0, 0)
         self._scale = (1, 1, 1)
-        self._set_configureValue(MAGNETIC_OFFSET, None)
-        self._set_configureValue(MAGNETIC_SCALE, None)
+        self._config.update({MAGNETIC_OFFSET: None, MAGNETIC_SCALE: None})
         self._calibrated = False
 
     def heading(self):
@@ -261,7 +365,7 @@ class StuduinoBitCompass:
         if not self._calibrated:
             self.calibrate()
 
-        ax, ay, az = self._icm20948.acceleration
+        ax, ay, az = _icm20948_source().acceleration
         mx, my, mz = self.get_values()
 
         mx = mx
@@ -284,53 +388,6 @@ class StuduinoBitCompass:
     def get_field_strength(self):
         raise NotImplementedError
 
-    def _get_configureValue(self, key):
-        global CONFIG_FILE
-        try:
-            f = io.open(CONFIG_FILE, mode='r')
-            s = f.read()
-            f.close()
-        except OSError as e:
-            # create new file
-            f = io.open(CONFIG_FILE, mode='w')
-            f.close()
-            f = io.open(CONFIG_FILE, mode='r')
-            s = f.read()
-            f.close()
-
-        try:
-            j = json.loads(s)
-            return j[key]
-        except OSError as e:
-            pass
-        except ValueError as e:
-            pass
-        except KeyError as e:
-            pass
-
-        return None
-
-    def _set_configureValue(self, key, value):
-        global CONFIG_FILE
-        f = io.open(CONFIG_FILE, mode='r')
-        s = f.read()
-        f.close()
-
-        try:
-            j = json.loads(s)
-        except ValueError as e:
-            j = {}
-
-        try:
-            j[key] = value
-        except TypeError as e:
-            j.update({key, value})
-        s = json.dumps(j)
-
-        f = io.open(CONFIG_FILE, mode='w')
-        f.write(s)
-        f.close()
-
 __lightsensor = None
 
 
@@ -22,6 +22,7 @@ Author
 Kenji Kawase, Artec Co., Ltd.
 ------------------------------------------------------------------------------
 """
+import array
 import machine
 
 
@@ -47,26 +48,54 @@ class PWMTimerManager():
 """ Pins ----------------------------------------------------------------- """
 
 
+# Current use of a pin
+_MODE_NONE = 0
+_MODE_IN = 1
+_MODE_OUT = 2
+_MODE_PWM = 3
+_MODE_ADC = 4
+
+
 class StuduinoBitDigitalPinMixin(PWMTimerManager):
-    def release_pwm(self):
+    """Pins keep their machine.Pin, PWM and ADC objects once created and
+    track which of them is in use, so repeated calls in the same mode go
+    straight to the object and switching modes re-initialises it instead
+    of constructing a new one.
+    """
+    def _leave_mode(self):
+        """Stop the current use of the pin before another one starts.
+        """
         if self.pwm is not None:
             self.pwm.deinit()                       # stop pwm output.
-            machine.Pin(self.pin, machine.Pin.OUT)  # initalize Pin
             self.pwm = None
 
+    def _digital(self, mode):
+        """Returns the machine.Pin of the pin set to _MODE_IN or _MODE_OUT.
+        """
+        io = self._io
+        if self._mode != mode:
+            self._leave_mode()
+            m = machine.Pin.OUT if mode == _MODE_OUT else machine.Pin.IN
+            if io is None:
+                io = self._io = machine.Pin(self.pin, m)
+            else:
+                io.init(m)
+            self._mode = mode
+        return io
+
+    def release_pwm(self):
+        if self.pwm is not None:
+            self._digital(_MODE_OUT)    # stop pwm output, initalize Pin
+
     def write_digital(self, value):
         """Write a value to the pin that must be either 0, 1, True  or False.
         """
-        self.release_pwm()
-        p = machine.Pin(self.pin, machine.Pin.OUT)
-        p.value(value)
+        self._digital(_MODE_OUT).value(value)
 
     def read_digital(self):
         """Return the pin's value, which will be either 1 or 0.
         """
-        self.release_pwm()
-        p = machine.Pin(self.pin, machine.Pin.IN)
-        return p.value()
+        return self._digital(_MODE_IN).value()
 
     def write_analog(self, value):
         """Write a value to the pin that must be between 0 and 1023.
@@ -97,11 +126,20 @@ class StuduinoBitDigitalPinMixin(PWMTimerManager):
 
     def set_analog_hz(self, hz, timer=-1):
         if self.pwm is None:
-            p = machine.Pin(self.pin, machine.Pin.OUT)
-            if timer != -1:
-                self.pwm = machine.PWM(p, hz, self.duty, timer=timer)
+            if self._pwm is None:
+                p = self._digital(_MODE_OUT)
+                if timer != -1:
+                    self._pwm = machine.PWM(p, hz, self.duty, timer=timer)
+                else:
+                    self._pwm = machine.PWM(p, hz, self.duty)
             else:
-                self.pwm = machine.PWM(p, hz, self.duty)
+                self._leave_mode()
+                if timer != -1:
+                    self._pwm.init(freq=hz, duty=self.duty, timer=timer)
+                else:
+                    self._pwm.init(freq=hz, duty=self.duty)
+            self.pwm = self._pwm
+            self._mode = _MODE_PWM
         else:
             if timer != -1:
                 self.pwm.init(freq=hz, duty=self.duty, timer=timer)
@@ -112,24 +150,111 @@ class StuduinoBitDigitalPinMixin(PWMTimerManager):
         machine.PWM.list()
 
 
+# Raw readings in this range are corrected, the ADC is not linear outside
+# of it.
+_CAL_LOW = 150
+_CAL_HIGH = 2450
+# Number of read()/readraw() pairs averaged to characterise a pin
+_CAL_PAIRS = 8
+# The ESP32 ADC characteristic at 11dB is mV = scale * raw + offset. The
+# offset (mV) is fixed for ADC1 and ADC2, the scale follows the eFuse Vref
+# and is nominally 1100mV * 196602 / 65536 / 4096 per LSB.
+_CAL_OFFSET_MV = (142, 128)
+_CAL_SCALE_MV = 1100 * 196602 / 65536 / 4096
+
+
 class StuduinoBitAnalogPinMixin():
     """Returns the pin's value, which will be between 0 and 1023
+
+    The calibrated reading is a linear function of the raw one in the
+    corrected range. The function is characterised once, when the pin is
+    first set up for reading, and every read after that is a single raw
+    conversion corrected with it.
     """
+    def _analog(self):
+        """Returns the ADC of the pin, set up for reading.
+        """
+        if self._mode != _MODE_ADC:
+            self._leave_mode()
+            adc = self._adc
+            if adc is None:
+                adc = self._adc = machine.ADC(self.pin)
+            # Also routes the pad back to the ADC after digital use.
+            adc.atten(adc.ATTN_11DB)
+            self.adc = adc
+            self._mode = _MODE_ADC
+            if self._cal is None:
+                self.__characterise(adc)
+        return self.adc
+
     def read_analog(self, mv=False):
-        if self.adc is None:
-            self.adc = machine.ADC(self.pin)
-            self.adc.atten(self.adc.ATTN_11DB)
+        adc = self._analog()
 
         if mv:
-            return self.adc.read()
+            return adc.read()
+
+        raw = adc.readraw()
+        if raw < _CAL_LOW or raw > _CAL_HIGH:
+            return raw
+        cal = self._cal
+        return raw * cal[0] + cal[1]
+
+    def __characterise(self, adc):
+        """Fit the correction of raw readings from the averaged read() and
+        readraw() of the current input and the known offset of the ADC.
+        """
+        raw = mv = 0
+        for i in range(_CAL_PAIRS):
+            raw += adc.readraw()
+            mv += adc.read()
+        raw /= _CAL_PAIRS
+        mv /= _CAL_PAIRS
+
+        offset = _CAL_OFFSET_MV[self._adc_unit - 1]
+        if _CAL_LOW <= raw <= _CAL_HIGH:
+            scale = (mv - offset) / raw
         else:
-            raw = self.adc.readraw()
-            calib = self.adc.read()
-            if (raw >= 150) and (raw <= 2450):
-                val = calib / 3300 * 4095
-            else:
-                val = raw
-            return val
+            scale = _CAL_SCALE_MV   # out of the linear range, use nominal
+        k = 4095 / 3300
+        self._cal = (scale * k, offset * k)
+
+    def set_analog_correction(self, scale=None, offset=0):
+        """Set the correction of raw readings to scale * raw + offset, or
+        with scale None, characterise the pin again now.
+        """
+        if scale is None:
+            self.__characterise(self._analog())
+        else:
+            self._cal = (scale, offset)
+
+    def read_analog_burst(self, n, buf=None, mv=False):
+        """Read n samples back to back into buf and return it.
+
+        buf is an array of at least n items, an array('H') is created if
+        it is None. Samples are corrected like read_analog() but rounded
+        to integers.
+        """
+        if buf is None:
+            buf = array.array('H', [0] * n)
+        elif len(buf) < n:
+            raise ValueError('buffer is too small')
+
+        adc = self._analog()
+        if mv:
+            read = adc.read
+            for i in range(n):
+                buf[i] = read()
+            return buf
+
+        readraw = adc.readraw
+        scale, offset = self._cal
+        offset += 0.5
+        for i in range(n):
+            raw = readraw()
+            if _CAL_LOW <= raw <= _CAL_HIGH:
+                raw = int(raw * scale + offset)
+            buf[i] = raw
+        return buf
 
 
 class StuduinoBitDigitalPin(StuduinoBitDigitalPinMixin):
@@ -137,51 +262,102 @@ class StuduinoBitDigitalPin(StuduinoBitDigitalPinMixin):
         self.pin = pin
         self.duty = 0
         self.pwm = None
+        self._io = None
+        self._pwm = None
+        self._mode = _MODE_NONE
 
 
 class StuduinoBitAnalogPin(StuduinoBitAnalogPinMixin):
-    def __init__(self, pin):
+    def __init__(self, pin, adc_unit=1):
         self.pin = pin
         self.adc = None
+        self._adc_unit = adc_unit
+        self._adc = None
+        self._mode = _MODE_NONE
+        self._cal = None            # (scale, offset) of raw readings
+
+    def _leave_mode(self):
+        pass
 
 
 class StuduinoBitAnalogDitialPin(StuduinoBitDigitalPinMixin,
                                  StuduinoBitAnalogPinMixin):
-    def __init__(self, pin):
+    def __init__(self, pin, adc_unit):
         self.pin = pin
         self.duty = 0
         self.pwm = None
         self.adc = None
+        self._adc_unit = adc_unit
+        self._io = None
+        self._pwm = None
+        self._adc = None
+        self._mode = _MODE_NONE
+        self._cal = None            # (scale, offset) of raw readings
 
-    def write_digital(self, value):
-        if self.adc is not None:
-            self.adc.deinit()
-            self.adc = None
-        super().write_digital(value)
+    def _leave_mode(self):
+        super()._leave_mode()
+        self.adc = None     # the ADC object is kept for the next read
 
-    def read_digital(self):
-        if self.adc is not None:
-            self.adc.deinit()
-            self.adc = None
-        return super().read_digital()
 
-    def write_analog(self, value):
-        if self.adc is not None:
-            self.adc.deinit()
-            self.adc = None
-        super().write_analog(value)
+""" ---------------------------------------------------------------------- """
+""" Pin map -------------------------------------------------------------- """
+
+# Capabilities of a terminal
+CAP_INPUT = 0x01
+CAP_OUTPUT = 0x02
+CAP_PWM = 0x04
+CAP_ADC = 0x08
+
+_DIGITAL = CAP_INPUT | CAP_OUTPUT | CAP_PWM
+_ANALOG = CAP_INPUT | CAP_OUTPUT | CAP_PWM | CAP_ADC
+_ANALOG_IN = CAP_INPUT | CAP_ADC        # GPIO34-39 are input only
+
+# Terminal Pn is _PIN_MAP[n], (GPIO, capabilities, ADC unit, ADC channel)
+# or None if the board has no such terminal. ADC unit is 0 without ADC.
+_PIN_MAP = (
+    (32, _ANALOG, 1, 4),        # P0
+    (33, _ANALOG, 1, 5),        # P1
+    (36, _ANALOG_IN, 1, 0),     # P2
+    (39, _ANALOG_IN, 1, 3),     # P3
+    (25, _DIGITAL, 0, 0),       # P4, buzzer
+    (15, _ANALOG, 2, 3),        # P5
+    (26, _DIGITAL, 0, 0),       # P6
+    (5, _DIGITAL, 0, 0),        # P7
+    (14, _ANALOG, 2, 6),        # P8
+    (12, _ANALOG, 2, 5),        # P9
+    (0, _DIGITAL, 0, 0),        # P10
+    (27, _DIGITAL, 0, 0),       # P11
+    (4, _DIGITAL, 0, 0),        # P12
+    (18, _DIGITAL, 0, 0),       # P13
+    (19, _DIGITAL, 0, 0),       # P14
+    (23, _DIGITAL, 0, 0),       # P15
+    (13, _ANALOG, 2, 4),        # P16
+    None,                       # P17
+    None,                       # P18
+    (22, _DIGITAL, 0, 0),       # P19
+    (21, _DIGITAL, 0, 0),       # P20
+)
+
+# 'Pn': n of the terminals in _PIN_MAP
+_PIN_INDEX = dict([('P{}'.format(i), i)
+                   for i, d in enumerate(_PIN_MAP) if d is not None])
+
+
+def pin_descriptor(pin):
+    """Returns (GPIO, capabilities, ADC unit, ADC channel) of the terminal
+    pin, e.g. pin_descriptor('P2') == (36, CAP_INPUT | CAP_ADC, 1, 0)
+    """
+    i = _PIN_INDEX.get(pin)
+    if i is None:
+        raise ValueError("pin must be 'P0'-'P16','P19','P20'")
+    return _PIN_MAP[i]
 
-    def set_analog_hz(self, hz, timer=-1):
-        if self.adc is not None:
-            self.adc.deinit()
-            self.adc = None
-        super().set_analog_hz(hz, timer)
 
-    def read_analog(self, mv=False):
-        if self.pwm is not None:
-            self.pwm.deinit()
-            self.pwm = None
-        return super().read_analog(mv)
+def has_capability(pin, cap):
+    """True if the terminal pin has all of the capabilities in cap.
+    """
+    return pin_descriptor(pin)[1] & cap == cap
+
 
 # for singleton pattern
 # Implement used global value,
@@ -192,119 +368,16 @@ __tpin = [None] * 21
 
 def StuduinoBitTerminal(pin):
     global __tpin
-    if pin == 'P0':
-        i = int(pin[1:])
-        if __tpin[i] is None:
-            __tpin[i] = StuduinoBitAnalogDitialPin(32)
-        return __tpin[i]
-
-    elif pin == 'P1':
-        i = int(pin[1:])
-        if __tpin[i] is None:
-            __tpin[i] = StuduinoBitAnalogDitialPin(33)
-        return __tpin[i]
-
-    elif pin == 'P2':
-        i = int(pin[1:])
-        if __tpin[i] is None:
-            __tpin[i] = StuduinoBitAnalogDitialPin(36)
-        return __tpin[i]
-
-    elif pin == 'P3':
-        i = int(pin[1:])
-        if __tpin[i] is None:
-            __tpin[i] = StuduinoBitAnalogDitialPin(39)
-        return __tpin[i]
-
-    elif pin == 'P4':
-        i = int(pin[1:])
-        if __tpin[i] is None:
-            __tpin[i] = StuduinoBitDigitalPin(25)
-        return __tpin[i]
-
-    elif pin == 'P5':
-        i = int(pin[1:])
-        if __tpin[i] is None:
-            __tpin[i] = StuduinoBitAnalogDitialPin(15)
-        return __tpin[i]
-
-    elif pin == 'P6':
-        i = int(pin[1:])
-        if __tpin[i] is None:
-            __tpin[i] = StuduinoBitDigitalPin(26)
-        return __tpin[i]
-
-    elif pin == 'P7':
-        i = int(pin[1:])
-        if __tpin[i] is None:
-            __tpin[i] = StuduinoBitDigitalPin(5)
-        return __tpin[i]
-
-    elif pin == 'P8':
-        i = int(pin[1:])
-        if __tpin[i] is None:
-            __tpin[i] = StuduinoBitAnalogDitialPin(14)
-        return __tpin[i]
-
-    elif pin == 'P9':
-        i = int(pin[1:])
-        if __tpin[i] is None:
-            __tpin[i] = StuduinoBitAnalogDitialPin(12)
-        return __tpin[i]
-
-    elif pin == 'P10':
-        i = int(pin[1:])
-        if __tpin[i] is None:
-            __tpin[i] = StuduinoBitDigitalPin(0)
-        return __tpin[i]
-
-    elif pin == 'P11':
-        i = int(pin[1:])
-        if __tpin[i] is None:
-            __tpin[i] = StuduinoBitDigitalPin(27)
-        return __tpin[i]
-
-    elif pin == 'P12':
-        i = int(pin[1:])
-        if __tpin[i] is None:
-            __tpin[i] = StuduinoBitDigitalPin(4)
-        return __tpin[i]
-
-    elif pin == 'P13':
-        i = int(pin[1:])
-        if __tpin[i] is None:
-            __tpin[i] = StuduinoBitDigitalPin(18)
-        return __tpin[i]
-
-    elif pin == 'P14':
-        i = int(pin[1:])
-        if __tpin[i] is None:
-            __tpin[i] = StuduinoBitDigitalPin(19)
-        return __tpin[i]
-
-    elif pin == 'P15':
-        i = int(pin[1:])
-        if __tpin[i] is None:
-            __tpin[i] = StuduinoBitDigitalPin(23)
-        return __tpin[i]
-
-    elif pin == 'P16':
-        i = int(pin[1:])
-        if __tpin[i] is None:
-            __tpin[i] = StuduinoBitAnalogDitialPin(13)
-        return __tpin[i]
-
-    elif pin == 'P19':
-        i = int(pin[1:])
-        if __tpin[i] is None:
-            __tpin[i] = StuduinoBitDigitalPin(22)
-        return __tpin[i]
-
-    elif pin == 'P20':
-        i = int(pin[1:])
-        if __tpin[i] is None:
-            __tpin[i] = StuduinoBitDigitalPin(21)
-        return __tpin[i]
-
-    else:
+    i = _PIN_INDEX.get(pin)
+    if i is None:
         raise ValueError("pin must be 'P0'-'P16','P19','P20'")
+
+    t = __tpin[i]
+    if t is None:
+        gpio, caps, unit = _PIN_MAP[i][0], _PIN_MAP[i][1], _PIN_MAP[i][2]
+        if caps & CAP_ADC:
+            t = StuduinoBitAnalogDitialPin(gpio, unit)
+        else:
+            t = StuduinoBitDigitalPin(gpio)
+        __tpin[i] = t
+    return t
@@ -0,0 +1,379 @@
+"""
+Host test harness.
+
+The modules target MicroPython on the Studuino:bit. Here they run on CPython
+against small fakes of machine, neopixel, micropython, utime, network and
+esp, and the repository is importable both as top level modules (the way
+dsply, image or icm20948 import each other) and as the pystubit package.
+"""
+import importlib.abc
+import importlib.machinery
+import importlib.util
+import os
+import struct
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+"""
+time / utime
+"""
+def _ticks_ms():
+    return int(time.monotonic() * 1000)
+
+
+def _ticks_us():
+    return int(time.monotonic() * 1000000)
+
+
+time.ticks_ms = _ticks_ms
+time.ticks_us = _ticks_us
+time.ticks_add = lambda ticks, delta: ticks + delta
+time.ticks_diff = lambda new, old: new - old
+time.sleep_ms = lambda ms: time.sleep(ms / 1000)
+time.sleep_us = lambda us: time.sleep(us / 1000000)
+sys.modules['utime'] = time
+sys.modules['ustruct'] = struct
+
+
+"""
+micropython
+"""
+micropython = types.ModuleType('micropython')
+micropython.const = lambda value: value
+micropython.schedule = lambda func, arg: func(arg)
+sys.modules['micropython'] = micropython
+
+
+"""
+machine
+"""
+machine = types.ModuleType('machine')
+
+
+class Pin:
+    IN = 1
+    OUT = 3
+    PULL_UP = 2
+    IRQ_RISING = 1
+    IRQ_FALLING = 2
+
+    pins = {}
+
+    def __init__(self, id, mode=None, pull=None, value=None):
+        self.id = id
+        self.mode = mode
+        self.handler = None
+        self.trigger = None
+        self._value = 1 if value is None else value
+        Pin.pins[id] = self
+
+    def init(self, mode=None, pull=None, value=None):
+        self.mode = mode
+        if value is not None:
+            self._value = value
+
+    def value(self, value=None):
+        if value is None:
+            return self._value
+        self._value = value
+
+    def on(self):
+        self._value = 1
+
+    def off(self):
+        self._value = 0
+
+    def irq(self, handler=None, trigger=None):
+        self.handler = handler
+        self.trigger = trigger
+
+    def drive(self, value):
+        """Test helper: change the level and raise the IRQ."""
+        self._value = value
+        if self.handler is not None:
+            self.handler(self)
+
+
+class PWM:
+    def __init__(self, pin, freq=0, duty=0, timer=None):
+        self.pin = pin
+        self._freq = freq
+        self._duty = duty
+
+    def freq(self, value=None):
+        if value is None:
+            return self._freq
+        self._freq = value
+
+    def duty(self, value=None):
+        if value is None:
+            return self._duty
+        self._duty = value
+
+    def init(self, freq=None, duty=None, timer=None):
+        if freq is not None:
+            self._freq = freq
+        if duty is not None:
+            self._duty = duty
+
+    def deinit(self):
+        pass
+
+    @staticmethod
+    def list():
+        pass
+
+
+class ADC:
+    ATTN_0DB = 0
+    ATTN_2_5DB = 1
+    ATTN_6DB = 2
+    ATTN_11DB = 3
+    WIDTH_12BIT = 3
+
+    def __init__(self, pin):
+        self.pin = pin
+        self.raw = 2048
+        self.conversions = 0
+
+    def atten(self, value):
+        self.attenuation = value
+
+    def width(self, value):
+        pass
+
+    def readraw(self):
+        self.conversions += 1
+        return self.raw
+
+    def read(self):
+        """Calibrated millivolts, the ADC1 characteristic at 11dB."""
+        self.conversions += 1
+        return int(self.raw * 0.8 + 142)
+
+
+class I2C:
+    def __init__(self, *args, **kwargs):
+        self.freq = kwargs.get('freq')
+
+    def init(self, *args, **kwargs):
+        pass
+
+    def scan(self):
+        return []
+
+
+class Timer:
+    ONE_SHOT = 0
+    PERIODIC = 1
+
+    def __init__(self, id):
+        self.id = id
+        self._timer = None
+
+    def init(self, mode=PERIODIC, period=1000, callback=None):
+        self.deinit()
+        self._timer = threading.Timer(period / 1000, callback, (self,))
+        self._timer.daemon = True
+        self._timer.start()
+
+    def deinit(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+
+machine.Pin = Pin
+machine.PWM = PWM
+machine.ADC = ADC
+machine.I2C = I2C
+machine.Timer = Timer
+sys.modules['machine'] = machine
+
+
+"""
+neopixel
+"""
+neopixel = types.ModuleType('neopixel')
+
+
+class NeoPixel:
+    ORDER = (1, 0, 2, 3)    # GRB
+
+    def __init__(self, pin, n, bpp=3):
+        self.pin = pin
+        self.n = n
+        self.bpp = bpp
+        self.buf = bytearray(n * bpp)
+
+    def __setitem__(self, i, color):
+        offset = i * self.bpp
+        for j in range(self.bpp):
+            self.buf[offset + self.ORDER[j]] = color[j]
+
+    def __getitem__(self, i):
+        offset = i * self.bpp
+        return tuple(self.buf[offset + self.ORDER[j]]
+                     for j in range(self.bpp))
+
+    def fill(self, color):
+        for i in range(self.n):
+            self[i] = color
+
+    def write(self):
+        pass
+
+
+neopixel.NeoPixel = NeoPixel
+sys.modules['neopixel'] = neopixel
+
+
+"""
+network / esp
+"""
+network = types.ModuleType('network')
+network.STA_IF = 0
+network.AP_IF = 1
+network.MODE_LR = 8
+
+
+class WLAN:
+    def __init__(self, interface):
+        self.interface = interface
+
+    def active(self, value=None):
+        return False
+
+    def config(self, *args, **kwargs):
+        pass
+
+
+network.WLAN = WLAN
+sys.modules['network'] = network
+
+esp = types.ModuleType('esp')
+espnow = types.ModuleType('esp.espnow')
+for _name in ('init', 'deinit', 'add_peer', 'on_recv', 'send'):
+    setattr(espnow, _name, lambda *args, **kwargs: None)
+esp.espnow = espnow
+sys.modules['esp'] = esp
+sys.modules['esp.espnow'] = espnow
+
+
+"""
+I2C devices
+"""
+class FakeICM20948Bus:
+    """I2C bus with an ICM20948 at 0x68 and its AK09916 at 0x0c.
+
+    The registers are plain byte maps, the ICM20948 ones per user bank
+    selected with 0x7f. set_motion() and set_magnetic() load raw samples.
+    """
+    ICM = 0x68
+    AK = 0x0c
+
+    def __init__(self):
+        self.bank = 0
+        self.icm = {(0, 0x00): 0xea,     # WHO_AM_I
+                    (0, 0x1a): 0x01}     # INT_STATUS_1, raw data ready
+        self.ak = bytearray(0x80)
+        self.ak[0x01] = 0x09            # WIA2
+        self.reads = 0
+
+    def set_motion(self, accel, gyro):
+        data = struct.pack('>6h', *(tuple(accel) + tuple(gyro)))
+        for i, v in enumerate(data):
+            self.icm[(0, 0x2d + i)] = v
+
+    def set_magnetic(self, xyz):
+        self.ak[0x11:0x17] = struct.pack('<3h', *xyz)
+
+    def scan(self):
+        return [self.AK, self.ICM]
+
+    def readfrom_mem_into(self, addr, register, buf):
+        self.reads += 1
+        for i in range(len(buf)):
+            buf[i] = self.__read(addr, register + i)
+
+    def readfrom_mem(self, addr, register, n):
+        buf = bytearray(n)
+        self.readfrom_mem_into(addr, register, buf)
+        return buf
+
+    def writeto_mem(self, addr, register, buf):
+        for i, v in enumerate(buf):
+            self.__write(addr, register + i, v)
+
+    def __read(self, addr, register):
+        if addr == self.AK:
+            return self.ak[register]
+        if addr != self.ICM:
+            raise OSError(19)   # ENODEV, no ACK
+        if register == 0x7f:
+            return self.bank << 4
+        return self.icm.get((self.bank, register), 0)
+
+    def __write(self, addr, register, value):
+        if addr == self.AK:
+            self.ak[register] = value
+        elif addr != self.ICM:
+            raise OSError(19)
+        elif register == 0x7f:
+            self.bank = (value >> 4) & 0x03
+        else:
+            self.icm[(self.bank, register)] = value
+
+
+@pytest.fixture
+def icm_bus():
+    return FakeICM20948Bus()
+
+
+"""
+Repository modules
+
+MicroPython does not mangle private names, and the modules refer to their
+__SBxxx singleton classes from inside the class body. After a repository
+module runs, the mangled spelling CPython looks up is bound to the class.
+"""
+class _AliasingLoader(importlib.machinery.SourceFileLoader):
+    def exec_module(self, module):
+        super().exec_module(module)
+        for name, value in list(vars(module).items()):
+            if name.startswith('__') and not name.endswith('__') \
+                    and isinstance(value, type):
+                setattr(module, '_' + name.lstrip('_') + name, value)
+
+
+class _RepositoryFinder(importlib.abc.MetaPathFinder):
+    def find_spec(self, fullname, path, target=None):
+        if fullname == 'pystubit':
+            return importlib.util.spec_from_file_location(
+                fullname, os.path.join(ROOT, '__init__.py'),
+                submodule_search_locations=[ROOT])
+
+        package, _, name = fullname.rpartition('.')
+        if package not in ('', 'pystubit'):
+            return None
+        filename = os.path.join(ROOT, name + '.py')
+        if name in ('__init__', 'test') or not os.path.exists(filename):
+            return None
+        return importlib.util.spec_from_file_location(
+            fullname, filename, loader=_AliasingLoader(fullname, filename))
+
+
+sys.meta_path.insert(0, _RepositoryFinder())
+
+
+@pytest.fixture(autouse=True)
+def _config_dir(tmp_path, monkeypatch):
+    """config.json is read and written in the working directory."""
+    monkeypatch.chdir(tmp_path)
@@ -0,0 +1,40 @@
+PERIPHERALS = (
+    'button_a', 'button_b', 'buttons', 'Image', 'display',
+    'p0', 'p1', 'p2', 'p3', 'p4', 'p5', 'p6', 'p7', 'p8', 'p9',
+    'p10', 'p11', 'p12', 'p13', 'p14', 'p15', 'p16', 'p19', 'p20',
+    'i2c', 'spi', 'lightsensor', 'temperature',
+    'accelerometer', 'gyro', 'compass', 'uart', 'buzzer', 'CreateWLAN',
+)
+
+
+def test_import_star_exposes_every_peripheral():
+    namespace = {}
+    exec('from pystubit.board import *', namespace)
+    for name in PERIPHERALS:
+        assert name in namespace, name
+
+
+def test_import_star_creates_no_peripheral():
+    namespace = {}
+    exec('from pystubit.board import *', namespace)
+    for name in PERIPHERALS:
+        if name in ('Image', 'CreateWLAN'):
+            continue
+        assert namespace[name]._obj is None, name
+
+
+def test_peripherals_are_created_on_first_use():
+    from pystubit import inst
+
+    inst.buzzer.is_playing()
+    assert inst.buzzer._obj is not None
+    assert type(inst.buzzer._obj).__name__ == 'StuduinoBitBuzzer'
+
+
+def test_attributes_are_set_on_the_peripheral():
+    from pystubit import inst
+
+    inst.p0.custom = 1
+    assert inst.p0._obj.custom == 1
+    assert inst.p0.custom == 1
+    assert 'custom' not in vars(inst.p0)
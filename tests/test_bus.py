@@ -0,0 +1,33 @@
+from pystubit import bus
+from pystubit.const import I2C_FREQ
+
+
+def test_bus_starts_at_the_board_default():
+    assert bus.get_i2c_freq() == I2C_FREQ
+    assert bus.get_i2c_object().freq == I2C_FREQ
+
+
+def test_init_changes_the_shared_frequency():
+    i2c = bus.StuduinoBitI2C()
+    try:
+        i2c.init(freq=1000000)
+        assert bus.get_i2c_freq() == 1000000
+
+        i2c.init()      # keeps the current clock
+        assert bus.get_i2c_freq() == 1000000
+    finally:
+        bus.set_i2c_freq(I2C_FREQ)
+
+
+def test_every_user_shares_one_lock():
+    import threading
+
+    locks = []
+    threads = [threading.Thread(target=lambda: locks.append(
+        bus.get_i2c_lock())) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert all(lock is bus.get_i2c_lock() for lock in locks)
+    assert bus.StuduinoBitI2C().transaction() is bus.get_i2c_lock()
@@ -0,0 +1,93 @@
+import time
+
+from machine import Pin
+from pystubit.button import StuduinoBitButton, StuduinoBitButtons, \
+    CLICK, LONG_PRESS, CHORD, SEQUENCE_AB, SEQUENCE_BA
+
+PIN_A = 15
+PIN_B = 27
+
+
+def test_lone_click_reaches_handler_without_another_edge():
+    events = []
+    button = StuduinoBitButton('A')
+    button.set_timing(long_press=600, double_click=100)
+    button.set_handler(events.append)
+    pin = Pin.pins[PIN_A]
+    time.sleep(0.05)            # edges right after setup count as bounce
+    try:
+        pin.drive(0)
+        time.sleep(0.05)
+        pin.drive(1)
+        assert events == []     # may still become a DOUBLE_CLICK
+
+        time.sleep(0.3)
+        assert events == [CLICK]
+    finally:
+        button.set_handler(None)
+
+
+def test_long_press_is_reported_while_held():
+    events = []
+    button = StuduinoBitButton('A')
+    button.set_timing(long_press=150, double_click=100)
+    button.set_handler(events.append)
+    pin = Pin.pins[PIN_A]
+    time.sleep(0.05)            # edges right after setup count as bounce
+    try:
+        pin.drive(0)
+        time.sleep(0.3)
+        assert events == [LONG_PRESS]
+    finally:
+        pin.drive(1)
+        button.set_handler(None)
+
+
+def test_chords_and_sequences_of_both_buttons():
+    buttons = StuduinoBitButtons()
+    buttons.set_timing(chord=100, sequence=200)
+    a = Pin.pins[PIN_A]
+    b = Pin.pins[PIN_B]
+    time.sleep(0.05)            # edges right after setup count as bounce
+
+    def press(pin, hold=0.03):
+        pin.drive(0)
+        time.sleep(hold)
+        pin.drive(1)
+
+    try:
+        # Presses close together are a chord, releasing it starts no
+        # sequence.
+        a.drive(0)
+        time.sleep(0.03)
+        b.drive(0)
+        assert buttons.is_pressed()
+        time.sleep(0.03)
+        a.drive(1)
+        time.sleep(0.03)
+        b.drive(1)
+        assert buttons.get_event() == CHORD
+        time.sleep(0.05)
+        press(a)
+        assert buttons.get_event() is None
+
+        time.sleep(0.25)
+        press(a)
+        time.sleep(0.05)
+        press(b)
+        time.sleep(0.05)
+        press(a)
+        assert buttons.get_event() == SEQUENCE_AB
+        assert buttons.get_event() == SEQUENCE_BA
+        assert buttons.get_event() is None
+
+        # Too slow for a sequence.
+        time.sleep(0.25)
+        press(b)
+        time.sleep(0.25)
+        press(a)
+        assert buttons.get_event() is None
+    finally:
+        a.drive(1)
+        b.drive(1)
+        buttons.set_timing()
@@ -0,0 +1,164 @@
+import time
+
+import pytest
+
+from machine import PWM
+from pystubit.bzr import StuduinoBitBuzzer, _MelodyPlayer, _unpack_melody, \
+    FREQ_TABLE, NOTE_FIRST, NOTE_LAST, REST, note_number, pack_melody
+
+
+class Recorder:
+    """tone() of the player, records (ms since start, hz)."""
+    def __init__(self):
+        self.start = time.monotonic()
+        self.tones = []
+
+    def __call__(self, hz):
+        self.tones.append((int((time.monotonic() - self.start) * 1000), hz))
+
+    def hz(self):
+        return [hz for _, hz in self.tones]
+
+
+def wait_idle(player, timeout=2.0):
+    end = time.monotonic() + timeout
+    while player.is_busy():
+        assert time.monotonic() < end, 'player still busy'
+        time.sleep(0.005)
+
+
+def test_notes_change_on_their_deadlines():
+    tone = Recorder()
+    player = _MelodyPlayer(tone)
+    player.play(lambda: iter([(440, 50), (0, 30), (880, 50)]))
+
+    # The first note starts from play(), nothing waits for a poll.
+    assert tone.hz() == [440]
+    assert player.is_busy()
+    wait_idle(player)
+
+    assert tone.hz() == [440, 0, 880, 0]
+    starts = [ms for ms, _ in tone.tones]
+    assert 45 <= starts[1] < 80
+    assert 75 <= starts[2] < 110
+    assert 125 <= starts[3] < 170
+
+
+def test_queue_plays_after_the_current_melody():
+    tone = Recorder()
+    player = _MelodyPlayer(tone)
+    player.play(lambda: iter([(440, 20)]))
+    player.play(lambda: iter([(880, 20)]), replace=False)
+    wait_idle(player)
+    assert tone.hz() == [440, 880, 0]
+
+
+def test_replace_and_stop_cancel_pending_notes():
+    tone = Recorder()
+    player = _MelodyPlayer(tone)
+    player.play(lambda: iter([(440, 30), (523, 30)]))
+    player.play(lambda: iter([(880, 30), (988, 300)]), loop=True)
+    time.sleep(0.05)
+    player.stop()
+    assert not player.is_busy()
+    heard = tone.hz()
+    time.sleep(0.1)
+
+    assert tone.hz() == heard
+    assert heard == [440, 880, 988, 0]
+
+
+def test_loop_repeats_until_something_is_queued():
+    tone = Recorder()
+    player = _MelodyPlayer(tone)
+    player.play(lambda: iter([(440, 10), (880, 10)]), loop=True)
+    time.sleep(0.08)
+    assert player.is_busy()
+    player.play(lambda: iter([(523, 10)]), replace=False)
+    wait_idle(player)
+
+    heard = tone.hz()
+    assert heard[:4] == [440, 880, 440, 880]
+    assert heard[-2:] == [523, 0]
+
+
+def test_empty_looped_melody_is_dropped():
+    tone = Recorder()
+    player = _MelodyPlayer(tone)
+    player.play(lambda: iter([]), loop=True)
+    assert not player.is_busy()
+    assert tone.hz() == [0]
+
+
+def test_frequency_table_is_equal_temperament():
+    assert len(FREQ_TABLE) == NOTE_LAST - NOTE_FIRST + 1
+    for nn in range(NOTE_FIRST, NOTE_LAST + 1):
+        hz = 440 * 2 ** ((nn - 69) / 12)
+        assert abs(FREQ_TABLE[nn - NOTE_FIRST] - hz) <= 1, nn
+
+
+def test_note_names():
+    assert note_number('C3') == NOTE_FIRST
+    assert note_number('A4') == 69
+    assert note_number('CS4') == 61
+    assert note_number('G9') == NOTE_LAST
+    assert note_number('72') == 72
+    for bad in ('B2', 'GS9', 'ES4', '_4', 'H4', '47', '128'):
+        with pytest.raises(ValueError):
+            note_number(bad)
+
+
+def test_packed_melody_round_trip():
+    melody = [('C4', 200), (None, 100), ('A4', 504), ('72', 246)]
+    data = pack_melody(melody)
+    assert data == bytes((60, 20, REST, 10, 69, 50, 72, 25))
+    assert list(_unpack_melody(data, 10)) == \
+        [(262, 200), (0, 100), (440, 500), (523, 250)]
+
+    data = pack_melody(melody, unit=20)
+    assert list(_unpack_melody(data, 20)) == \
+        [(262, 200), (0, 100), (440, 500), (523, 240)]
+
+    with pytest.raises(ValueError):
+        pack_melody([('C4', 2560)])
+
+
+def test_tone_only_writes_what_changed(monkeypatch):
+    writes = []
+    freq, duty = PWM.freq, PWM.duty
+
+    def logged(name, method):
+        def write(self, value=None):
+            if value is not None:
+                writes.append((name, value))
+            return method(self, value)
+        return write
+
+    monkeypatch.setattr(PWM, 'freq', logged('freq', freq))
+    monkeypatch.setattr(PWM, 'duty', logged('duty', duty))
+    buzzer = StuduinoBitBuzzer()
+    try:
+        buzzer.tone(440, 512)
+        del writes[:]
+
+        buzzer.tone(440, 512)
+        assert writes == []
+        buzzer.tone(440, 256)
+        assert writes == [('duty', 256)]
+        buzzer.tone(880, 256)
+        assert writes[1:] == [('freq', 880)]
+        buzzer.tone(0, 256)
+        assert writes[2:] == [('duty', 0)]
+        buzzer.tone(0, 100)
+        assert writes[3:] == []
+        buzzer.tone(880, 256)
+        assert writes[3:] == [('duty', 256)]
+
+        # Anything else on the buzzer ends the stream, the next tone()
+        # writes both again.
+        buzzer.off()
+        del writes[:]
+        buzzer.tone(880, 256)
+        assert ('freq', 880) in writes and writes[-1] == ('duty', 256)
+    finally:
+        buzzer.off()
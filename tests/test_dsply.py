@@ -0,0 +1,232 @@
+import time
+
+import pytest
+
+import dsply
+from dsply import _AnimationScheduler, _FrameStats
+from image import StuduinoBitImage as Image
+
+
+class CountingNeoPixel(dsply.NeoPixel):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.writes = 0
+
+    def write(self):
+        self.writes += 1
+
+
+@pytest.fixture
+def display(monkeypatch):
+    """A new display, its NeoPixels are display.np."""
+    created = []
+
+    def neopixel(*args, **kwargs):
+        np = CountingNeoPixel(*args, **kwargs)
+        created.append(np)
+        return np
+
+    monkeypatch.setattr(dsply, 'NeoPixel', neopixel)
+    display = getattr(dsply, '__SBDisplay')()
+    display.np = created[0]
+    return display
+
+
+def lit(np):
+    """The (x, y) of the lit pixels, pixel i of the chain is
+    x = 4 - i // 5, y = i % 5."""
+    return {(4 - i // 5, i % 5) for i in range(25) if any(np[i])}
+
+
+def wait_idle(scheduler, timeout=1.0):
+    end = time.monotonic() + timeout
+    while scheduler.is_busy():
+        assert time.monotonic() < end, 'scheduler still busy'
+        time.sleep(0.005)
+
+
+def test_scheduler_plays_queued_animations_in_order():
+    shown = []
+    scheduler = _AnimationScheduler(_FrameStats())
+
+    def frames(name):
+        def animation():
+            for i in range(3):
+                shown.append((name, i))
+                yield 5
+        return animation
+
+    scheduler.play(frames('a'))
+    scheduler.play(frames('b'), replace=False)
+    wait_idle(scheduler)
+    assert shown == [('a', 0), ('a', 1), ('a', 2),
+                     ('b', 0), ('b', 1), ('b', 2)]
+
+    # The idle thread wakes up for the next animation.
+    scheduler.play(frames('c'))
+    wait_idle(scheduler)
+    assert shown[-1] == ('c', 2)
+
+
+def test_empty_looped_animation_is_dropped():
+    scheduler = _AnimationScheduler(_FrameStats())
+    scheduler.play(lambda: iter(()), loop=True)
+    wait_idle(scheduler)
+
+
+def test_failing_animation_is_reported_and_dropped(capsys):
+    shown = []
+    scheduler = _AnimationScheduler(_FrameStats())
+
+    def broken():
+        yield 5
+        raise ValueError('bad frame')
+
+    def fine():
+        shown.append(1)
+        yield 5
+
+    scheduler.play(broken)
+    scheduler.play(fine, replace=False)
+    wait_idle(scheduler)
+    assert shown == [1]
+    assert 'bad frame' in capsys.readouterr().out
+
+
+def test_unchanged_frames_are_not_written(display):
+    np = display.np
+    image = Image('90000:09000:00900:00090:00009')
+    display.show(image)
+    writes = np.writes
+    assert lit(np) == {(i, i) for i in range(5)}
+    assert np[20] == (0x1f, 0, 0)
+
+    display.show(image)
+    display.show(image.copy())
+    assert np.writes == writes
+
+    display.show(Image('00009:00090:00900:09000:90000'))
+    assert np.writes == writes + 1
+    assert lit(np) == {(4 - i, i) for i in range(5)}
+
+
+def test_show_mask_uses_the_palette(display):
+    np = display.np
+    mask = bytearray(25)
+    mask[0] = 1             # (0, 0)
+    mask[7] = 2             # (2, 1)
+    display.show_mask(mask, (0x1f0000, 0x00001f))
+    writes = np.writes
+    assert lit(np) == {(0, 0), (2, 1)}
+    assert np[20] == (0x1f, 0, 0)
+    assert np[11] == (0, 0, 0x1f)
+    assert display.get_pixel(2, 1) == (0, 0, 0x1f)
+
+    display.show_mask(bytes(mask), (0x1f0000, 0x00001f))
+    assert np.writes == writes
+
+
+def test_batch_writes_once_when_it_ends(display):
+    np = display.np
+    writes = np.writes
+    with display.batch():
+        for x in range(5):
+            display.set_pixel(x, 2, 0x1f0000)
+        with display.batch():
+            display.set_pixel(0, 0, (0, 0x1f, 0))
+        assert np.writes == writes
+    assert np.writes == writes + 1
+    assert lit(np) == {(x, 2) for x in range(5)} | {(0, 0)}
+    assert display.get_pixel(0, 0) == (0, 0x1f, 0)
+
+    display.set_pixel(4, 4, 0x00001f, flush=False)
+    assert np.writes == writes + 1
+    display.show_buffer()
+    assert np.writes == writes + 2
+    assert np[4] == (0, 0, 0x1f)
+
+
+def test_pacer_takes_render_time_out_of_the_delay(monkeypatch):
+    now = [1000]
+    monkeypatch.setattr(time, 'ticks_ms', lambda: now[0])
+    stats = _FrameStats()
+    pacer = dsply._FramePacer(stats)
+
+    assert pacer.next(100) == 100
+    now[0] = 1130                   # rendering took 30 ms
+    assert pacer.next(100) == 70
+    now[0] = 1250
+    assert pacer.next(100) == 50
+
+    # A bit late: catch up on the next frame.
+    now[0] = 1450
+    assert pacer.next(100) == 0
+    assert pacer.next(100) == 50
+
+    # More than a frame late: start over instead of rushing frames.
+    now[0] = 1750
+    assert pacer.next(100) == 0
+    assert pacer.next(100) == 100
+
+    frames, mean, worst = stats.get()
+    assert frames == 7
+    assert worst == 150
+    assert mean == pytest.approx((50 + 150) / 7)
+
+    stats.reset()
+    assert stats.get() == (0, 0, 0)
+
+
+def test_brightness_and_gamma_map_the_shown_colors(display):
+    np = display.np
+    display.set_pixel(4, 4, (31, 16, 0))
+    assert np[4] == (31, 16, 0)
+
+    display.set_brightness(4.5)
+    assert np[4] == (16, 8, 0)
+    display.set_brightness(0)
+    assert np[4] == (0, 0, 0)
+    assert display.get_pixel(4, 4) == (31, 16, 0)
+
+    display.set_brightness(9)
+    display.set_gamma(2.0)
+    assert np[4] == (31, 8, 0)
+    # Pixels set later go through the same table.
+    display.set_pixel(0, 0, (0, 0, 16))
+    assert np[20] == (0, 0, 8)
+
+    display.set_gamma(1.0)
+    assert np[4] == (31, 16, 0)
+    assert np[20] == (0, 0, 16)
+
+    with pytest.raises(ValueError):
+        display.set_brightness(10)
+    with pytest.raises(ValueError):
+        display.set_gamma(0)
+
+
+def test_scroll_strips_are_cached_least_recently_used(display, monkeypatch):
+    built = []
+    character_rows = dsply.character_rows
+
+    def counting(c):
+        built.append(c)
+        return character_rows(c)
+
+    monkeypatch.setattr(dsply, 'character_rows', counting)
+
+    def scroll(string):
+        del built[:]
+        display.scroll(string, delay=0)
+        return ''.join(built)
+
+    for string in ('A', 'B', 'C', 'D'):
+        assert scroll(string) == string
+    assert scroll('A') == ''
+    assert lit(display.np) == set()
+
+    # Four strings are kept, 'B' is the least recently used one.
+    assert scroll('E') == 'E'
+    assert scroll('A') == ''
+    assert scroll('B') == 'B'
+    assert scroll('C') == 'C'
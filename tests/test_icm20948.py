@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+from icm20948 import ICM20948
+from icm_async import ICM20948Stream
+
+
+def take(stream, n):
+    async def run():
+        samples = []
+        async for sample in stream:
+            samples.append(sample)
+            if len(samples) == n:
+                stream.close()
+        return samples
+    return asyncio.run(run())
+
+
+def test_probe_rejects_other_devices(icm_bus):
+    icm_bus.icm[(0, 0x00)] = 0x00
+    with pytest.raises(RuntimeError):
+        ICM20948(icm_bus)
+
+
+def test_stream_reads_motion_and_magnetic_samples(icm_bus):
+    icm = ICM20948(icm_bus)
+    icm_bus.set_motion((0, -8192, 16384), (131, 0, -262))
+    icm_bus.set_magnetic((100, 0, -200))
+
+    stream = icm.stream(rate=200)
+    assert isinstance(stream, ICM20948Stream)
+    samples = take(stream, 3)
+
+    assert len(samples) == 3
+    assert icm_bus.icm[(0, 0x11)] & 0x01    # data ready latched
+    ax, ay, az, gx, gy, gz, mx, my, mz = samples[-1]
+    assert (ax, ay, az) == pytest.approx((0, -4.903325, 9.80665))
+    assert (gx, gy, gz) == pytest.approx((1, 0, -2))
+    assert (mx, my, mz) == pytest.approx((15, 0, -30))
+
+
+def test_stream_without_magnetometer(icm_bus):
+    icm = ICM20948(icm_bus)
+    icm_bus.set_motion((16384, 0, 0), (0, 0, 0))
+    icm_bus.set_magnetic((100, 100, 100))
+
+    sample = take(ICM20948Stream(icm, 100, magnetic=False), 1)[0]
+    assert sample[0] == pytest.approx(9.80665)
+    assert sample[6:] == (0, 0, 0)
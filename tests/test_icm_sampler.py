@@ -0,0 +1,70 @@
+import time
+
+from icm_sampler import ICM20948Sampler
+
+
+class CountingICM:
+    """Every sample is n in all nine channels, n counting up from 1."""
+    def __init__(self):
+        self.n = 0
+
+    @property
+    def motion(self):
+        self.n += 1
+        return (self.n,) * 6
+
+    @property
+    def magnetic(self):
+        return (self.n,) * 3
+
+
+class RacingBuffer(list):
+    """A frame buffer that lets the writer publish while it is copied."""
+    def __init__(self, values, hooks):
+        super().__init__(values)
+        self.hooks = hooks
+
+    def __iter__(self):
+        if self.hooks:
+            self.hooks.pop()()
+        return super().__iter__()
+
+
+def test_frame_returns_the_latest_published_sample():
+    sampler = ICM20948Sampler(CountingICM())
+    sampler._sample()
+    assert sampler.frame() == (1, (1,) * 9)
+    sampler._sample()
+    assert sampler.frame() == (2, (2,) * 9)
+    assert sampler.acceleration == (2, 2, 2)
+    assert sampler.magnetic == (2, 2, 2)
+
+
+def test_frame_retries_when_a_sample_is_published_during_the_copy():
+    sampler = ICM20948Sampler(CountingICM())
+    sampler._sample()
+    hooks = [sampler._sample]
+    sampler._buf = (RacingBuffer(sampler._buf[0], hooks),
+                    RacingBuffer(sampler._buf[1], hooks))
+
+    assert sampler.frame() == (2, (2,) * 9)
+    assert hooks == []
+
+
+def test_background_frames_are_coherent():
+    sampler = ICM20948Sampler(CountingICM(), rate=1000)
+    sampler.start()
+    try:
+        # start() publishes a frame before returning.
+        assert sampler.seq >= 1
+        end = time.monotonic() + 0.1
+        last = 0
+        while time.monotonic() < end:
+            seq, values = sampler.frame()
+            assert values == (values[0],) * 9
+            assert seq >= last
+            last = seq
+    finally:
+        sampler.stop()
+    assert not sampler.is_running()
+    assert last > 1
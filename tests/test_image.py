@@ -0,0 +1,184 @@
+import array
+import random
+
+from image import StuduinoBitImage as Image
+
+
+def pixels(img):
+    return [img.get_pixel(x, y)
+            for y in range(img.height()) for x in range(img.width())]
+
+
+def test_invert_treats_every_brightness_as_lit():
+    img = Image(3, 1, array.array('b', [9, 2, 0]))
+    assert pixels(img.invert()) == [0, 0, 1]
+
+
+def test_add_treats_every_brightness_as_lit():
+    a = Image(3, 1, array.array('b', [9, 3, 0]))
+    b = Image(3, 1, array.array('b', [0, 6, 0]))
+    assert pixels(a + b) == [1, 1, 0]
+
+
+def test_invert_and_add_match_per_pixel_reference():
+    values = array.array('b', [(i * 7) % 10 for i in range(25)])
+    other = array.array('b', [(i * 3) % 10 for i in range(25)])
+    a = Image(5, 5, values)
+    b = Image(5, 5, other)
+
+    assert pixels(a.invert()) == [0 if v else 1 for v in values]
+    assert pixels(a + b) == [1 if v or w else 0
+                             for v, w in zip(values, other)]
+
+
+def test_builtin_images_are_plain_class_attributes():
+    from image_const1 import BUILTIN_NAMES
+    from image_const2 import builtin_image
+
+    for name in BUILTIN_NAMES:
+        assert isinstance(Image.__dict__[name], Image), name
+        assert repr(Image.__dict__[name]) == repr(builtin_image(name))
+    assert Image.ALL_CLOCKS[0] is Image.CLOCK12
+    assert pixels(Image.HEART)[:5] == [0, 1, 0, 1, 0]
+
+
+def test_builtin_images_are_exported_from_image():
+    from image import HEART, ALL_ARROWS, ALL_CLOCKS
+
+    assert HEART is Image.HEART
+    assert ALL_ARROWS == Image.ALL_ARROWS and len(ALL_ARROWS) == 8
+    assert ALL_CLOCKS[0] is Image.CLOCK12
+
+
+# Per-pixel reference for the bulk operations. A pixel is (value, color)
+# with the color as get_pixel_color(hex=True) reports it, 0 when unlit.
+
+def snapshot(img):
+    return [(img.get_pixel(x, y), img.get_pixel_color(x, y, hex=True))
+            for y in range(img.height()) for x in range(img.width())]
+
+
+def random_color(rng):
+    return (rng.randrange(32) << 16) | (rng.randrange(32) << 8) | \
+        rng.randrange(32)
+
+
+def random_image(rng, width, height, colored=True):
+    img = Image(width, height)
+    base = random_color(rng)
+    img.set_base_color(base)
+    for y in range(height):
+        for x in range(width):
+            r = rng.randrange(3)
+            if r == 1:
+                img.set_pixel(x, y, rng.randrange(1, 10))
+            elif r == 2 and colored:
+                img.set_pixel_color(x, y, random_color(rng))
+    return img, base
+
+
+def channels(c):
+    return ((c >> 16) & 0xff, (c >> 8) & 0xff, c & 0xff)
+
+
+def color(r, g, b):
+    return (r << 16) | (g << 8) | b
+
+
+def scaled(c, n):
+    return color(*[min(int(v * n), 31) for v in channels(c)])
+
+
+def added(c1, c2):
+    return color(*[min(a + b, 31)
+                   for a, b in zip(channels(c1), channels(c2))])
+
+
+def test_mul_scales_every_color():
+    rng = random.Random(1)
+    for n in (0, 0.5, 1, 2, 3.5):
+        img, base = random_image(rng, 5, 5)
+        expected = [(v, scaled(c, n) if v else 0) for v, c in snapshot(img)]
+        assert snapshot(img * n) == expected
+
+
+def test_invert_lights_unlit_pixels_in_the_base_color():
+    rng = random.Random(2)
+    for i in range(20):
+        img, base = random_image(rng, rng.randrange(1, 8), 5)
+        expected = [(0, 0) if v else (1, base) for v, c in snapshot(img)]
+        assert snapshot(img.invert()) == expected
+
+
+def test_fill_clears_pixel_colors():
+    rng = random.Random(3)
+    img, base = random_image(rng, 5, 5)
+    img.fill(7)
+    assert snapshot(img) == [(1, base)] * 25
+    img.fill(0)
+    assert snapshot(img) == [(0, 0)] * 25
+
+
+def test_colored_add_matches_reference():
+    rng = random.Random(4)
+    for i in range(50):
+        a, abase = random_image(rng, 5, 5, colored=rng.randrange(2))
+        b, bbase = random_image(rng, 5, 5, colored=rng.randrange(2))
+        expected = []
+        for (va, ca), (vb, cb) in zip(snapshot(a), snapshot(b)):
+            if va and vb:
+                expected.append((1, added(ca, cb)))
+            elif va or vb:
+                expected.append((1, ca | cb))
+            else:
+                expected.append((0, 0))
+        assert snapshot(a + b) == expected
+
+
+def region(img, x, y, w, h):
+    """Pixels of the w x h rectangle at (x, y), (0, 0) outside of img."""
+    pixels = snapshot(img)
+    width = img.width()
+    out = []
+    for j in range(h):
+        for i in range(w):
+            sx, sy = x + i, y + j
+            if 0 <= sx < width and 0 <= sy < img.height():
+                out.append(pixels[sy * width + sx])
+            else:
+                out.append((0, 0))
+    return out
+
+
+def test_blit_matches_reference():
+    rng = random.Random(5)
+    for i in range(200):
+        src, sbase = random_image(rng, rng.randrange(1, 8),
+                                  rng.randrange(1, 6), rng.randrange(2))
+        dst, dbase = random_image(rng, rng.randrange(1, 8),
+                                  rng.randrange(1, 6), rng.randrange(2))
+        x, y = rng.randrange(-3, 8), rng.randrange(-3, 6)
+        w, h = rng.randrange(0, 9), rng.randrange(0, 7)
+        xd, yd = rng.randrange(-3, 8), rng.randrange(-3, 6)
+
+        expected = snapshot(dst)
+        copied = region(src, x, y, w, h)
+        for j in range(h):
+            for k in range(w):
+                dx, dy = xd + k, yd + j
+                if 0 <= dx < dst.width() and 0 <= dy < dst.height():
+                    expected[dy * dst.width() + dx] = copied[j * w + k]
+
+        dst.blit(src, x, y, w, h, xd, yd)
+        assert snapshot(dst) == expected, (x, y, w, h, xd, yd)
+
+
+def test_crop_matches_reference():
+    rng = random.Random(6)
+    for i in range(50):
+        img, base = random_image(rng, 5, 5)
+        x, y = rng.randrange(-2, 6), rng.randrange(-2, 6)
+        w, h = rng.randrange(1, 7), rng.randrange(1, 7)
+        cropped = img.crop(x, y, w, h)
+        assert (cropped.width(), cropped.height()) == (w, h)
+        assert snapshot(cropped) == region(img, x, y, w, h)
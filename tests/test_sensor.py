@@ -0,0 +1,46 @@
+import pytest
+
+from pystubit import sensor
+from pystubit.icm20948 import ICM20948
+
+
+@pytest.fixture
+def icm(icm_bus, monkeypatch):
+    icm = ICM20948(icm_bus)
+    monkeypatch.setattr(sensor, '__icm20948', icm)
+    return icm
+
+
+def test_gyro_offset_is_kept_in_dps(icm_bus, icm):
+    icm_bus.set_motion((0, 0, 16384), (131, -262, 0))   # 1, -2, 0 dps
+    gyro = sensor.StuduinoBitGyro(sf='rps')
+
+    assert gyro.calibrate(count=4, delay=0) == pytest.approx((1, -2, 0))
+    assert gyro.get_values() == (0, 0, 0)
+
+    gyro.set_sf('dps')
+    assert gyro.get_values() == (0, 0, 0)
+
+    stored = sensor.StuduinoBitGyro(sf='dps')
+    assert tuple(stored._offset) == pytest.approx((1, -2, 0))
+    stored.clear_calibration()
+    assert stored.get_x() == 1
+
+
+def test_accelerometer_calibration_is_kept_in_g(icm_bus, icm):
+    # 0.01g bias on X and Z with the board lying flat
+    icm_bus.set_motion((164, 0, 16384 + 164), (0, 0, 0))
+    accelerometer = sensor.StuduinoBitAccelerometer(sf='ms2')
+
+    offset = accelerometer.calibrate(count=4, delay=0)
+    assert offset == pytest.approx((0.01, 0, 0.01), abs=1e-4)
+    assert accelerometer.get_x() == 0
+    assert accelerometer.get_z() == pytest.approx(9.8, abs=0.01)
+
+    accelerometer.set_sf('mg')
+    assert accelerometer.get_values() == (0, 0, 1000)
+
+    stored = sensor.StuduinoBitAccelerometer(sf='mg')
+    assert tuple(stored._offset) == pytest.approx(offset)
+    stored.clear_calibration()
+    assert stored.get_x() == pytest.approx(10, abs=0.1)
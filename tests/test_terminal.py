@@ -0,0 +1,93 @@
+import pytest
+
+from pystubit.terminal import StuduinoBitAnalogPin, StuduinoBitDigitalPin, \
+    StuduinoBitTerminal, pin_descriptor, has_capability, \
+    CAP_INPUT, CAP_OUTPUT, CAP_PWM, CAP_ADC
+
+
+def expected(raw):
+    return (raw * 0.8 + 142) / 3300 * 4095
+
+
+def test_every_read_is_one_conversion():
+    pin = StuduinoBitAnalogPin(36)
+    pin.read_analog()
+    adc = pin._adc
+
+    for raw in (2048, 2048, 1000, 300):
+        adc.raw = raw
+        before = adc.conversions
+        value = pin.read_analog()
+        assert adc.conversions == before + 1
+        assert abs(value - expected(raw)) < 2
+
+    before = adc.conversions
+    samples = pin.read_analog_burst(16)
+    assert adc.conversions == before + 16
+    assert all(abs(v - expected(300)) < 2 for v in samples)
+
+
+def test_correction_is_fitted_once_from_a_stable_input():
+    pin = StuduinoBitAnalogPin(39)
+    pin.read_analog()
+    cal = pin._cal
+    for i in range(10):
+        pin.read_analog()
+    assert pin._cal is cal
+
+
+def test_offset_follows_the_adc_unit_of_the_pin_map():
+    p0 = StuduinoBitTerminal('P0')      # ADC1
+    p8 = StuduinoBitTerminal('P8')      # ADC2
+    p0.read_analog()
+    p8.read_analog()
+    assert p0._cal[1] == 142 * 4095 / 3300
+    assert p8._cal[1] == 128 * 4095 / 3300
+
+
+def test_pin_map_capabilities():
+    assert pin_descriptor('P2') == (36, CAP_INPUT | CAP_ADC, 1, 0)
+    assert pin_descriptor('P8') == (14, CAP_INPUT | CAP_OUTPUT | CAP_PWM |
+                                    CAP_ADC, 2, 6)
+    assert has_capability('P0', CAP_PWM | CAP_ADC)
+    assert has_capability('P4', CAP_PWM)
+    assert not has_capability('P4', CAP_ADC)
+    assert not has_capability('P3', CAP_OUTPUT)
+    for pin in ('P17', 'P18', 'P21', 'A0'):
+        with pytest.raises(ValueError):
+            pin_descriptor(pin)
+
+
+def test_terminals_are_built_from_the_pin_map():
+    p5 = StuduinoBitTerminal('P5')
+    assert StuduinoBitTerminal('P5') is p5
+    assert p5.pin == 15
+    assert p5._adc_unit == 2
+    p7 = StuduinoBitTerminal('P7')
+    assert type(p7) is StuduinoBitDigitalPin
+    assert p7.pin == 5
+    with pytest.raises(ValueError):
+        StuduinoBitTerminal('P17')
+
+
+def test_mode_switches_reuse_the_pin_objects():
+    p1 = StuduinoBitTerminal('P1')
+    p1.write_digital(1)
+    io = p1._io
+    p1.set_analog_hz(1000)
+    p1.write_analog(512)
+    pwm = p1._pwm
+    assert p1.pwm is pwm
+    p1.read_analog()
+    adc = p1._adc
+    assert p1.pwm is None and p1.adc is adc
+
+    for i in range(3):
+        p1.write_digital(0)
+        assert p1.pwm is None and p1.adc is None
+        p1.set_analog_hz(2000)
+        assert p1.pwm is pwm and pwm.freq() == 2000
+        p1.read_analog()
+        assert p1.adc is adc
+
+    assert p1._io is io and p1._pwm is pwm and p1._adc is adc
@@ -0,0 +1,187 @@
+"""
+------------------------------------------------------------------------------
+The MIT License (MIT)
+Copyright (c) 2016 Newcastle University
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.import time
+------------------------------------------------------------------------------
+------------------------------------------------------------------------------
+Display widgets for live sensor values
+Author
+Kenji Kawase, Artec Co., Ltd.
+------------------------------------------------------------------------------
+"""
+from math import sin, cos, pi
+from dsply import get_display_object
+from const import *
+from common import _rgb_24bit
+
+
+def _color(color):
+    if (type(color) is tuple) or (type(color) is list):
+        if len(color) != 3:
+            raise ValueError('color takes a (R,G,B) or [R,G,B]')
+        color = _rgb_24bit(color)
+    elif type(color) is not int:
+        raise TypeError('color takes a (R,G,B) or [R,G,B] or #RGB')
+    if color & ~0x1f1f1f:
+        raise ValueError('color out of bounds')
+    return color
+
+
+def _scale(value, lo, hi, steps):
+    """Map value in lo..hi to 0..steps, clamped.
+    """
+    n = int((value - lo) * steps / (hi - lo) + 0.5)
+    return 0 if n < 0 else steps if n > steps else n
+
+
+class _Widget:
+    """Base of the widgets. update() draws the new values into a 5x5 mask
+    and shows it with display.show_mask(), no image or string is built.
+    """
+    def __init__(self, *colors):
+        self._mask = bytearray(25)
+        self._palette = tuple([_color(c) for c in colors])
+        self._display = get_display_object()
+
+    def _show(self):
+        self._display.show_mask(self._mask, self._palette)
+
+
+class BarGraph(_Widget):
+    """Vertical bars growing from the bottom row, one per value.
+
+    E.g. bars of the acceleration of each axis:
+    graph = BarGraph(3, -9.8, 9.8)
+    while True:
+        graph.update(*accelerometer.get_values())
+    """
+    def __init__(self, bars=1, lo=0, hi=1, color=BuiltinColor.RED):
+        if bars < 1 or bars > 5:
+            raise ValueError('bars must be 1-5')
+        if lo >= hi:
+            raise ValueError('lo must be less than hi')
+        super().__init__(color)
+        self._lo = lo
+        self._hi = hi
+        # Columns of each bar
+        self._columns = [bytes(range(i * 5 // bars, (i + 1) * 5 // bars))
+                         for i in range(bars)]
+
+    def update(self, *values):
+        if len(values) != len(self._columns):
+            raise ValueError('expected {} values'.format(len(self._columns)))
+        mask = self._mask
+        for columns, value in zip(self._columns, values):
+            top = 5 - _scale(value, self._lo, self._hi, 5)
+            for x in columns:
+                for y in range(5):
+                    mask[y * 5 + x] = 1 if y >= top else 0
+        self._show()
+
+
+class TiltDot(_Widget):
+    """A dot that moves away from the center as the board tilts, like a
+    spirit level. limit is the acceleration that moves it to the edge.
+
+    E.g. dot.update(*accelerometer.get_values()[:2])
+    """
+    def __init__(self, limit=9.8, color=BuiltinColor.LIME):
+        if limit <= 0:
+            raise ValueError('limit must be more than 0')
+        super().__init__(color)
+        self._limit = limit
+        self._pos = -1
+
+    def update(self, x, y):
+        limit = self._limit
+        pos = (_scale(y, -limit, limit, 4) * 5 +
+               _scale(x, -limit, limit, 4))
+        if pos != self._pos:
+            mask = self._mask
+            if self._pos >= 0:
+                mask[self._pos] = 0
+            mask[pos] = 1
+            self._pos = pos
+        self._show()
+
+
+def _needles(count):
+    """Pixels of the needle for each of count sectors, as the mask indices
+    of the two pixels out from the center. Heading 0 points up.
+    """
+    buf = bytearray()
+    for i in range(count):
+        a = 2 * pi * i / count
+        for r in (1, 2):
+            x = 2 + int(round(r * sin(a)))
+            y = 2 - int(round(r * cos(a)))
+            buf.append(y * 5 + x)
+    return bytes(buf)
+
+
+class CompassNeedle(_Widget):
+    """A needle from the center of the display pointing to North.
+
+    E.g. needle.update(compass.heading())
+    """
+    __SECTORS = 16
+    __NEEDLES = None
+    __CENTER = 12
+
+    def __init__(self, color=BuiltinColor.RED, center=BuiltinColor.WHITE):
+        super().__init__(color, center)
+        if CompassNeedle.__NEEDLES is None:
+            CompassNeedle.__NEEDLES = _needles(CompassNeedle.__SECTORS)
+        self._sector = -1
+
+    def update(self, heading):
+        n = CompassNeedle.__SECTORS
+        # The needle points North, i.e. back by heading.
+        sector = int((360 - heading) * n / 360 + 0.5) % n
+        if sector != self._sector:
+            mask = self._mask
+            mask[:] = bytes(25)
+            i = sector * 2
+            mask[CompassNeedle.__NEEDLES[i]] = 1
+            mask[CompassNeedle.__NEEDLES[i + 1]] = 1
+            mask[CompassNeedle.__CENTER] = 2
+            self._sector = sector
+        self._show()
+
+
+class StripChart(_Widget):
+    """Scrolling chart of the last 5 values, the newest in the right column.
+
+    E.g. chart.update(gyro.get_z())
+    """
+    def __init__(self, lo=0, hi=1, color=BuiltinColor.BLUE):
+        if lo >= hi:
+            raise ValueError('lo must be less than hi')
+        super().__init__(color)
+        self._lo = lo
+        self._hi = hi
+
+    def update(self, value):
+        mask = self._mask
+        # Scroll every row one column to the left.
+        for y in range(0, 25, 5):
+            mask[y:y + 4] = mask[y + 1:y + 5]
+            mask[y + 4] = 0
+        y = 4 - _scale(value, self._lo, self._hi, 4)
+        mask[y * 5 + 4] = 1
+        self._show()